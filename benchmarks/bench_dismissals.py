@@ -0,0 +1,135 @@
+"""Benchmark the vectorized dismissal parser against the original per-row fielding credits.
+
+First checks a table of dismissal forms (caught, caught and bowled, stumped, run outs with
+one or two fielders, substitutes, hyphenated names, bowled/lbw/not out), then times crediting
+a season-like column of --rows dismissals both ways (names drawn from --players players).
+The patterns run in pyarrow's RE2 engine when pyarrow is installed, else through Python's re.
+
+    python benchmarks/bench_dismissals.py [--rows 100000] [--repeat 5]
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dismissals import fielding_credits, parse_dismissals, pc  # noqa: E402
+
+# (dismissal, kind, bowler, fielders credited); substitutes are parsed but never credited
+CASES = [
+    ("c Yastika Bhatia b Shabnim Ismail", "caught", "Shabnim Ismail", ("Yastika Bhatia",)),
+    ("c & b Amanjot Kaur", "caught_and_bowled", "Amanjot Kaur", ("Amanjot Kaur",)),
+    ("c and b Amanjot Kaur", "caught_and_bowled", "Amanjot Kaur", ("Amanjot Kaur",)),
+    ("c †Richa Ghosh b Renuka Singh", "caught", "Renuka Singh", ("Richa Ghosh",)),
+    ("st Richa Ghosh b Sophie Molineux", "stumped", "Sophie Molineux", ("Richa Ghosh",)),
+    ("run out (Nat Sciver-Brunt)", "run_out", None, ("Nat Sciver-Brunt",)),
+    ("run out (Harmanpreet Kaur/Yastika Bhatia)", "run_out", None, ("Harmanpreet Kaur", "Yastika Bhatia")),
+    ("run out (sub (Sajana S)/Yastika Bhatia)", "run_out", None, ("Yastika Bhatia",)),
+    ("c (sub)Sajana S b Hayley Matthews", "caught", "Hayley Matthews", ()),
+    ("c Sajana S (sub) b Hayley Matthews", "caught", "Hayley Matthews", ()),
+    ("c D'Souza b Shikha Pandey", "caught", "Shikha Pandey", ("D'Souza",)),
+    ("lbw b Deepti Sharma", "lbw", "Deepti Sharma", ()),
+    ("hit wicket b Deepti Sharma", "hit_wicket", "Deepti Sharma", ()),
+    ("b Shabnim Ismail", "bowled", "Shabnim Ismail", ()),
+    ("not out", "not_out", None, ()),
+    ("batting", "not_out", None, ()),
+    ("retired hurt", "retired", None, ()),
+    ("", "other", None, ()),
+    (None, "other", None, ()),
+]
+
+
+def legacy_add_fielding_credits(fielding_stats, dismissal_info):
+    """The original per-row crediting of one (lowercased) dismissal string"""
+    if 'c & b' in dismissal_info:
+        parts = dismissal_info.split('c & b')
+    elif 'c and b' in dismissal_info:
+        parts = dismissal_info.split('c and b')
+    else:
+        parts = []
+
+    if len(parts) > 1:
+        fielder = parts[1].strip()
+        fielding_stats[fielder] = fielding_stats.get(fielder, {"Catches": 0, "Stumpings": 0, "Run Outs": 0})
+        fielding_stats[fielder]["Catches"] += 1
+    else:
+        catch_match = re.search(r'c (.*?)\s+(?=b\s+)', dismissal_info)
+        if catch_match:
+            fielder = catch_match.group(1).strip()
+            fielding_stats[fielder] = fielding_stats.get(fielder, {"Catches": 0, "Stumpings": 0, "Run Outs": 0})
+            fielding_stats[fielder]["Catches"] += 1
+
+    stumping_match = re.search(r'st (\w+ \w+)', dismissal_info)
+    if stumping_match:
+        fielder = stumping_match.group(1).strip()
+        fielding_stats[fielder] = fielding_stats.get(fielder, {"Catches": 0, "Stumpings": 0, "Run Outs": 0})
+        fielding_stats[fielder]["Stumpings"] += 1
+
+    runout_match = re.search(r'run out \(([\w\s/]+)\)', dismissal_info)
+    if runout_match:
+        for fielder in runout_match.group(1).strip().split("/"):
+            fielder = fielder.strip()
+            fielding_stats[fielder] = fielding_stats.get(fielder, {"Catches": 0, "Stumpings": 0, "Run Outs": 0})
+            fielding_stats[fielder]["Run Outs"] += 1
+
+
+def legacy_credits(texts):
+    fielding_stats = {}
+    for text in texts:
+        legacy_add_fielding_credits(fielding_stats, (text or "").lower())
+    return fielding_stats
+
+
+def vectorized_credits(texts):
+    credits = fielding_credits(texts)
+    return credits.groupby(["Player", "credit"]).size().unstack("credit", fill_value=0)
+
+
+def synthetic_dismissals(rows, players, rng):
+    """A season-like column: each dismissal form with names drawn from a pool of players"""
+    names = [f"Player {chr(65 + i % 26)}{i}" for i in range(players)]
+    forms = ["c {0} b {1}", "c & b {1}", "st {0} b {1}", "run out ({0})", "run out ({0}/{1})", "lbw b {1}",
+             "b {1}", "c (sub){0} b {1}", "not out", "not out", "not out"]
+    picks = rng.integers(0, len(forms), rows)
+    first, second = rng.integers(0, players, rows), rng.integers(0, players, rows)
+    return [forms[p].format(names[a], names[b]) for p, a, b in zip(picks, first, second)]
+
+
+def check_cases():
+    """Fail loudly on any dismissal form the parser gets wrong"""
+    records = parse_dismissals([text for text, *_ in CASES])
+    for (text, kind, bowler, fielders), record in zip(CASES, records.itertuples()):
+        credited = tuple(name for name, sub in zip(record.fielders, record.substitutes) if not sub)
+        found_bowler = record.bowler if isinstance(record.bowler, str) else None
+        if (record.kind, found_bowler, credited) != (kind, bowler, fielders):
+            raise AssertionError(f"{text!r}: parsed {(record.kind, found_bowler, credited)}, "
+                                 f"expected {(kind, bowler, fielders)}")
+    print(f"✅ {len(CASES)} dismissal forms parsed as expected\n")
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000, help="Dismissals in the timed column")
+    parser.add_argument("--players", type=int, default=150, help="Players the names are drawn from")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    check_cases()
+
+    rng = np.random.default_rng(args.seed)
+    texts = synthetic_dismissals(args.rows, args.players, rng)
+    legacy = min(timeit.repeat(lambda: legacy_credits(texts), number=1, repeat=args.repeat))
+    vectorized = min(timeit.repeat(lambda: vectorized_credits(texts), number=1, repeat=args.repeat))
+
+    print(f"engine: {'pyarrow (RE2)' if pc is not None else 'Python re'}")
+    print(f"{'rows':>10}{'per-row ms':>14}{'vectorized ms':>16}{'speedup':>10}")
+    print(f"{args.rows:>10}{legacy * 1000:>14.1f}{vectorized * 1000:>16.1f}{legacy / vectorized:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,70 @@
+"""Benchmark process-pool HTML parsing against parsing on the fetching threads.
+
+Runs process_matches over the fixture corpus (the completed matches repeated --copies
+times, served offline by the FixtureAdapter from run_benchmarks.py) once with parsing
+inline and once per --processes value, and checks every mode collects the same frames.
+
+    python benchmarks/bench_parse_pool.py [--copies 10] [--processes 2 4]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import run_benchmarks  # noqa: E402  (sets up main.py for offline runs)
+from run_benchmarks import main  # noqa: E402
+
+
+def run(matches, processes):
+    """Time one process_matches run with `processes` parse workers (0 = inline)"""
+    main.configure_concurrency(parse_processes=processes)
+    main.session.mount("https://", run_benchmarks.adapter)
+    if main.parse_executor is not None:
+        # Start the workers outside the timed region
+        list(main.parse_executor.map(main.parse_profile_name, [""] * processes))
+
+    run_benchmarks.fresh_storage()  # An empty manifest, so no mode resumes from the last one's archive
+    start = time.perf_counter()
+    main.process_matches(matches)
+    seconds = time.perf_counter() - start
+    frames = main.run_records.frames()
+    frames = [frames[kind] for kind in ("batting", "bowling", "fielding")]
+    return seconds, frames
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=10, help="Times the fixture matches are repeated")
+    parser.add_argument("--processes", type=int, nargs="+", default=[2, os.cpu_count() or 2],
+                        help="Parse-process counts to compare with inline parsing")
+    args = parser.parse_args()
+
+    real_stdout = sys.stdout
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull  # The scraper prints a lot of progress output
+        try:
+            main.configure_concurrency()
+            main.session.mount("https://", run_benchmarks.adapter)
+            listing = main.get_scorecard_urls(main.SERIES_URL)
+            matches = [match for match in listing if match["result"] != "Result Pending"] * args.copies
+            results = {processes: run(matches, processes) for processes in [0] + args.processes}
+        finally:
+            sys.stdout = real_stdout
+            main.configure_concurrency(parse_processes=0)
+
+    inline_seconds, inline_frames = results[0]
+    print(f"{len(matches)} matches, {os.cpu_count()} CPUs, {main.MATCH_WORKERS} match workers\n")
+    print(f"{'parse mode':<22}{'seconds':>10}{'matches/s':>12}{'speedup':>10}")
+    for processes, (seconds, frames) in results.items():
+        for frame, expected in zip(frames, inline_frames):
+            pd.testing.assert_frame_equal(frame, expected)
+        label = "inline" if processes == 0 else f"{processes} processes"
+        print(f"{label:<22}{seconds:>10.2f}{len(matches) / seconds:>12.1f}{inline_seconds / seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,127 @@
+"""Benchmark the single-pass scorecard parser against the original multi-scan parser.
+
+Runs offline over the scorecards in benchmarks/fixtures and checks that both parsers
+extract the same batting (with dismissals), bowling and DNB data before timing them. The
+original parser also credited fielders row by row; that work is kept in its timing.
+
+    python benchmarks/bench_parse_scorecard.py [--repeat N]
+"""
+import argparse
+import glob
+import os
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main  # noqa: E402
+from bench_dismissals import legacy_add_fielding_credits  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def legacy_extract_scorecard(html_content):
+    """The original parse_scorecard/fetch_scorecard parsing work, minus the network calls"""
+    # fetch_scorecard parsed the page once just to check it was valid
+    if not BeautifulSoup(html_content, 'html.parser').find('div', class_='cb-col cb-col-100 cb-ltst-wgt-hdr'):
+        return None
+
+    soup = BeautifulSoup(html_content, 'html.parser')
+    team_names = [header.text.split('Innings')[0].strip()
+                  for header in soup.find_all('div', class_='cb-col cb-col-100 cb-scrd-hdr-rw')]
+    batting_tables, bowling_tables, dnb_players = [], [], []
+    fielding_stats_by_innings = {1: {}, 2: {}}
+    current_innings = 0
+
+    for table in soup.find_all('div', class_='cb-col cb-col-100 cb-ltst-wgt-hdr'):
+        if "Batter" in table.text or "Batsman" in table.text:
+            current_innings += 1
+            rows = []
+            for row in table.find_all('div', class_='cb-col cb-col-100 cb-scrd-itms'):
+                cols = row.find_all('div')
+                if len(cols) >= 7:
+                    player_link = cols[0].find('a')
+                    rows.append([player_link['href'] if player_link else None, cols[0].text.strip()] +
+                                [cols[i].text.strip() for i in range(2, 7)] + [cols[1].text.strip()])
+                    legacy_add_fielding_credits(fielding_stats_by_innings[current_innings], cols[1].text.strip().lower())
+
+            # The DNB scan ran over the whole document once per batting table
+            dnb_players = []
+            dnb_sections = [div for div in soup.find_all('div', class_='cb-col cb-col-100 cb-scrd-itms') if 'Did not Bat' in div.text]
+            if len(dnb_sections) == 2:
+                for i, dnb_section in enumerate(dnb_sections):
+                    for player_link in dnb_section.find_all('a', class_='cb-text-link'):
+                        if player_link.text.strip():
+                            dnb_players.append([player_link['href'], player_link.text.strip(), i + 1, team_names[i]])
+            batting_tables.append(rows)
+
+    for table in soup.find_all('div', class_='cb-col cb-col-100 cb-ltst-wgt-hdr'):
+        if "Bowler" in table.text:
+            rows = []
+            for row in table.find_all('div', class_='cb-col cb-col-100 cb-scrd-itms'):
+                cols = row.find_all('div')
+                if len(cols) >= 8:
+                    player_link = cols[0].find('a')
+                    dots_link_tag = cols[8].find('a')
+                    rows.append([player_link['href'] if player_link else None, cols[0].text.strip()] +
+                                [cols[i].text.strip() for i in range(1, 8)] +
+                                [f"https://www.cricbuzz.com{dots_link_tag['href']}" if dots_link_tag else "N/A"])
+            bowling_tables.append(rows)
+
+    return {
+        "team_names": team_names,
+        "batting_tables": batting_tables,
+        "bowling_tables": bowling_tables,
+        "dnb_players": dnb_players,
+        "fielding_stats_by_innings": fielding_stats_by_innings,
+    }
+
+
+def new_extract_scorecard(html_content):
+    """The current fetch_scorecard validity check plus extract_scorecard"""
+    if 'cb-col cb-col-100 cb-ltst-wgt-hdr' not in html_content:
+        return None
+    return main.extract_scorecard(html_content)
+
+
+def check_equivalent(name, html_content):
+    """Fail loudly if the two parsers disagree on a fixture"""
+    legacy = legacy_extract_scorecard(html_content)
+    new = new_extract_scorecard(html_content)
+    for key in legacy.keys() & new.keys():
+        if legacy[key] != new[key]:
+            raise AssertionError(f"{name}: parsers disagree on {key}")
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Parses per fixture and parser")
+    args = parser.parse_args()
+
+    fixtures = sorted(glob.glob(os.path.join(FIXTURES_DIR, "scorecard_*.html")))
+    if not fixtures:
+        sys.exit(f"No scorecard fixtures found in {FIXTURES_DIR}")
+
+    print(f"Scorecard parser: {main.SCORECARD_PARSER}, {args.repeat} parses per fixture\n")
+    print(f"{'fixture':<28}{'legacy ms':>12}{'new ms':>12}{'speedup':>10}")
+
+    total_legacy = total_new = 0.0
+    for path in fixtures:
+        name = os.path.basename(path)
+        with open(path, encoding="utf-8") as f:
+            html_content = f.read()
+        check_equivalent(name, html_content)
+
+        legacy = min(timeit.repeat(lambda: legacy_extract_scorecard(html_content), number=1, repeat=args.repeat))
+        new = min(timeit.repeat(lambda: new_extract_scorecard(html_content), number=1, repeat=args.repeat))
+        total_legacy += legacy
+        total_new += new
+        print(f"{name:<28}{legacy * 1000:>12.2f}{new * 1000:>12.2f}{legacy / new:>9.1f}x")
+
+    print(f"{'total':<28}{total_legacy * 1000:>12.2f}{total_new * 1000:>12.2f}{total_legacy / total_new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main_benchmark()
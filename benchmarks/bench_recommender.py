@@ -0,0 +1,105 @@
+"""Benchmark the lineup recommender on synthetic player pools.
+
+Builds pools of --sizes players shaped like public/data/players_with_prices.json (role mix,
+five franchises, about a third overseas, prices rising with points as in the pricing stage)
+and times LineupSearch for each pool, budget and --top. Small pools are first checked
+against brute-force enumeration of every valid XI.
+
+    python benchmarks/bench_recommender.py [--sizes 150 200 300] [--top 1 5 10]
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import recommender  # noqa: E402
+
+ROLES = ["Batting Allrounder", "Bowling Allrounder", "Bowler", "Batter", "WK-Batter"]
+ROLE_WEIGHTS = [24, 24, 21, 13, 8]
+
+
+def synthetic_pool(size, rng):
+    points = np.round(rng.gamma(1.2, 150, size) - 30, 1)
+    return pd.DataFrame({
+        "player_id": [str(20000 + i) for i in range(size)],
+        "player": [f"Player {i}" for i in range(size)],
+        "role": rng.choice(ROLES, size, p=np.array(ROLE_WEIGHTS) / sum(ROLE_WEIGHTS)),
+        "franchise": rng.choice([f"Franchise {i}" for i in range(5)], size),
+        "overseas": rng.random(size) < 0.35,
+        "price": np.round(5.0 + points / 150 + rng.normal(0, 0.4, size), 1).clip(4.0, 12.0),
+        "expected_points": points,
+    })
+
+
+def brute_force(pool, top_k, budget):
+    """Score every valid XI the slow way"""
+    minimums = recommender.ROLE_MINIMUMS
+    scores = []
+    rows = pool.to_dict(orient="records")
+    for combo in itertools.combinations(range(len(rows)), recommender.SQUAD_SIZE):
+        players = [rows[i] for i in combo]
+        if sum(player["price"] for player in players) > budget + 1e-9:
+            continue
+        if sum(player["overseas"] for player in players) > recommender.MAX_OVERSEAS:
+            continue
+        if max(pd.Series([player["franchise"] for player in players]).value_counts()) > recommender.MAX_PER_FRANCHISE:
+            continue
+        if any(sum(player["role"] == role for player in players) < minimum for role, minimum in minimums.items()):
+            continue
+        points = sorted((player["expected_points"] for player in players), reverse=True)
+        scores.append(sum(points) + points[0] * (recommender.CAPTAIN_MULTIPLIER - 1)
+                      + points[1] * (recommender.VICE_CAPTAIN_MULTIPLIER - 1))
+    return sorted(scores, reverse=True)[:top_k]
+
+
+def check_small_pools(rng, pools=5, size=17, top_k=5):
+    for _ in range(pools):
+        pool = synthetic_pool(size, rng)
+        budget = float(np.round(pool["price"].nsmallest(11).sum() + 8, 1))
+        expected = brute_force(pool, top_k, budget)
+        found = [score for score, _ in recommender.LineupSearch(pool, budget=budget).search(top_k)]
+        if not np.allclose(found, expected):
+            raise AssertionError(f"search {found} != brute force {expected}")
+    print(f"✅ Top-{top_k} matches brute force on {pools} pools of {size} players\n")
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[150, 200, 300], help="Pool sizes")
+    parser.add_argument("--top", type=int, nargs="+", default=[1, 5, 10], help="Lineups returned")
+    parser.add_argument("--budgets", type=float, nargs="+", default=[100.0, 80.0],
+                        help="Budgets (the lower one makes the budget the binding rule)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (best kept)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    check_small_pools(rng)
+
+    print(f"{'players':>8}{'budget':>8}{'top':>5}{'bounds ms':>11}{'search ms':>11}{'total ms':>10}{'best':>10}")
+    for size in args.sizes:
+        pool = synthetic_pool(size, rng)
+        for budget in args.budgets:
+            for top_k in args.top:
+                best = None
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    search = recommender.LineupSearch(pool, budget=budget)
+                    built = time.perf_counter()
+                    found = search.search(top_k)
+                    done = time.perf_counter()
+                    if best is None or done - start < best[2]:
+                        best = (built - start, done - built, done - start, found)
+                top_score = f"{best[3][0][0]:.1f}" if best[3] else "-"
+                print(f"{size:>8}{budget:>8g}{top_k:>5}{best[0] * 1000:>11.1f}{best[1] * 1000:>11.1f}"
+                      f"{best[2] * 1000:>10.1f}{top_score:>10}")
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,140 @@
+"""Throughput benchmark for the rule-table scoring engine.
+
+Scores synthetic player-innings with the vectorized calculate_batting_points /
+calculate_bowling_points and with the original row-wise `DataFrame.apply` versions,
+checks both give identical points and reports rows per second.
+
+    python benchmarks/bench_scoring.py [--rows 1000000] [--legacy-rows 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main  # noqa: E402
+
+
+def legacy_sr_points(row):
+    if row['Balls'] < 10:
+        return 0
+    sr = row['SR']
+    if sr < 50:
+        return -15
+    elif sr < 75:
+        return -10
+    elif sr < 100:
+        return -5
+    elif sr < 125:
+        return 0
+    elif sr < 150:
+        return 5
+    elif sr < 200:
+        return 10
+    return 15
+
+
+def legacy_economy_points(row):
+    if row['Overs'] < 1:
+        return 0
+    economy = row['Econ']
+    for upper, points in [(5.01, 20), (6.01, 15), (7.01, 10), (8.01, 5), (9.01, 0), (10.01, -5), (12.01, -10)]:
+        if economy < upper:
+            return points
+    return -20
+
+
+def legacy_batting_points(df):
+    """The original row-wise batting scorer"""
+    numeric_columns = ['Runs', 'Balls', '4s', '6s', 'SR']
+    df[numeric_columns] = df[numeric_columns].apply(pd.to_numeric, errors='coerce').fillna(0)
+    df['Batting_Points'] = (
+        df['Runs'] + df['4s'] + df['6s'] * 2 +
+        df.apply(legacy_sr_points, axis=1) +
+        df['Runs'].apply(lambda runs: (runs // 25) * 10)
+    )
+    return df
+
+
+def legacy_bowling_points(df):
+    """The original row-wise bowling scorer"""
+    numeric_columns = ['Overs', 'Maidens', 'Runs', 'Wickets', 'No Balls', 'Wides', 'Econ', 'Dots']
+    df[numeric_columns] = df[numeric_columns].apply(pd.to_numeric, errors='coerce').fillna(0)
+    df['Bowling_Points'] = (
+        df['Wickets'] * 20 +
+        df.apply(legacy_economy_points, axis=1) +
+        df['No Balls'] * -2 +
+        (df['Wides'] // 2) * -1 +
+        df['Wickets'].apply(lambda wickets: max(0, (wickets - 1) * 10)) +
+        df['Maidens'] * 20 +
+        df['Dots'] * 2
+    )
+    return df
+
+
+def synthetic_batting(rows, rng):
+    return pd.DataFrame({
+        "Runs": rng.integers(0, 120, rows),
+        "Balls": rng.integers(0, 70, rows),
+        "4s": rng.integers(0, 12, rows),
+        "6s": rng.integers(0, 8, rows),
+        "SR": np.round(rng.uniform(0, 300, rows), 2),
+    })
+
+
+def synthetic_bowling(rows, rng):
+    return pd.DataFrame({
+        "Overs": rng.choice([0.4, 1, 2, 3, 3.2, 4], rows),
+        "Maidens": rng.integers(0, 2, rows),
+        "Runs": rng.integers(0, 55, rows),
+        "Wickets": rng.integers(0, 6, rows),
+        "No Balls": rng.integers(0, 3, rows),
+        "Wides": rng.integers(0, 7, rows),
+        "Econ": np.round(rng.uniform(2, 16, rows), 2),
+        "Dots": rng.integers(0, 18, rows),
+    })
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    result = func(df.copy())
+    return result, time.perf_counter() - start
+
+
+def report(label, rows, seconds):
+    print(f"{label:<28}{rows:>12,}{seconds:>10.3f}s{rows / seconds:>16,.0f} rows/s")
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Player-innings scored by the vectorized engine")
+    parser.add_argument("--legacy-rows", type=int, default=100_000, help="Player-innings scored by the row-wise version")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    batting = synthetic_batting(args.rows, rng)
+    bowling = synthetic_bowling(args.rows, rng)
+
+    print(f"{'scorer':<28}{'rows':>12}{'time':>11}{'throughput':>22}")
+    for label, legacy, engine, frame, column in [
+        ("batting", legacy_batting_points, main.calculate_batting_points, batting, "Batting_Points"),
+        ("bowling", legacy_bowling_points, main.calculate_bowling_points, bowling, "Bowling_Points"),
+    ]:
+        subset = frame.head(args.legacy_rows)
+        legacy_result, legacy_seconds = timed(legacy, subset)
+        engine_subset, _ = timed(engine, subset)
+        if not np.array_equal(legacy_result[column].to_numpy(), engine_subset[column].to_numpy()):
+            raise AssertionError(f"{label}: vectorized points differ from the row-wise scorer")
+
+        _, engine_seconds = timed(engine, frame)
+        report(f"{label} (row-wise apply)", len(subset), legacy_seconds)
+        report(f"{label} (rule engine)", len(frame), engine_seconds)
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,94 @@
+"""Benchmark the league simulator on synthetic seasons and leagues.
+
+Builds a player_points history of --players players over --matches matches (each match
+played by two of five franchises), --users user teams of 11 with a captain and
+vice-captain, and leagues of --league-size members, then times one full refresh of every
+league. A small league is first checked against scoring each team on its own.
+
+    python benchmarks/bench_simulator.py [--users 1000 10000] [--simulations 20000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import simulator  # noqa: E402
+
+SQUAD_WEIGHTS = [2.0, 1.5] + [1.0] * 9  # Captain, vice-captain, the other nine
+
+
+def synthetic_history(players, matches, rng):
+    franchise = np.arange(players) % 5
+    rows = []
+    for match_id in range(matches):
+        playing = np.flatnonzero(np.isin(franchise, rng.choice(5, 2, replace=False)))
+        playing = rng.choice(playing, min(22, len(playing)), replace=False)
+        points = np.round(rng.gamma(1.2, 30, len(playing)) - 4, 1)
+        rows.append(pd.DataFrame({"match_id": str(100000 + match_id), "player": [f"Player {i}" for i in playing],
+                                  "points": points}))
+    return pd.concat(rows, ignore_index=True)
+
+
+def synthetic_leagues(users, players, league_size, rng):
+    players = np.asarray(players)
+    team_weights = {
+        f"user-{u}": (list(rng.choice(players, 11, replace=False)), SQUAD_WEIGHTS)
+        for u in range(users)
+    }
+    current = {user_id: float(rng.normal(2000, 300)) for user_id in team_weights}
+    user_ids = list(team_weights)
+    leagues = {f"league-{start // league_size}": user_ids[start:start + league_size]
+               for start in range(0, users, league_size)}
+    return leagues, team_weights, current
+
+
+def check_against_loop(model, rng, rounds=5, simulations=2000):
+    leagues, team_weights, current = synthetic_leagues(12, model.players, 12, rng)
+    found = simulator.simulate_leagues(model, leagues, team_weights, current, rounds, simulations, seed=11)
+    season = model.sample_season(rounds, simulations, seed=11)
+    finals = np.stack([
+        season[:, model.players.get_indexer(names)] @ np.asarray(weights, dtype=np.float32) + current[user_id]
+        for user_id, (names, weights) in team_weights.items()
+    ], axis=1)
+    if not np.allclose(found["win_probability"], simulator.win_shares(finals.T), atol=1e-4):
+        raise AssertionError("win probabilities differ from scoring each team on its own")
+    if not np.allclose(found["expected_points"], finals.mean(axis=0), atol=0.01):
+        raise AssertionError("expected points differ from scoring each team on its own")
+    print("✅ Batched league scoring matches scoring each team on its own\n")
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=150, help="Players in the history")
+    parser.add_argument("--matches", type=int, default=22, help="Matches already played")
+    parser.add_argument("--rounds", type=int, default=10, help="Matches left to simulate")
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 10000], help="User teams")
+    parser.add_argument("--league-size", type=int, default=20, help="Members per league")
+    parser.add_argument("--simulations", type=int, default=simulator.DEFAULT_SIMULATIONS)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    model = simulator.PointsModel(synthetic_history(args.players, args.matches, rng))
+    check_against_loop(model, rng)
+
+    print(f"{'users':>8}{'leagues':>9}{'sims':>8}{'rounds':>8}{'sample s':>10}{'score s':>9}{'total s':>9}")
+    for users in args.users:
+        leagues, team_weights, current = synthetic_leagues(users, model.players, args.league_size, rng)
+        start = time.perf_counter()
+        model.sample_season(args.rounds, args.simulations, seed=args.seed)
+        sampled = time.perf_counter()
+        simulator.simulate_leagues(model, leagues, team_weights, current, args.rounds, args.simulations, seed=args.seed)
+        done = time.perf_counter()
+        sample_seconds = sampled - start
+        print(f"{users:>8}{len(leagues):>9}{args.simulations:>8}{args.rounds:>8}{sample_seconds:>10.2f}"
+              f"{done - sampled - sample_seconds:>9.2f}{done - sampled:>9.2f}")
+
+
+if __name__ == "__main__":
+    main_benchmark()
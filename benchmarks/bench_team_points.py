@@ -0,0 +1,121 @@
+"""Benchmark team-total aggregation over synthetic user teams.
+
+Builds --teams user teams (and matchday teams for about half of them) from the players in
+public/data/players_with_prices.json, totals them for --matches matches with
+TeamPointsAggregator and checks a sample against a plain per-team loop.
+
+    python benchmarks/bench_team_points.py [--teams 100000] [--matches 3]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, REPO_DIR)
+
+import main  # noqa: E402
+
+
+def load_players():
+    with open(os.path.join(REPO_DIR, "public", "data", "players_with_prices.json"), encoding="utf-8") as f:
+        return [(str(player["Player ID"]), player["Player"]) for player in json.load(f)]
+
+
+def synthetic_tables(players, teams, match_ids, rng):
+    """user_teams and matchday_teams rows shaped like the app writes them"""
+    user_teams, matchday_teams = [], []
+    for i in range(teams):
+        squad = [players[j] for j in rng.choice(len(players), 11, replace=False)]
+        user_teams.append({
+            "user_id": f"user-{i}",
+            "team_data": [{"Player_ID": player_id, "Player": name} for player_id, name in squad],
+            "captain_id": squad[0][0],
+            "vice_captain_id": squad[1][0],
+        })
+        if i % 2:
+            for match_id in match_ids:
+                squad = [players[j] for j in rng.choice(len(players), 11, replace=False)]
+                matchday_teams.append({
+                    "user_id": f"user-{i}",
+                    "match_id": match_id,
+                    "players": {player_id: {"player_name": name, "player_id": player_id} for player_id, name in squad},
+                    "captain_id": squad[2][0],
+                    "vice_captain_id": squad[3][0],
+                })
+    return {"user_teams": user_teams, "matchday_teams": matchday_teams}
+
+
+def synthetic_points(players, match_ids, rng):
+    rows = []
+    for match_id in match_ids:
+        for j in rng.choice(len(players), 22, replace=False):
+            rows.append({"match_id": match_id, "player_name": players[j][1], "total_points": float(rng.integers(-20, 150))})
+    return pd.DataFrame(rows)
+
+
+def naive_total(squad, captain_id, vice_captain_id, points):
+    total = 0.0
+    for player_id, name in squad:
+        base = points.get(name, 0.0)
+        total += base * (2 if player_id == captain_id else 1.5 if player_id == vice_captain_id else 1)
+    return round(total, 2)
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=100_000, help="User teams to aggregate")
+    parser.add_argument("--matches", type=int, default=3, help="Matches scored in one run")
+    parser.add_argument("--sample", type=int, default=2000, help="Teams checked against the per-team loop")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    players = load_players()
+    match_ids = [str(113901 + i) for i in range(args.matches)]
+    tables = synthetic_tables(players, args.teams, match_ids, rng)
+    df_points = synthetic_points(players, match_ids, rng)
+
+    def fetch_all_rows(table, columns, **in_filters):
+        rows = tables[table]
+        for column, values in in_filters.items():
+            rows = [row for row in rows if str(row[column]) in set(values)]
+        return rows
+
+    main.fetch_all_rows = fetch_all_rows
+
+    aggregator = main.TeamPointsAggregator()
+    start = time.perf_counter()
+    aggregator.load_user_teams()
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = aggregator.aggregate(df_points)
+    aggregate_seconds = time.perf_counter() - start
+
+    # Check a sample of teams against a plain loop
+    squads = {row["user_id"]: row for row in tables["user_teams"]}
+    matchday = {(row["user_id"], row["match_id"]): row for row in tables["matchday_teams"]}
+    for row in result.sample(min(args.sample, len(result)), random_state=args.seed).itertuples():
+        points = dict(zip(*df_points[df_points["match_id"] == row.match_id][["player_name", "total_points"]].to_numpy().T))
+        team = matchday.get((row.user_id, row.match_id))
+        if team:
+            expected = naive_total(main.matchday_squad(team["players"]), team["captain_id"], team["vice_captain_id"], points)
+        else:
+            team = squads[row.user_id]
+            expected = naive_total(main.user_team_squad(team["team_data"]), team["captain_id"], team["vice_captain_id"], points)
+        if not np.isclose(row.points, expected):
+            raise AssertionError(f"{row.user_id} match {row.match_id}: {row.points} != {expected}")
+
+    print(f"{args.teams:,} user teams, {len(tables['matchday_teams']):,} matchday teams, {args.matches} matches")
+    print(f"load user_teams matrix   {load_seconds:>8.3f}s")
+    print(f"aggregate team totals    {aggregate_seconds:>8.3f}s  ({len(result):,} rows, "
+          f"{len(result) / aggregate_seconds:,.0f} teams/s)")
+
+
+if __name__ == "__main__":
+    main_benchmark()
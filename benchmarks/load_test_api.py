@@ -0,0 +1,139 @@
+"""Local load test for points_api.py.
+
+Starts the API in-process on synthetic data (a season of player_points, team_points for
+--users users and a few leagues), then runs --clients concurrent clients for --duration
+seconds against a mix of endpoints. Half the clients revalidate with If-None-Match, as
+browsers do. Reports throughput and p50/p95/p99 latency per endpoint.
+
+    python benchmarks/load_test_api.py [--clients 32] [--duration 10]
+    python benchmarks/load_test_api.py --url http://localhost:8000   # against a running server
+"""
+import argparse
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+MATCH_IDS = [str(113901 + i) for i in range(22)]
+LEAGUE_IDS = [f"league-{i}" for i in range(20)]
+
+
+def synthetic_tables(users, seed):
+    """player_points, team_points and user_leagues rows shaped like the scraper and app write them"""
+    rng = np.random.default_rng(seed)
+    players = [(f"Player {i}", f"Team {i % 5}") for i in range(110)]
+    player_points = []
+    for match_id in MATCH_IDS:
+        for j in rng.choice(len(players), 22, replace=False):
+            batting, bowling, fielding = (float(x) for x in rng.integers(-10, 80, 3))
+            potm = 50.0 if j % 22 == 0 else 0.0
+            player_points.append({
+                "match_id": match_id, "player_name": players[j][0], "team": players[j][1],
+                "batting_points": batting, "bowling_points": bowling, "fielding_points": fielding,
+                "potm_points": potm, "total_points": batting + bowling + fielding + potm,
+            })
+    team_points = [
+        {"user_id": f"user-{u}", "match_id": match_id, "points": float(rng.integers(100, 900))}
+        for u in range(users) for match_id in MATCH_IDS
+    ]
+    user_leagues = [{"user_id": f"user-{u}", "league_id": LEAGUE_IDS[u % len(LEAGUE_IDS)]} for u in range(users)]
+    return {"player_points": player_points, "team_points": team_points, "user_leagues": user_leagues}
+
+
+def start_local_server(users, seed):
+    """Run points_api on a free port with its storage reads answered from synthetic tables"""
+    import uvicorn
+    import points_api
+
+    tables = synthetic_tables(users, seed)
+
+    def fetch_table(table, columns, **eq_filters):
+        return [row for row in tables[table] if all(str(row[k]) == str(v) for k, v in eq_filters.items())]
+
+    points_api.fetch_table = fetch_table
+    points_api.fetch_data_version = lambda: "load-test"
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(points_api.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server
+
+
+def random_path(rng):
+    kind = rng.choices(["match", "season", "league"], weights=[5, 3, 2])[0]
+    if kind == "match":
+        return kind, f"/matches/{rng.choice(MATCH_IDS)}/points?limit=25"
+    if kind == "season":
+        return kind, f"/players/points?limit=50&offset={rng.choice([0, 50, 100])}"
+    return kind, f"/leagues/{rng.choice(LEAGUE_IDS)}/leaderboard?limit=50"
+
+
+def client(base_url, deadline, revalidate, seed, results):
+    """One client: request random endpoints until the deadline, recording (endpoint, status, seconds)"""
+    rng = random.Random(seed)
+    session = requests.Session()
+    etags = {}
+    while time.perf_counter() < deadline:
+        kind, path = random_path(rng)
+        headers = {"If-None-Match": etags[path]} if revalidate and path in etags else {}
+        start = time.perf_counter()
+        response = session.get(base_url + path, headers=headers, timeout=10)
+        results.append((kind, response.status_code, time.perf_counter() - start))
+        if "ETag" in response.headers:
+            etags[path] = response.headers["ETag"]
+
+
+def report(results, duration):
+    print(f"{'endpoint':<10}{'requests':>10}{'304s':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for kind in ("match", "season", "league", "all"):
+        rows = [r for r in results if kind == "all" or r[0] == kind]
+        if not rows:
+            continue
+        latencies = np.array([r[2] for r in rows]) * 1000
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        not_modified = sum(1 for r in rows if r[1] == 304)
+        errors = sum(1 for r in rows if r[1] >= 400)
+        print(f"{kind:<10}{len(rows):>10}{not_modified:>8}{errors:>8}{p50:>10.2f}{p95:>10.2f}{p99:>10.2f}")
+    print(f"\n{len(results) / duration:,.0f} requests/s")
+
+
+def main_load_test():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Test a running server instead of starting one on synthetic data")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to run")
+    parser.add_argument("--users", type=int, default=5000, help="Users in the synthetic team_points table")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        base_url, server = start_local_server(args.users, args.seed)
+
+    results = []  # list.append is atomic, so the clients can share it
+    deadline = time.perf_counter() + args.duration
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        for i in range(args.clients):
+            executor.submit(client, base_url, deadline, i % 2 == 0, args.seed + i, results)
+
+    print(f"{args.clients} clients for {args.duration:g}s against {base_url}\n")
+    report(results, args.duration)
+    if server:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main_load_test()
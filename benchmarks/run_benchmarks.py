@@ -0,0 +1,258 @@
+"""Offline benchmark and memory-regression suite for the scraper.
+
+Every Cricbuzz request is answered from the recorded corpus in benchmarks/fixtures
+(manifest.json maps each URL to its file), so the suite runs without network access.
+Each stage is timed over several repetitions (best run kept) and then run once more
+under tracemalloc to record its peak memory. Results are written as JSON and compared
+with a stored baseline; stages slower or hungrier than the baseline by more than the
+tolerance are flagged.
+
+    python benchmarks/run_benchmarks.py                    # run and compare with the baseline
+    python benchmarks/run_benchmarks.py --update-baseline  # accept the current numbers
+
+Baselines are machine-specific: regenerate benchmarks/baseline.json on the machine
+that runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import pandas as pd
+import requests
+from requests.adapters import BaseAdapter
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, "fixtures")
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCHMARKS_DIR, "results", "latest.json")
+
+# main.py opens its storage and on-disk caches at import time: point them somewhere harmless
+WORK_DIR = tempfile.mkdtemp(prefix="scraper-bench-")
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(WORK_DIR, "fantasy.sqlite")
+os.environ["PROFILE_CACHE_PATH"] = os.path.join(WORK_DIR, "profiles.sqlite")
+os.environ["HTTP_CACHE_PATH"] = os.path.join(WORK_DIR, "http.sqlite")
+os.environ["STATS_ARCHIVE_DIR"] = os.path.join(WORK_DIR, "stats_archive")
+os.environ["PRICES_CSV_PATH"] = os.path.join(WORK_DIR, "player_prices.csv")
+os.environ["PLAYERS_WITH_PRICES_PATH"] = os.path.join(WORK_DIR, "players_with_prices.json")
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, ".."))
+
+import main  # noqa: E402
+
+
+class FixtureAdapter(BaseAdapter):
+    """Transport adapter that serves recorded responses from the fixture manifest"""
+
+    def __init__(self, fixtures_dir):
+        super().__init__()
+        self.fixtures_dir = fixtures_dir
+        with open(os.path.join(fixtures_dir, "manifest.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.requests = 0
+
+    def send(self, request, **kwargs):
+        self.requests += 1
+        url = request.url.split("?")[0]
+        if url not in self.manifest:
+            raise requests.exceptions.ConnectionError(f"No fixture recorded for {url}", request=request)
+
+        path = os.path.join(self.fixtures_dir, self.manifest[url])
+        with open(path, "rb") as f:
+            body = f.read()
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers["Content-Type"] = "application/json" if path.endswith(".json") else "text/html; charset=utf-8"
+        response.encoding = "utf-8"
+        response._content = body
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def fresh_profile_cache():
+    """Start a stage with an empty profile cache so every run does the same fetches"""
+    path = tempfile.mktemp(prefix="profiles-", suffix=".sqlite", dir=WORK_DIR)
+    main.profile_cache = main.PlayerProfileCache(path, ttl_seconds=3600, max_entries=main.PROFILE_CACHE_MAX_ENTRIES)
+
+
+def reset_run_state():
+    """Clear the module-level state a run accumulates"""
+    main.run_records.clear()
+    main.match_writer.rows.clear()
+    main.run_manifest = main.RunManifest()
+
+
+def fresh_storage():
+    """Start a stage with an empty SQLite database, as on a first run"""
+    reset_run_state()
+    fresh_profile_cache()
+    main.configure_storage("sqlite", tempfile.mktemp(prefix="fantasy-", suffix=".sqlite", dir=WORK_DIR))
+    main.price_book = main.PlayerPriceBook()
+
+
+def load_scorecards():
+    scorecards = {}
+    for url, rel in adapter.manifest.items():
+        if "/api/html/cricket-scorecard/" in url:
+            with open(os.path.join(FIXTURES_DIR, rel), encoding="utf-8") as f:
+                scorecards[url.rstrip("/").split("/")[-1]] = f.read()
+    return scorecards
+
+
+def collect_frames(completed_matches):
+    """Run the fetch/parse stage once and return the concatenated frames main() would score"""
+    fresh_storage()
+    main.process_matches(completed_matches)
+    frames = main.run_records.frames()
+    return frames["batting"], frames["bowling"], frames["fielding"], frames["potm"]
+
+
+def build_stages():
+    """Return (name, setup, run) triples; setup runs outside the timed/traced region"""
+    scorecards = load_scorecards()
+    matches = main.get_scorecard_urls(main.SERIES_URL)
+    completed = [match for match in matches if match["result"] != "Result Pending"]
+    df_batting, df_bowling, df_fielding, df_potm = collect_frames(completed)
+    names = list(df_batting["Batsman"]) + list(df_batting["Full Name"])
+
+    def scoring_inputs():
+        fresh_profile_cache()
+        return (df_batting.drop(columns="Batsman"), df_bowling.drop(columns="Bowler"), df_fielding.copy(), df_potm.copy())
+
+    return [
+        ("get_scorecard_urls", lambda: reset_run_state(), lambda _: main.get_scorecard_urls(main.SERIES_URL)),
+        ("parse_scorecard", lambda: fresh_profile_cache(),
+         lambda _: [main.parse_scorecard(html, match_id) for match_id, html in scorecards.items()]),
+        ("process_matches", fresh_storage, lambda _: main.process_matches(completed)),
+        ("create_name_variations", lambda: None, lambda _: [main.create_name_variations(name) for name in names]),
+        ("name_mapping", lambda: df_fielding.copy(),
+         lambda fielding: main.resolve_fielders(fielding, main.build_name_indexes(df_batting, df_bowling))),
+        ("calculate_points", scoring_inputs, lambda inputs: main.calculate_points(*inputs)),
+        ("end_to_end", fresh_storage, lambda _: main.main()),
+    ]
+
+
+def run_stage(setup, run, repeat):
+    """Best-of-N wall time, then one traced run for peak memory"""
+    timings = []
+    requests_made = 0
+    for _ in range(repeat):
+        state = setup()
+        before = adapter.requests
+        start = time.perf_counter()
+        run(state)
+        timings.append(time.perf_counter() - start)
+        requests_made = adapter.requests - before
+
+    state = setup()
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": min(timings),
+        "mean_seconds": sum(timings) / len(timings),
+        "peak_kib": round(peak / 1024, 1),
+        "requests": requests_made,
+    }
+
+
+def compare(results, baseline, tolerance, memory_tolerance, min_delta_ms):
+    """Return a list of regression messages for stages that got slower or use more memory"""
+    regressions = []
+    for name, current in results["stages"].items():
+        previous = baseline.get("stages", {}).get(name)
+        if not previous:
+            continue
+        slower_ms = (current["seconds"] - previous["seconds"]) * 1000
+        if current["seconds"] > previous["seconds"] * (1 + tolerance) and slower_ms > min_delta_ms:
+            regressions.append(f"{name}: {current['seconds'] * 1000:.2f} ms vs baseline {previous['seconds'] * 1000:.2f} ms")
+        if current["peak_kib"] > previous["peak_kib"] * (1 + memory_tolerance):
+            regressions.append(f"{name}: peak {current['peak_kib']:.0f} KiB vs baseline {previous['peak_kib']:.0f} KiB")
+    return regressions
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per stage (best run kept)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write this run's results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results to compare with")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before flagging (0.25 = 25%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.20, help="Allowed peak-memory growth before flagging")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="Ignore slowdowns smaller than this (sub-millisecond stages are noisy)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero when a regression is flagged")
+    args = parser.parse_args()
+
+    main.configure_concurrency()
+    main.session.mount("https://", adapter)
+    main.session.mount("http://", adapter)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "scorecard_parser": main.SCORECARD_PARSER,
+            "repeat": args.repeat,
+        },
+        "stages": {},
+    }
+
+    with open(os.devnull, "w") as devnull:
+        real_stdout, sys.stdout = sys.stdout, devnull  # The scraper prints a lot of progress output
+        try:
+            stages = build_stages()
+            for name, setup, run in stages:
+                results["stages"][name] = run_stage(setup, run, args.repeat)
+        finally:
+            sys.stdout = real_stdout
+
+    print(f"{'stage':<26}{'best ms':>10}{'mean ms':>10}{'peak KiB':>11}{'requests':>10}")
+    for name, stage in results["stages"].items():
+        print(f"{name:<26}{stage['seconds'] * 1000:>10.2f}{stage['mean_seconds'] * 1000:>10.2f}"
+              f"{stage['peak_kib']:>11.0f}{stage['requests']:>10}")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --update-baseline to record one.")
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.memory_tolerance, args.min_delta_ms)
+    if regressions:
+        print("\n⚠️ Regressions against baseline:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        if args.fail_on_regression:
+            sys.exit(1)
+    else:
+        print("✅ No regressions against baseline.")
+
+
+adapter = FixtureAdapter(FIXTURES_DIR)
+
+if __name__ == "__main__":
+    main_benchmark()
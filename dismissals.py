@@ -0,0 +1,193 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# pyarrow is optional: with it the patterns run column-wide in Arrow's RE2 engine, without it
+# through Python's re, one distinct string at a time
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
+# Dismissal grammar: turns scorecard dismissal strings into structured records.
+#
+#     c Yastika Bhatia b Shabnim Ismail        caught      bowler Shabnim Ismail, fielder Yastika Bhatia
+#     c & b Amanjot Kaur / c and b ...         caught_and_bowled (the bowler is the catcher)
+#     st Richa Ghosh b Sophie Molineux         stumped
+#     run out (Sciver-Brunt/Yastika Bhatia)    run_out     one fielder = a direct hit
+#     lbw b ..., b ..., hit wicket b ...       lbw / bowled / hit_wicket (no fielder)
+#     not out, retired hurt, anything else     not_out / retired / other
+#
+# Substitute fielders are written "(sub)Name", "sub (Name)" or "Name (sub)". Each distinct string
+# of a column is matched once by one anchored pattern, the fielders are split out, cleaned and
+# flagged as whole-column string operations, and the results are spread back over the rows by
+# code. The patterns use only syntax Python's re and RE2 share (inline flags, no verbose mode).
+
+# Captures are kept to the names needed (fewer captures match faster), so a kind is told by a
+# group that is never empty when its alternative matched
+DISMISSAL_ALTERNATIVES = [
+    r"c\s*(?:&|and)\s*b\s+(?P<caught_and_bowled_bowler>.+?)",
+    r"c\s+(?P<catcher>.+?)\s+b\s+(?P<caught_bowler>.+?)",
+    r"st\s+(?P<keeper>.+?)\s+b\s+(?P<stumped_bowler>.+?)",
+    r"lbw\s+b\s+(?P<lbw_bowler>.+?)",
+    r"hit\s+wicket\s+b\s+(?P<hit_wicket_bowler>.+?)",
+    r"b\s+(?P<bowled_bowler>.+?)",
+    r"(?P<run_out>run\s+out)(?:\s*\((?P<run_out_fielders>.*)\))?",
+    r"(?P<not_out>not\s+out|batting)",
+    r"(?P<retired>retired\b.*)",
+    r".*?",
+]
+DISMISSAL_REGEX = r"(?i)^\s*(?:" + "|".join(DISMISSAL_ALTERNATIVES) + r")\s*$"
+DISMISSAL_PATTERN = re.compile(DISMISSAL_REGEX)
+
+KIND_GROUPS = {"caught_and_bowled": "caught_and_bowled_bowler", "caught": "catcher", "stumped": "keeper",
+               "lbw": "lbw_bowler", "hit_wicket": "hit_wicket_bowler", "bowled": "bowled_bowler",
+               "run_out": "run_out", "not_out": "not_out", "retired": "retired"}  # Anything else is "other"
+DISMISSAL_KINDS = list(KIND_GROUPS) + ["other"]
+BOWLER_GROUPS = [f"{kind}_bowler" for kind in ["caught_and_bowled", "caught", "stumped", "lbw", "hit_wicket", "bowled"]]
+FIELDER_GROUPS = ["catcher", "keeper", "run_out_fielders", "caught_and_bowled_bowler"]  # At most one matches
+
+SUBSTITUTE_REGEX = r"(?i)\(\s*sub\s*\)|^\s*sub\b"
+NAME_STRIP_CHARS = " \t()†"
+
+# Fielding columns credited per fielder for each kind of dismissal
+FIELDING_CREDITS = {"caught": "Catches", "caught_and_bowled": "Catches", "stumped": "Stumpings", "run_out": "Run Outs"}
+FIELDING_COLUMNS = ["Catches", "Stumpings", "Run Outs"]
+
+
+def first_match(groups, names):
+    """Per row, the first of the named capture groups that matched (NaN when none did)"""
+    found = groups[names[0]]
+    for name in names[1:]:
+        found = found.fillna(groups[name])
+    return found
+
+
+def extract_groups(uniques):
+    """The pattern's capture groups for each distinct string (missing where a group didn't take part)"""
+    if pc is None:
+        return pd.Series(uniques, dtype=object).str.extract(DISMISSAL_PATTERN)
+    matches = pc.extract_regex(uniques, DISMISSAL_REGEX)
+    # RE2 gives "" for a group that didn't take part; make it missing, as re does
+    empty = pa.scalar(None, pa.string())
+    return pd.DataFrame({
+        field.name: pd.arrays.ArrowExtensionArray(pc.if_else(pc.equal(matches.field(i), ""), empty, matches.field(i)))
+        for i, field in enumerate(matches.type)
+    })
+
+
+def match_dismissals(texts):
+    """Match a column of dismissal strings: (capture groups, kinds, codes).
+
+    A season repeats the same dismissal strings ("not out", "b Shabnim Ismail", ...), so the
+    pattern runs once per distinct string; `groups` and `kinds` have one row per distinct
+    string and `codes` maps every row of the column to its string.
+    """
+    texts = pd.Series(texts, dtype=object)
+    if pc is None:
+        codes, uniques = pd.factorize(texts.fillna("").astype(str))
+    else:
+        encoded = pc.dictionary_encode(pc.fill_null(pa.array(texts, type=pa.string(), from_pandas=True), ""))
+        codes, uniques = encoded.indices.to_numpy(zero_copy_only=False), encoded.dictionary
+    groups = extract_groups(uniques)
+    kinds = np.select([groups[group].notna().to_numpy() for group in KIND_GROUPS.values()], list(KIND_GROUPS),
+                      default="other")
+    return groups, kinds, codes
+
+
+def fielder_entries(groups, codes):
+    """One row per named fielder (`fielder`, `substitute`), indexed by the dismissal's row.
+
+    Run-out pairs are split, and substitute markers are flagged and stripped.
+    """
+    entries = first_match(groups, FIELDER_GROUPS).str.split("/").explode().dropna()
+    substitutes = entries.str.contains(SUBSTITUTE_REGEX).astype(bool)
+    names = entries.str.replace(SUBSTITUTE_REGEX, "", regex=True).str.strip(NAME_STRIP_CHARS)
+    named = (names != "").to_numpy()
+    entry_codes = entries.index.to_numpy()[named]  # Sorted: explode keeps the distinct strings' order
+
+    # Spread each distinct string's entries over the rows that have it, keeping row order
+    per_code = np.bincount(entry_codes, minlength=len(groups))
+    starts = np.concatenate([[0], np.cumsum(per_code)[:-1]])
+    per_row = per_code[codes]
+    rows = np.repeat(np.arange(len(codes)), per_row)
+    offsets = np.arange(len(rows)) - np.repeat(np.cumsum(per_row) - per_row, per_row)
+    positions = starts[codes[rows]] + offsets
+    return pd.DataFrame({"fielder": names[named].array.take(positions),
+                         "substitute": substitutes[named].to_numpy()[positions]}, index=rows)
+
+
+def parse_dismissals(texts):
+    """Parse a column of dismissal strings into records aligned with it.
+
+    Returns a DataFrame with `kind`, `bowler`, `fielders` (tuple of names, in scorecard order),
+    `substitutes` (tuple of flags, one per fielder) and `direct_hit` (a run out by one fielder).
+    """
+    index = pd.Series(texts, dtype=object).index
+    groups, kinds, codes = match_dismissals(texts)
+    kind = kinds[codes]
+    bowler = first_match(groups, BOWLER_GROUPS).str.strip(NAME_STRIP_CHARS).to_numpy()[codes]
+
+    # Gather each dismissal's fielders back into tuples in one pass over the entries
+    entries = fielder_entries(groups, codes)
+    fielders = [[] for _ in range(len(codes))]
+    flags = [[] for _ in range(len(codes))]
+    for row, name, substitute in zip(entries.index, entries["fielder"], entries["substitute"]):
+        fielders[row].append(name)
+        flags[row].append(substitute)
+
+    records = pd.DataFrame({
+        "kind": kind,
+        "bowler": bowler,
+        "fielders": pd.Series([tuple(names) for names in fielders], dtype=object),
+        "substitutes": pd.Series([tuple(values) for values in flags], dtype=object),
+        "direct_hit": (kind == "run_out") & (np.bincount(entries.index, minlength=len(codes)) == 1),
+    })
+    records.index = index
+    return records
+
+
+def fielding_credits(texts):
+    """One row per credited fielder (`Player`, `credit`), indexed by the dismissal's row.
+
+    Catches (caught and bowled included), stumpings, and a run out for each fielder named.
+    Substitutes aren't in the XI, so they score nothing.
+    """
+    groups, kinds, codes = match_dismissals(texts)
+    entries = fielder_entries(groups, codes)
+    rows = entries.index.to_numpy()
+    credit = np.select([kinds == kind for kind in FIELDING_CREDITS], list(FIELDING_CREDITS.values()), default="")
+    credit = credit[codes[rows]]
+    keep = (credit != "") & ~entries["substitute"].to_numpy()
+    return pd.DataFrame({"Player": entries["fielder"].array[keep], "credit": credit[keep]}, index=rows[keep])
+
+
+def fielding_frame(df_batting, df_bowling):
+    """Fielding rows (Player, Catches, Stumpings, Run Outs, Innings, Team, Match_ID) for every match in the frames.
+
+    Fielders are credited from the batting rows' dismissals (see `fielding_credits`); the team
+    is the side that bowled that innings.
+    """
+    columns = ["Player"] + FIELDING_COLUMNS + ["Innings", "Team", "Match_ID"]
+    if "Dismissal" not in df_batting or df_batting.empty:
+        return pd.DataFrame({column: pd.Series(dtype=object) for column in columns})
+
+    credited = fielding_credits(df_batting["Dismissal"].astype(object))
+    rows = credited.index.to_numpy()
+    involved = pd.DataFrame({
+        "Match_ID": df_batting["Match_ID"].astype(str).to_numpy()[rows],
+        "Innings": df_batting["Innings"].to_numpy()[rows],
+        "Player": credited["Player"].to_numpy(),
+        "credit": credited["credit"].to_numpy(),
+    })
+    credits = (involved.groupby(["Match_ID", "Innings", "Player", "credit"], sort=False).size()
+               .unstack("credit", fill_value=0).reindex(columns=FIELDING_COLUMNS, fill_value=0).reset_index())
+    bowling_sides = pd.DataFrame({
+        "Match_ID": df_bowling["Match_ID"].astype(str).to_numpy(),
+        "Innings": df_bowling["Innings"].to_numpy(),
+        "Team": df_bowling["Team"].astype(object).to_numpy(),
+    }).drop_duplicates(["Match_ID", "Innings"])
+    credits = credits.merge(bowling_sides, on=["Match_ID", "Innings"], how="left")
+    return credits[columns]
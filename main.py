@@ -1,53 +1,216 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import pandas as pd
+import numpy as np
 import re
+import difflib
 import time
+from collections import deque
 from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
 from urllib3.util.retry import Retry
-from supabase import create_client, Client
+from storage import STORAGE_BACKEND, SQLITE_PATH, open_storage
+from dismissals import FIELDING_COLUMNS, FIELDING_CREDITS, fielding_frame, parse_dismissals
+from match_records import BUFFERED_KINDS, RECORD_SCHEMAS, MatchRecords
+from stats_archive import STATS_ARCHIVE_DIR, archive_match, archived_matches, load_match_stats, series_key
+import simulator
 from dotenv import load_dotenv
 import os
+import json
+import zlib
+import hashlib
+import sqlite3
+import threading
+import functools
+import contextlib
+import multiprocessing
+import argparse
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
 
 # Load environment variables
 load_dotenv()
 
-# Debugging: Print environment variable status (without exposing secrets)
-print("Environment variables:", {
-    "supabase_url": os.getenv("SUPABASE_URL"),
-    "has_service_key": bool(os.getenv("SUPABASE_SERVICE_KEY"))  # Check if the key exists without printing it
-})
-
-# Ensure required environment variables are set
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
-
-if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-    raise ValueError("Missing required environment variables: SUPABASE_URL or SUPABASE_SERVICE_KEY")
-
-# Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-
-print("Supabase client initialized successfully!")
-
+# Database access goes through a storage backend (Supabase by default, or a local SQLite file);
+# the Supabase client is only created once something is read or written
+storage = open_storage()
+
+
+def configure_storage(backend=None, sqlite_path=None):
+    """Switch the storage backend (e.g. from --storage/--sqlite-path) before anything is read or written"""
+    global storage
+    storage = open_storage(backend, sqlite_path)
+    print(f"🗄️ Storage backend: {storage.name}" + (f" ({storage.path})" if storage.name == "sqlite" else ""))
+    return storage
+
+# Run telemetry: stage timers and counters, written out as JSON and a Prometheus textfile at exit
+METRICS_JSON_PATH = os.getenv("METRICS_JSON_PATH", ".cache/metrics/run_summary.json")
+METRICS_PROM_PATH = os.getenv("METRICS_PROM_PATH", ".cache/metrics/scraper.prom")
+
+# First matching URL fragment names the endpoint type a request is counted under
+ENDPOINT_TYPES = [
+    ("/api/html/cricket-scorecard/", "scorecard"),
+    ("/full-commentary/", "commentary"),
+    ("/cricket-match-highlights/", "highlights"),
+    ("/profiles/", "profile"),
+    ("/cricket-scores/", "match_page"),
+    ("/cricket-series/", "series"),
+]
+
+def endpoint_type(url):
+    """Classify a Cricbuzz URL for the per-endpoint request counters"""
+    for fragment, name in ENDPOINT_TYPES:
+        if fragment in url:
+            return name
+    return "other"
+
+class RunMetrics:
+    """Thread-safe counters and stage timers for one scraper run (stages may nest)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.counters = {}  # (name, sorted label items) -> value
+        self.stages = {}  # stage -> {"calls", "seconds", "max_seconds"}
+
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def record_stage(self, stage, seconds):
+        with self.lock:
+            timing = self.stages.setdefault(stage, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+            timing["calls"] += 1
+            timing["seconds"] += seconds
+            timing["max_seconds"] = max(timing["max_seconds"], seconds)
+
+    @contextlib.contextmanager
+    def stage(self, stage):
+        """Record the wall time of the `with` block under `stage`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.perf_counter() - start)
+
+    def timed(self, stage):
+        """Decorator recording the wall time of every call under `stage`"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def total(self, name):
+        """Sum of one counter over all its labels"""
+        return sum(value for (counter, _), value in self.counters.items() if counter == name)
+
+    def totals(self, name, label):
+        """{label value: total} for one counter"""
+        result = {}
+        for (counter, labels), value in self.counters.items():
+            if counter == name:
+                key = dict(labels).get(label)
+                result[key] = result.get(key, 0) + value
+        return result
+
+metrics = RunMetrics()
+
+# Batched writes: rows are collected and upserted in chunks on each table's natural key
+WRITE_CHUNK_SIZE = int(os.getenv("WRITE_CHUNK_SIZE", "500"))
+WRITE_RETRIES = int(os.getenv("WRITE_RETRIES", "3"))
+
+class BatchWriter:
+    """Collect rows for one storage table and upsert them in sized chunks with per-chunk retries"""
+
+    def __init__(self, table, on_conflict, chunk_size=WRITE_CHUNK_SIZE, retries=WRITE_RETRIES):
+        self.table = table
+        self.on_conflict = on_conflict
+        self.key_columns = on_conflict.split(",")
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.rows = {}  # natural key -> row (a later row for the same key replaces the earlier one)
+        self.stats = {"written": 0, "skipped": 0, "failed": 0}
+
+    def add(self, rows):
+        """Queue rows for the next flush"""
+        for row in rows:
+            key = tuple(row[column] for column in self.key_columns)
+            if key in self.rows:
+                self.stats["skipped"] += 1
+            self.rows[key] = row
+
+    def flush(self):
+        """Upsert every queued row and return the running written/skipped/failed counts"""
+        with metrics.stage(f"flush_{self.table}"):
+            return self._flush()
+
+    def since(self, before):
+        """Counts since `before`, a copy of `stats` taken earlier (one call's share of the running totals)"""
+        return {key: self.stats[key] - before[key] for key in self.stats}
+
+    def _flush(self):
+        rows = list(self.rows.values())
+        self.rows = {}
+        for start in range(0, len(rows), self.chunk_size):
+            chunk = rows[start:start + self.chunk_size]
+            if self._upsert(chunk):
+                self.stats["written"] += len(chunk)
+                metrics.count("rows_written", len(chunk), table=self.table)
+                continue
+            # Isolate the bad rows so one of them can't sink the rest of the chunk
+            print(f"⚠️ Chunk of {len(chunk)} {self.table} rows failed, retrying row by row...")
+            for row in chunk:
+                if self._upsert([row], retries=1):
+                    self.stats["written"] += 1
+                    metrics.count("rows_written", table=self.table)
+                else:
+                    self.stats["failed"] += 1
+                    metrics.count("rows_failed", table=self.table)
+                    print(f"❌ Failed to write {self.table} row {row}")
+        return self.stats
+
+    def _upsert(self, rows, retries=None):
+        """Upsert one chunk, retrying with backoff; True if it was written"""
+        retries = self.retries if retries is None else retries
+        for attempt in range(retries):
+            try:
+                metrics.count("db_requests", table=self.table)
+                storage.upsert(self.table, rows, on_conflict=self.on_conflict)
+                return True
+            except Exception as e:
+                print(f"❌ Error upserting into {self.table} (attempt {attempt + 1}/{retries}): {e}")
+            if attempt + 1 < retries:
+                time.sleep(2 ** attempt)
+        return False
+
+match_writer = BatchWriter("matches", on_conflict="id")
+points_writer = BatchWriter("player_points", on_conflict="match_id,player_name")
+
+# IDs already in the matches table, loaded once by `load_existing_match_ids`
+existing_match_ids = set()
+
+def load_existing_match_ids():
+    """Fetch the IDs of every match already stored"""
+    existing_match_ids.clear()
+    existing_match_ids.update(storage.existing_match_ids())
+    return existing_match_ids
+
+@metrics.timed("insert_match")
 def insert_match(match_id, match_date, teams, venue, result, scorecard_url):
-    """Insert match details into Supabase matches table, but only if it doesn't already exist."""
-
-    # ✅ 1. Check if the match already exists in the database
-    response = supabase.table("matches").select("id").eq("id", match_id).execute()
+    """Queue match details for the matches table once the match's points are written."""
 
-    if hasattr(response, "data") and response.data:
-        print(f"⚠️ Match {match_id} already exists in database. Skipping insert.")
-        return  # Skip inserting duplicate matches
-
-    # ✅ 2. Skip inserting matches with no result
+    # ✅ 1. Skip inserting matches with no result
     if not result or result == "Result Pending":
         print(f"⚠️ Match {match_id} result is pending. Skipping insert.")
         return  # Skip matches without a result
 
-    # ✅ 3. Prepare match data for insertion
-    match_data = {
+    # ✅ 2. Queue the match record; `match_writer.flush()` upserts all of them together
+    match_writer.add([{
         "id": match_id,
         "match_date": match_date,
         "teams": teams,
@@ -55,21 +218,175 @@ def insert_match(match_id, match_date, teams, venue, result, scorecard_url):
         "result": result,
         "scorecard_url": scorecard_url,  # Include the scorecard URL
         "processed": True  # Mark match as processed
-    }
+    }])
 
-    # ✅ 4. Insert match record into Supabase (only if it's new)
-    response = supabase.table("matches").upsert([match_data]).execute()
+# Run manifest: how far each match got (listed -> fetched -> parsed -> scored -> written) and a
+# digest of the scorecard it was built from, so reruns resume unfinished matches and pick up corrections.
+# A completed match whose scorecard has no player rows (abandoned) ends at `empty` instead of `written`.
+MANIFEST_STAGES = ["listed", "fetched", "parsed", "scored", "written", "empty"]
+DONE_STAGES = ("written", "empty")
+MANIFEST_RECHECK_DAYS = float(os.getenv("MANIFEST_RECHECK_DAYS", "3"))  # Written matches played this recently are refetched
 
-    # ✅ 5. Handle response
-    if hasattr(response, "status") and response.status >= 400:
-        print(f"❌ Error inserting match {match_id}: {response}")
-    elif hasattr(response, "data") and response.data:
-        print(f"✅ Match {match_id} inserted successfully into database.")
-    else:
-        print(f"⚠️ Unknown response format: {response}")
+def scorecard_digest(scorecard_html):
+    """Content hash of a scorecard page"""
+    return hashlib.sha1(scorecard_html.encode("utf-8")).hexdigest()
 
+def recently_played(match):
+    """Whether a listed match was played within the last MANIFEST_RECHECK_DAYS"""
+    try:
+        played = datetime.strptime(match.get("match_date") or "", "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return False
+    return (datetime.now(timezone.utc) - played).total_seconds() <= MANIFEST_RECHECK_DAYS * 24 * 3600
+
+class RunManifest:
+    """Each match's furthest stage and scorecard digest, kept in the match_manifest table.
+
+    A match is only done once its points are written; the matches row is written with them.
+    Matches that stopped short are picked up again, and when the scorecard is the one a stopped
+    run already parsed, its rows come back from the stats archive instead of being scraped again.
+    Written matches played within MANIFEST_RECHECK_DAYS are refetched and reprocessed only if
+    the scorecard changed. Matches parsed without any player rows are finished as `empty`, with
+    the same recheck.
+    """
+
+    COLUMNS = ["match_id", "series", "stage", "content_hash", "updated_at"]
+
+    def __init__(self):
+        self.entries = None  # match_id -> manifest row
+        self.listed = {}  # match_id -> this run's listing entry
+        self.corrected = set()  # Written matches whose scorecard has changed since
+        self.empty = set()  # Matches parsed this run without player rows, finished by `complete_empty`
+        self.writer = BatchWriter("match_manifest", on_conflict="match_id")
+        self.writable = True  # False when the table could not be read; marks then stay in memory
+        self.lock = threading.Lock()
+
+    def load(self):
+        if self.entries is not None:
+            return self.entries
+        with metrics.stage("load_match_manifest"):
+            try:
+                rows = fetch_all_rows("match_manifest", ", ".join(self.COLUMNS))
+            except Exception as e:
+                print(f"⚠️ Could not read match_manifest ({e}), skipping every stored match this run.")
+                rows = None
+            self.writable = rows is not None
+            self.entries = {str(row["match_id"]): row for row in rows or []}
+            self.adopt_existing()
+        return self.entries
+
+    def adopt_existing(self):
+        """Count matches stored before the manifest existed as written, if they have points
+
+        Without a readable manifest every stored match counts as written, as before it existed.
+        """
+        unknown = load_existing_match_ids() - set(self.entries)
+        if not unknown:
+            return
+        if not self.writable:
+            for match_id in unknown:
+                self.mark(match_id, "written")
+            return
+        scored = {str(row["match_id"]) for row in fetch_all_rows("player_points", "match_id", match_id=sorted(unknown))}
+        for match_id in unknown & scored:
+            self.mark(match_id, "written")
+        self.flush()
+
+    def get(self, match_id):
+        return self.load().get(str(match_id))
+
+    def mark(self, match_id, stage, **fields):
+        """Record that a match reached `stage` (written out by the next flush)"""
+        match_id = str(match_id)
+        entries = self.load()
+        with self.lock:
+            entry = entries.setdefault(match_id, {"match_id": match_id, "series": None, "content_hash": None})
+            entry.update(fields, stage=stage, updated_at=datetime.now(timezone.utc).isoformat())
+            if self.writable:
+                self.writer.add([dict(entry)])
+
+    def flush(self):
+        with self.lock:
+            return self.writer.flush()
+
+    def list(self, matches):
+        """Remember this run's listing and record the matches seen for the first time"""
+        for match in matches:
+            self.listed[str(match["match_id"])] = match
+            if self.get(match["match_id"]) is None:
+                self.mark(match["match_id"], "listed", series=match.get("series"))
+        return self.flush()
+
+    def needs_processing(self, match):
+        """Completed matches that were never written, or were written but played recently enough to recheck"""
+        if match["result"] == "Result Pending":
+            return False
+        entry = self.get(match["match_id"])
+        return entry is None or entry["stage"] not in DONE_STAGES or recently_played(match)
+
+    def plan(self, match_id, content_hash):
+        """What to do with a fetched scorecard: 'unchanged', 'resume' (from the stats archive) or 'parse'"""
+        entry = self.get(match_id)
+        if entry is None or entry["content_hash"] != content_hash:
+            if entry is not None and entry["stage"] == "written":
+                self.corrected.add(str(match_id))
+            return "parse"
+        if entry["stage"] in DONE_STAGES:
+            return "unchanged"
+        return "resume" if entry["stage"] in ("parsed", "scored") else "parse"
+
+    def advance(self, match_ids, stage):
+        for match_id in match_ids:
+            self.mark(match_id, stage)
+        self.flush()
+
+    def parsed(self, match_id, match_data):
+        """Record that a match was parsed, noting it if the scorecard had no player rows"""
+        self.mark(match_id, "parsed")
+        if not len(match_data["batting"]):
+            with self.lock:
+                self.empty.add(str(match_id))
+
+    def complete_empty(self):
+        """Finish the matches parsed without player rows, so later runs don't refetch them"""
+        with self.lock:
+            match_ids, self.empty = sorted(self.empty), set()
+        if not match_ids:
+            return None
+        print(f"⏭️ {len(match_ids)} matches have no player rows (abandoned?); recorded as empty.")
+        return self.complete(match_ids, stage="empty")
+
+    def complete(self, match_ids, stage="written"):
+        """Write the matches rows of matches whose points are written, and mark them `stage`"""
+        before = dict(match_writer.stats)
+        for match_id in match_ids:
+            match = self.listed.get(str(match_id))
+            if match is not None:
+                insert_match(
+                    match_id=str(match_id),
+                    match_date=match["match_date"],
+                    teams=match["teams"],
+                    venue=match["venue"],
+                    result=match["result"],
+                    scorecard_url=f"https://www.cricbuzz.com{match['scorecard_url']}",
+                )
+            self.mark(match_id, stage)
+        match_writer.flush()
+        self.flush()
+        return match_writer.since(before)
+
+    def summary(self):
+        """Matches per stage"""
+        counts = dict.fromkeys(MANIFEST_STAGES, 0)
+        for entry in self.load().values():
+            counts[entry["stage"]] = counts.get(entry["stage"], 0) + 1
+        return counts
+
+run_manifest = RunManifest()
+
+@metrics.timed("insert_player_points")
 def insert_player_points(df_player_points):
-    """Insert player fantasy points into Supabase player_points table."""
+    """Upsert player fantasy points into the player_points table in chunks."""
     
     # Convert numeric columns to float (to match the updated Supabase schema)
     numeric_columns = ["batting_points", "bowling_points", "fielding_points", "potm_points"]
@@ -78,23 +395,189 @@ def insert_player_points(df_player_points):
     # Remove 'total_points' before inserting (since it's auto-calculated)
     records = df_player_points.drop(columns=["total_points"], errors="ignore").to_dict(orient="records")
 
-    response = supabase.table("player_points").insert(records).execute()
+    before = dict(points_writer.stats)
+    points_writer.add(records)
+    points_writer.flush()
+    stats = points_writer.since(before)
+    print(f"✅ player_points: {stats['written']} written, {stats['skipped']} skipped, {stats['failed']} failed.")
+    return stats
 
-    if hasattr(response, "status") and response.status >= 400:
-        print(f"❌ Error inserting player points: {response}")
-    elif hasattr(response, "data") and response.data:
-        print("✅ Player points inserted successfully.")
-    else:
-        print(f"⚠️ Unknown response format: {response}")
-
-# Initialize empty DataFrames for all matches
-all_batting_data = []
-all_bowling_data = []
-all_fielding_data = []
-all_potm_data = []
+# Parsed rows of every match in the run, built into one DataFrame per kind when scoring
+run_records = MatchRecords()
 
 SERIES_URL = 'https://www.cricbuzz.com/cricket-series/9351/womens-premier-league-2025/matches'
 
+# Scorecard parsing: lxml is much faster than html.parser but optional
+try:
+    import lxml  # noqa: F401
+    SCORECARD_PARSER = "lxml"
+except ImportError:
+    SCORECARD_PARSER = "html.parser"
+
+# Only the innings blocks of a scorecard page are built into a tree
+SCORECARD_STRAINER = SoupStrainer('div', class_='cb-col cb-col-100 cb-ltst-wgt-hdr')
+
+# Concurrency settings (overridable from the command line, see `--workers` / `--sequential`)
+MATCH_WORKERS = int(os.getenv("MATCH_WORKERS", "4"))  # Matches processed at the same time
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))  # Profile/highlights/POTM pages fetched at the same time
+SEQUENTIAL = os.getenv("SCRAPER_SEQUENTIAL", "0") == "1"  # Fall back to the original one-at-a-time loop
+PARSE_PROCESSES = int(os.getenv("PARSE_PROCESSES", "0"))  # HTML parsing processes (0 = parse on the fetching thread)
+
+# HTTP response cache (on disk, revalidated with ETag / Last-Modified)
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", ".cache/http_cache.sqlite")
+HTTP_CACHE_MAX_MB = float(os.getenv("HTTP_CACHE_MAX_MB", "200"))
+HTTP_CACHE_MAX_AGE = float(os.getenv("HTTP_CACHE_MAX_AGE", "0"))  # Seconds a response is reused without revalidating
+HTTP_REPLAY = os.getenv("HTTP_REPLAY", "0") == "1"  # Serve only from the cache, never touch the network (`--replay`)
+
+class HTTPResponseCache:
+    """SQLite store of GET responses (zlib-compressed bodies) with a size cap and LRU eviction"""
+
+    def __init__(self, path, max_bytes):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "evicted": 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS http_cache ("
+            "url TEXT PRIMARY KEY, status INTEGER NOT NULL, headers TEXT NOT NULL, body BLOB NOT NULL, "
+            "etag TEXT, last_modified TEXT, size INTEGER NOT NULL, stored_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, url):
+        """Return the cached entry for `url` as a dict (None if absent) and mark it recently used"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body, etag, last_modified, stored_at FROM http_cache WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE http_cache SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        return {
+            "status": row[0],
+            "headers": json.loads(row[1]),
+            "body": zlib.decompress(row[2]),
+            "etag": row[3],
+            "last_modified": row[4],
+            "stored_at": row[5],
+        }
+
+    def put(self, url, response):
+        """Store a 200 response and evict least recently used entries beyond the size cap"""
+        body = zlib.compress(response.content)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, response.status_code, json.dumps(dict(response.headers)), body,
+                 response.headers.get("ETag"), response.headers.get("Last-Modified"), len(body), now, now)
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+            if total > self.max_bytes:
+                for evict_url, size in self._conn.execute(
+                    "SELECT url, size FROM http_cache WHERE url != ? ORDER BY last_access ASC", (url,)
+                ).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    self._conn.execute("DELETE FROM http_cache WHERE url = ?", (evict_url,))
+                    total -= size
+                    self.stats["evicted"] += 1
+            self._conn.commit()
+
+    def count(self, stat):
+        """Add one to a run counter (the adapter calls this from every worker thread)"""
+        with self._lock:
+            self.stats[stat] += 1
+
+    def touch(self, url):
+        """Reset the freshness clock of an entry the server confirmed is unchanged"""
+        with self._lock:
+            self._conn.execute("UPDATE http_cache SET stored_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """Retrying adapter that answers GETs from the response cache, using conditional requests to revalidate"""
+
+    def __init__(self, cache, replay=False, max_age=0, **kwargs):
+        self.cache = cache
+        self.replay = replay
+        self.max_age = max_age
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        endpoint = endpoint_type(request.url)
+        metrics.count("http_requests", endpoint=endpoint)
+        if request.method != "GET" or self.cache is None:
+            return self._send_network(request, endpoint, **kwargs)
+
+        entry = self.cache.get(request.url)
+        if self.replay:
+            if entry is None:
+                self.cache.count("misses")
+                metrics.count("http_errors", endpoint=endpoint)
+                raise requests.exceptions.ConnectionError(f"Not in HTTP cache (replay mode): {request.url}", request=request)
+            self.cache.count("hits")
+            metrics.count("http_cache_hits", endpoint=endpoint)
+            return self._cached_response(request, entry)
+
+        if entry is not None and time.time() - entry["stored_at"] < self.max_age:
+            self.cache.count("hits")
+            metrics.count("http_cache_hits", endpoint=endpoint)
+            return self._cached_response(request, entry)
+
+        if entry is not None:
+            if entry["etag"]:
+                request.headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request.headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self._send_network(request, endpoint, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            self.cache.touch(request.url)
+            self.cache.count("revalidated")
+            metrics.count("http_revalidated", endpoint=endpoint)
+            return self._cached_response(request, entry)
+
+        self.cache.count("misses")
+        if response.status_code == 200:
+            self.cache.put(request.url, response)
+        return response
+
+    def _send_network(self, request, endpoint, **kwargs):
+        """Send over the network, counting retries, errors and bytes per endpoint type"""
+        try:
+            response = super().send(request, **kwargs)
+        except requests.exceptions.RequestException:
+            metrics.count("http_errors", endpoint=endpoint)
+            raise
+        metrics.count("http_network_requests", endpoint=endpoint)
+        retries = getattr(response.raw, "retries", None)
+        if retries is not None and retries.history:
+            metrics.count("http_retries", len(retries.history), endpoint=endpoint)
+        if not kwargs.get("stream"):
+            metrics.count("http_bytes", len(response.content), endpoint=endpoint)
+        return response
+
+    def _cached_response(self, request, entry):
+        """Rebuild a `requests.Response` from a cache entry"""
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["body"]
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.from_cache = True
+        return response
+
+http_cache = HTTPResponseCache(HTTP_CACHE_PATH, max_bytes=HTTP_CACHE_MAX_MB * 1024 * 1024)
+
 # Configure session with retries
 session = requests.Session()
 retry_strategy = Retry(
@@ -102,13 +585,157 @@ retry_strategy = Retry(
     backoff_factor=2,
     status_forcelist=[429, 500, 502, 503, 504],
 )
-adapter = HTTPAdapter(max_retries=retry_strategy)
-session.mount("https://", adapter)
-session.mount("http://", adapter)
-
-from datetime import datetime, timezone
 
-from datetime import datetime, timezone
+def mount_adapter():
+    """Mount the caching, retrying adapter with a connection pool large enough for every worker thread"""
+    pool_size = 1 if SEQUENTIAL else MATCH_WORKERS + FETCH_WORKERS
+    adapter = CachingHTTPAdapter(
+        http_cache, replay=HTTP_REPLAY, max_age=HTTP_CACHE_MAX_AGE,
+        max_retries=retry_strategy, pool_connections=pool_size, pool_maxsize=pool_size,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+mount_adapter()
+
+# Shared pool for player-level fetches; created by `configure_concurrency` unless running sequentially
+fetch_executor = None
+parse_executor = None
+
+def configure_concurrency(match_workers=None, fetch_workers=None, sequential=None, replay=None, parse_processes=None):
+    """Apply worker counts / sequential / replay mode and (re)create the shared fetch and parse pools"""
+    global MATCH_WORKERS, FETCH_WORKERS, SEQUENTIAL, HTTP_REPLAY, PARSE_PROCESSES, fetch_executor, parse_executor
+
+    if match_workers is not None:
+        MATCH_WORKERS = max(1, match_workers)
+    if fetch_workers is not None:
+        FETCH_WORKERS = max(1, fetch_workers)
+    if sequential is not None:
+        SEQUENTIAL = sequential
+    if replay is not None:
+        HTTP_REPLAY = replay
+    if parse_processes is not None:
+        PARSE_PROCESSES = max(0, parse_processes)
+
+    if fetch_executor is not None:
+        fetch_executor.shutdown(wait=True)
+    fetch_executor = None if SEQUENTIAL else ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="fetch")
+
+    if parse_executor is not None:
+        parse_executor.shutdown(wait=True)
+    # Spawned (not forked) workers: the parent already runs fetch threads and holds sqlite handles
+    parse_executor = None if SEQUENTIAL or not PARSE_PROCESSES else ProcessPoolExecutor(
+        max_workers=PARSE_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+    mount_adapter()
+
+def run_concurrently(func, items):
+    """Apply `func` to every item on the shared fetch pool, returning results in input order"""
+    items = list(items)
+    if fetch_executor is None or len(items) < 2:
+        return [func(item) for item in items]
+    return list(fetch_executor.map(func, items))
+
+def parse_html(parser, *args):
+    """Run a pure HTML parser on the process pool when one is configured, otherwise inline.
+
+    Fetching stays on the calling thread; only the page text goes to the worker and only the
+    parser's plain result (lists, dicts, strings, ints) comes back.
+    """
+    with metrics.stage(parser.__name__):
+        if parse_executor is None:
+            return parser(*args)
+        return parse_executor.submit(parser, *args).result()
+
+# Player profile cache (names keyed by Cricbuzz player ID, kept across runs)
+PROFILE_CACHE_PATH = os.getenv("PROFILE_CACHE_PATH", ".cache/player_profiles.sqlite")
+PROFILE_CACHE_TTL_DAYS = float(os.getenv("PROFILE_CACHE_TTL_DAYS", "30"))
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "5000"))
+
+class PlayerProfileCache:
+    """SQLite-backed player name cache with TTL expiry, LRU eviction and in-run request collapsing"""
+
+    def __init__(self, path, ttl_seconds, max_entries):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._inflight = {}  # player_id -> Future for the fetch currently running
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS player_profiles ("
+            "player_id TEXT PRIMARY KEY, full_name TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_name(self, player_id, profile_url):
+        """Return the name for `player_id`, downloading `profile_url` at most once per ID"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT full_name, fetched_at FROM player_profiles WHERE player_id = ?", (player_id,)
+            ).fetchone()
+            if row and now - row[1] < self.ttl_seconds:
+                self.hits += 1
+                self._conn.execute("UPDATE player_profiles SET last_access = ? WHERE player_id = ?", (now, player_id))
+                self._conn.commit()
+                return row[0]
+
+            pending = self._inflight.get(player_id)
+            if pending is not None:
+                # Another thread is already fetching this profile, share its result
+                self.hits += 1
+                is_owner = False
+            else:
+                self.misses += 1
+                pending = self._inflight[player_id] = Future()
+                is_owner = True
+
+        if not is_owner:
+            return pending.result()
+
+        full_name = None
+        try:
+            full_name = download_profile_name(profile_url)
+        finally:
+            with self._lock:
+                if full_name:
+                    self._store(player_id, full_name)
+                del self._inflight[player_id]
+            pending.set_result(full_name)
+        return full_name
+
+    def _store(self, player_id, full_name):
+        """Persist a resolved name and evict the least recently used entries over the cap"""
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO player_profiles (player_id, full_name, fetched_at, last_access) VALUES (?, ?, ?, ?)",
+            (player_id, full_name, now, now)
+        )
+        self._conn.execute(
+            "DELETE FROM player_profiles WHERE player_id IN ("
+            "SELECT player_id FROM player_profiles ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+        self._conn.commit()
+
+    def stats(self):
+        """Return hit/miss counters for the current run"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+profile_cache = PlayerProfileCache(
+    PROFILE_CACHE_PATH,
+    ttl_seconds=PROFILE_CACHE_TTL_DAYS * 24 * 3600,
+    max_entries=PROFILE_CACHE_MAX_ENTRIES,
+)
 
 def extract_match_date(match_div):
     """Extract match date from the `timestamp` attribute inside `.schedule-date[timestamp]`."""
@@ -142,8 +769,9 @@ def extract_match_date(match_div):
         print(f"❌ Raw timestamp: {timestamp_attr}")
         return None  # Return None if conversion fails
 
+@metrics.timed("get_scorecard_urls")
 def get_scorecard_urls(url):
-    """Fetch match details and insert into Supabase before returning scorecard URLs."""
+    """Fetch the series listing and return its matches' details (the matches rows are written with their points)."""
     scorecard_urls = []
 
     # Fetch the page content
@@ -152,7 +780,7 @@ def get_scorecard_urls(url):
         page_content = response.text
     else:
         print(f"Failed to retrieve the page. Status code: {response.status_code}")
-        exit()
+        return []
 
     # Parse the HTML content
     soup = BeautifulSoup(page_content, 'html.parser')
@@ -169,9 +797,10 @@ def get_scorecard_urls(url):
     # Check if no matches were found
     if not match_divs:
         print("\n❌ ERROR: No match divs found! The structure of the website might have changed.")
-        exit()
+        return []
 
     matches = []
+    series = series_key(url)  # Archive partition for the matches of this listing
 
     for match_div in match_divs:
         # Extract match details
@@ -204,30 +833,18 @@ def get_scorecard_urls(url):
             print(f"⚠️ WARNING: No valid date found for match `{match_info['match_title']}`, using fallback.")
             match_date = "1970-01-01T00:00:00Z"  # Set a clear fallback date instead of NULL
 
-        if match_info['scorecard_url']:  # Ensure URL exists before processing
-            match_id = match_info['scorecard_url'].split("/")[-2]
-        else:
+        if not match_info['scorecard_url']:  # Ensure URL exists before processing
             print(f"Skipping match due to missing scorecard URL: {match_info['match_title']}")
             continue  # Skip this match
 
         # Extract teams from match title (Only take text before the first comma)
         match_title = match_info['match_title'].split(",")[0]  # Take only text before the first comma
-        teams = match_title.split(" vs ") if " vs " in match_title else ["Unknown", "Unknown"]
         match_info['teams'] = match_title.split(" vs ") if " vs " in match_title else ["Unknown", "Unknown"]
+        match_info['series'] = series
 
-        # Store extracted match info
+        # Store extracted match info (the matches row is written with the match's points, see RunManifest)
         matches.append(match_info)
 
-        # Insert match into Supabase
-        insert_match(
-            match_id=match_id,
-            match_date=match_date,
-            teams=teams,
-            venue=match_info['venue'],
-            result=match_info['result'],
-            scorecard_url=f"https://www.cricbuzz.com{match_info['scorecard_url']}"
-        )
-
     # Output the extracted match information
     for match in matches:
         print(f"Match: {match.get('match_title', 'N/A')}")
@@ -243,6 +860,7 @@ def extract_match_id(scorecard_url):
     """Extract match_id from the scorecard URL"""
     return scorecard_url.split("/")[-2]
 
+@metrics.timed("fetch_scorecard")
 def fetch_scorecard(match_id):
     """Fetch scorecard HTML from Cricbuzz API with retry handling"""
     api_url = f"https://www.cricbuzz.com/api/html/cricket-scorecard/{match_id}"
@@ -250,11 +868,9 @@ def fetch_scorecard(match_id):
         response = session.get(api_url, timeout=10)
         response.raise_for_status()
         
-        # Check if scorecard contains valid content
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
         # Look for an indication that the scorecard is not available
-        if not soup.find('div', class_='cb-col cb-col-100 cb-ltst-wgt-hdr'):
+        # (a plain substring check, the HTML is only parsed once in `extract_scorecard`)
+        if 'cb-col cb-col-100 cb-ltst-wgt-hdr' not in response.text:
             print(f"Scorecard not available yet for Match ID {match_id}. Skipping...")
             return None
 
@@ -263,295 +879,465 @@ def fetch_scorecard(match_id):
         print(f"Error fetching scorecard for match {match_id}: {e}")
         return None
 
+def parse_dot_balls(html_content):
+    """Count dot balls on a bowler's highlights page based on specific keywords."""
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    # Find all ball commentary events
+    ball_events = soup.find_all('div', class_='cb-mr-bottom-10 cb-col cb-col-100 cb-events')
+
+    dot_ball_keywords = ["no run", "byes", "leg byes", "out"]
+    dot_ball_count = 0
+
+    for event in ball_events:
+        ball_description = event.find('div', class_='cb-col cb-com-ln cb-col-90')
+        if ball_description:
+            ball_text = ball_description.text.lower()  # Convert to lowercase for case-insensitive matching
+            
+            # Check if any of the dot ball keywords appear
+            if any(keyword in ball_text for keyword in dot_ball_keywords):
+                dot_ball_count += 1
+
+    return dot_ball_count
+
 def count_dot_balls(highlights_url):
     """Fetch the highlights page and count dot balls based on specific keywords."""
     try:
         response = session.get(highlights_url, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        return parse_html(parse_dot_balls, response.text)
 
-        # Find all ball commentary events
-        ball_events = soup.find_all('div', class_='cb-mr-bottom-10 cb-col cb-col-100 cb-events')
-
-        dot_ball_keywords = ["no run", "byes", "leg byes", "out"]
-        dot_ball_count = 0
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching highlights from {highlights_url}: {e}")
+        return None
 
-        for event in ball_events:
-            ball_description = event.find('div', class_='cb-col cb-com-ln cb-col-90')
-            if ball_description:
-                ball_text = ball_description.text.lower()  # Convert to lowercase for case-insensitive matching
-                
-                # Check if any of the dot ball keywords appear
-                if any(keyword in ball_text for keyword in dot_ball_keywords):
-                    dot_ball_count += 1
+COMMENTARY_URL = "https://www.cricbuzz.com/api/cricket-match/{match_id}/full-commentary/{innings}"
 
-        return dot_ball_count
+# "Kerr to Mandhana, 2 runs, ..." -> bowler, batter and the outcome clause
+COMMENTARY_BALL_PATTERN = r"^\s*(?P<bowler>[^,]+?) to (?P<batter>[^,]+?),\s*(?P<outcome>[^.!]*)"
+WICKET_KIND_PATTERN = r"^out\s+(?P<wicket>caught|bowled|lbw|stumped|run out|hit wicket)"
 
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching highlights from {highlights_url}: {e}")
+def fetch_innings_commentary(match_id, innings):
+    """Fetch one innings' ball-by-ball commentary as a list of {'over', 'text'} dicts (None on failure)"""
+    url = COMMENTARY_URL.format(match_id=match_id, innings=innings)
+    try:
+        response = session.get(url, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"Error fetching commentary from {url}: {e}")
         return None
 
-def parse_scorecard(html_content):
-    """Parse batting, bowling, and fielding tables from the scorecard"""
-    soup = BeautifulSoup(html_content, 'html.parser')
+    balls = []
+    for block in data.get("commentary", []):
+        for item in block.get("commentaryList", []):
+            if item.get("overNumber") is None or not item.get("commText"):
+                continue  # Over summaries and general commentary, not a delivery
+            text = item["commText"]
+            # Bold/italic spans are sent as placeholders (e.g. "B0$") with the real text alongside
+            for formats in (item.get("commentaryFormats") or {}).values():
+                for format_id, value in zip(formats.get("formatId", []), formats.get("formatValue", [])):
+                    text = text.replace(format_id, value)
+            balls.append({"over": item["overNumber"], "text": text})
+    return balls
+
+def parse_commentary_events(balls_by_innings):
+    """Turn commentary lines into a compact per-ball event table in one vectorized pass.
+
+    Columns: innings, over, bowler, batter, runs (off the bat), extras, extra_kind
+    ('' / wide / no ball / bye / leg bye) and wicket (dismissal kind or '').
+    """
+    rows = [(innings, ball["over"], ball["text"]) for innings, balls in balls_by_innings.items() for ball in balls]
+    texts = pd.Series([row[2] for row in rows], dtype="object")
+    parsed = texts.str.extract(COMMENTARY_BALL_PATTERN)
+    outcome = parsed["outcome"].fillna("").str.strip().str.lower()
+
+    count = pd.to_numeric(outcome.str.extract(r"(\d+)")[0], errors="coerce")
+    boundary = np.select([outcome.str.contains(r"\bfour\b"), outcome.str.contains(r"\bsix\b")], [4, 6], default=np.nan)
+    scored = count.fillna(pd.Series(boundary, index=outcome.index)).fillna(0).to_numpy()
+
+    extra_kind = np.select(
+        [outcome.str.contains("wide"), outcome.str.contains("no ball"),
+         outcome.str.contains("leg bye"), outcome.str.contains("bye")],
+        ["wide", "no ball", "leg bye", "bye"],
+        default="",
+    )
+    wicket = outcome.str.extract(WICKET_KIND_PATTERN)["wicket"].fillna("")
+
+    is_wide = extra_kind == "wide"
+    is_bye = (extra_kind == "bye") | (extra_kind == "leg bye")
+    runs = np.where(is_wide | is_bye | (wicket != ""), 0, scored)
+    extras = np.select([is_wide | is_bye, extra_kind == "no ball"], [np.maximum(scored, 1), 1], default=0)
+
+    events = pd.DataFrame({
+        "innings": np.array([row[0] for row in rows], dtype="int8"),
+        "over": np.array([row[1] for row in rows], dtype="float32"),
+        "bowler": parsed["bowler"].str.strip().astype("category"),
+        "batter": parsed["batter"].str.strip().astype("category"),
+        "runs": runs.astype("int8"),
+        "extras": extras.astype("int8"),
+        "extra_kind": pd.Categorical(extra_kind),
+        "wicket": pd.Categorical(wicket),
+    })
+    return events.dropna(subset=["bowler"]).reset_index(drop=True)
+
+@metrics.timed("fetch_match_commentary")
+def fetch_match_commentary(match_id, innings_count):
+    """Fetch every innings' commentary once and return the per-ball event table (None if unavailable)"""
+    innings_numbers = list(range(1, innings_count + 1))
+    balls = dict(zip(innings_numbers, run_concurrently(lambda innings: fetch_innings_commentary(match_id, innings), innings_numbers)))
+    balls = {innings: innings_balls for innings, innings_balls in balls.items() if innings_balls}
+    if not balls:
+        return None
+    return parse_commentary_events(balls)
+
+def dots_by_bowler(events):
+    """Dot balls per (innings, lowercased bowler name): legal deliveries with nothing off the bat"""
+    legal = ~events["extra_kind"].isin(["wide", "no ball"])
+    is_dot = legal & (events["runs"] == 0)
+    counts = is_dot.groupby([events["innings"], events["bowler"].str.lower()], observed=True).sum()
+    dots = {}
+    for (innings, bowler), count in counts.items():
+        dots.setdefault(innings, {})[bowler] = int(count)
+    return dots
+
+def commentary_bowler_name(innings_dots, display_name, full_name):
+    """The (lowercased) name commentary uses for a scorecard bowler, or None if it is missing or ambiguous.
+
+    An exact name wins; otherwise the surname/initials variations must all point at one
+    commentary name, so two bowlers sharing a surname never get each other's dots.
+    """
+    display_name = re.sub(r"\s*\((?:c|wk|c & wk)\)\s*$", "", display_name)
+    for name in (display_name, full_name):
+        if name.lower() in innings_dots:
+            return name.lower()
+    hits = {variation.lower() for name in (display_name, full_name) for variation in create_name_variations(name)
+            if variation.lower() in innings_dots}
+    return hits.pop() if len(hits) == 1 else None
+
+def lookup_bowler_dots(innings_dots, display_name, full_name):
+    """Match a scorecard bowler to the (short) name used in commentary and return their dot count"""
+    name = commentary_bowler_name(innings_dots, display_name, full_name)
+    return innings_dots[name] if name is not None else None
+
+def extract_scorecard(html_content):
+    """Parse the innings tables in a single pass without touching the network.
+
+    Only the `cb-ltst-wgt-hdr` innings blocks are built into a tree (everything else in the
+    page is skipped by the strainer), and each block is walked once. Player names are left as
+    profile links and bowlers carry their highlights link; `parse_scorecard` resolves both.
+    Batting rows end with the dismissal text, which fielding credits are derived from later.
+    Returns plain lists/dicts so the result can be cached or sent between processes.
+    """
+    soup = BeautifulSoup(html_content, SCORECARD_PARSER, parse_only=SCORECARD_STRAINER)
 
-    # Extract team names
     team_names = []
-    innings_headers = soup.find_all('div', class_='cb-col cb-col-100 cb-scrd-hdr-rw')
-    for header in innings_headers:
-        team_name = header.text.split('Innings')[0].strip()
-        team_names.append(team_name)
-
-    # Initialize data structures
     batting_tables = []
     bowling_tables = []
-    fielding_stats_by_innings = {1: {}, 2: {}}  # Track fielding stats per innings
-    team_player_mapping = {}  # Add this line to initialize the mapping
-    current_innings = 0  # Add this to track current innings
-
-    # Extract batting tables
-    for table in soup.find_all('div', class_='cb-col cb-col-100 cb-ltst-wgt-hdr'):
-        if "Batter" in table.text or "Batsman" in table.text:  # Identify batting tables for multiple innings
-            current_innings += 1  # Increment innings counter
-            rows = []
-            batting_team = team_names[current_innings - 1]  # Use current_innings instead of innings
-            for row in table.find_all('div', class_='cb-col cb-col-100 cb-scrd-itms'):
+    dnb_sections = []
+    team_player_mapping = {}
+
+    for block in soup.find_all('div', class_='cb-col cb-col-100 cb-ltst-wgt-hdr'):
+        # Team names come from the innings header rows, in page order
+        for header in block.find_all('div', class_='cb-col cb-col-100 cb-scrd-hdr-rw'):
+            team_names.append(header.text.split('Innings')[0].strip())
+
+        # Classify the block from its column header instead of scanning the whole subtree
+        sub_header = block.find('div', class_='cb-scrd-sub-hdr')
+        label = sub_header.text if sub_header else block.text
+        rows = block.find_all('div', class_='cb-col cb-col-100 cb-scrd-itms')
+
+        if "Batter" in label or "Batsman" in label:
+            innings = len(batting_tables) + 1
+            batting_team = team_names[innings - 1]
+            table = []
+            for row in rows:
                 cols = row.find_all('div')
                 if len(cols) >= 7:  # Ensure it's a valid batting row
                     player_name = cols[0].text.strip()
                     team_player_mapping[player_name] = batting_team  # Map player to their team
                     player_link = cols[0].find('a')  # Get player profile link
-                    full_name = fetch_full_name(player_link['href']) if player_link else player_name
-                    
-                    dismissal_info = cols[1].text.strip().lower()  # Get dismissal details
-                    runs = cols[2].text.strip()
-                    balls = cols[3].text.strip()
-                    fours = cols[4].text.strip()
-                    sixes = cols[5].text.strip()
-                    strike_rate = cols[6].text.strip()
-                    
-                    rows.append([full_name, player_name, runs, balls, fours, sixes, strike_rate])
-
-                    # Initialize fielding stats for this innings if not exists
-                    current_fielding_stats = fielding_stats_by_innings[current_innings]
-                    
-                    # Handle caught & bowled dismissals safely
-                    if 'c & b' in dismissal_info:
-                        parts = dismissal_info.split('c & b')
-                    elif 'c and b' in dismissal_info:
-                        parts = dismissal_info.split('c and b')
-                    else:
-                        parts = []
-
-                    if len(parts) > 1:  # Ensure fielder information exists
-                        fielder = parts[1].strip()
-                        current_fielding_stats[fielder] = current_fielding_stats.get(fielder, {"Catches": 0, "Stumpings": 0, "Run Outs": 0})
-                        current_fielding_stats[fielder]["Catches"] += 1
-                    else:
-                        # Handle regular catches: "c Player Name b Bowler Name"
-                        catch_match = re.search(r'c (.*?)\s+(?=b\s+)', dismissal_info)
-                        if catch_match:
-                            fielder = catch_match.group(1).strip()
-                            current_fielding_stats[fielder] = current_fielding_stats.get(fielder, {"Catches": 0, "Stumpings": 0, "Run Outs": 0})
-                            current_fielding_stats[fielder]["Catches"] += 1
-
-                    # Handle stumpings
-                    stumping_match = re.search(r'st (\w+ \w+)', dismissal_info)
-                    if stumping_match:
-                        fielder = stumping_match.group(1).strip()
-                        current_fielding_stats[fielder] = current_fielding_stats.get(fielder, {"Catches": 0, "Stumpings": 0, "Run Outs": 0})
-                        current_fielding_stats[fielder]["Stumpings"] += 1
-
-                    # Handle run outs
-                    runout_match = re.search(r'run out \(([\w\s/]+)\)', dismissal_info)
-                    if runout_match:
-                        fielders = runout_match.group(1).strip().split("/")
-                        for fielder in fielders:
-                            fielder = fielder.strip()
-                            current_fielding_stats[fielder] = current_fielding_stats.get(fielder, {"Catches": 0, "Stumpings": 0, "Run Outs": 0})
-                            current_fielding_stats[fielder]["Run Outs"] += 1
-
-            # After the batting tables extraction, modify the DNB players code:
-            dnb_players = []
-
-            # Find all instances of 'Did not Bat'
-            dnb_sections = [div for div in soup.find_all('div', class_='cb-col cb-col-100 cb-scrd-itms') if 'Did not Bat' in div.text]
-
-            # Check if there are exactly two DNB sections
-            if len(dnb_sections) == 2:
-                for i, dnb_section in enumerate(dnb_sections):
-                    # Determine correct team based on occurrence
-                    batting_team = team_names[i]  # First DNB -> team_names[0], Second DNB -> team_names[1]
-
-                    # Extract player names from DNB section
-                    dnb_links = dnb_section.find_all('a', class_='cb-text-link')
-                    for player_link in dnb_links:
-                        player_name = player_link.text.strip()
-                        if player_name:  # Ensure valid player names
-                            full_name = fetch_full_name(player_link['href'])
-
-                            # Add the player with correct team
-                            dnb_players.append([full_name, player_name, i + 1, batting_team])  # i+1 ensures correct innings
-
-            # Convert DNB players to DataFrame with innings and team information
-            df_dnb = pd.DataFrame(dnb_players, columns=['Full Name', 'Batsman', 'Innings', 'Team']) if dnb_players else pd.DataFrame(columns=['Full Name', 'Batsman', 'Innings', 'Team'])
-            
-            batting_tables.append(rows)
-
-    # Extract bowling tables
-    for table in soup.find_all('div', class_='cb-col cb-col-100 cb-ltst-wgt-hdr'):
-        if "Bowler" in table.text:  # Identify bowling tables
-            rows = []
-            for row in table.find_all('div', class_='cb-col cb-col-100 cb-scrd-itms'):
+                    table.append([
+                        player_link['href'] if player_link else None,
+                        player_name,
+                        cols[2].text.strip(),  # Runs
+                        cols[3].text.strip(),  # Balls
+                        cols[4].text.strip(),  # 4s
+                        cols[5].text.strip(),  # 6s
+                        cols[6].text.strip(),  # SR
+                        cols[1].text.strip(),  # Dismissal
+                    ])
+                elif 'Did not Bat' in row.text:
+                    dnb_sections.append(row)
+            batting_tables.append(table)
+
+        elif "Bowler" in label:
+            table = []
+            for row in rows:
                 cols = row.find_all('div')
                 if len(cols) >= 8:  # Ensure it's a valid bowling row
-                    player_name = cols[0].text.strip()
                     player_link = cols[0].find('a')  # Get player profile link
-                    full_name = fetch_full_name(player_link['href']) if player_link else player_name
-                    
-                    overs = cols[1].text.strip()
-                    maidens = cols[2].text.strip()
-                    runs = cols[3].text.strip()
-                    wickets = cols[4].text.strip()
-                    no_balls = cols[5].text.strip()
-                    wides = cols[6].text.strip()
-                    economy = cols[7].text.strip()
-                    
-                    # Extract the dot ball link if available
-                    dots_link_tag = cols[8].find('a')
-                    dot_ball_link = f"https://www.cricbuzz.com{dots_link_tag['href']}" if dots_link_tag else "N/A"
-
-                    dots = count_dot_balls(dot_ball_link) 
-                    
-                    rows.append([full_name, player_name, overs, maidens, runs, wickets, no_balls, wides, economy, dots])
-            bowling_tables.append(rows)
-
-    # Convert fielding stats to DataFrame format
-    fielding_data = []
-    for innings, stats in fielding_stats_by_innings.items():
-        for fielder, contributions in stats.items():
-            proper_name = ' '.join(word.capitalize() for word in fielder.split())
-            fielding_data.append([
-                proper_name,
-                contributions["Catches"],
-                contributions["Stumpings"],
-                contributions["Run Outs"],
-                innings,  # Add innings number
-                team_names[0] if innings == 2 else team_names[1]  # Add correct bowling team
-            ])
-
-    df_fielding = pd.DataFrame(
-        fielding_data,
-        columns=["Player", "Catches", "Stumpings", "Run Outs", "Innings", "Team"]
-    )
+                    dots_link_tag = cols[8].find('a')  # Highlights page used to count dot balls
+                    table.append([
+                        player_link['href'] if player_link else None,
+                        cols[0].text.strip(),
+                        cols[1].text.strip(),  # Overs
+                        cols[2].text.strip(),  # Maidens
+                        cols[3].text.strip(),  # Runs
+                        cols[4].text.strip(),  # Wickets
+                        cols[5].text.strip(),  # No Balls
+                        cols[6].text.strip(),  # Wides
+                        cols[7].text.strip(),  # Econ
+                        f"https://www.cricbuzz.com{dots_link_tag['href']}" if dots_link_tag else "N/A",
+                    ])
+            bowling_tables.append(table)
+
+    # DNB players are only attributed when both innings have a 'Did not Bat' row
+    dnb_players = []
+    if len(dnb_sections) == 2:
+        for i, dnb_section in enumerate(dnb_sections):
+            for player_link in dnb_section.find_all('a', class_='cb-text-link'):
+                player_name = player_link.text.strip()
+                if player_name:  # Ensure valid player names
+                    dnb_players.append([player_link['href'], player_name, i + 1, team_names[i]])  # i+1 ensures correct innings
+
+    return {
+        "team_names": team_names,
+        "batting_tables": batting_tables,
+        "bowling_tables": bowling_tables,
+        "dnb_players": dnb_players,
+        "team_player_mapping": team_player_mapping,
+    }
 
-    return batting_tables, bowling_tables, df_fielding, team_player_mapping, team_names, df_dnb
+@metrics.timed("parse_scorecard")
+def parse_scorecard(html_content, match_id=None):
+    """Parse the batting and bowling tables (and DNB players) from the scorecard.
+
+    With a `match_id`, dot balls come from the match's ball-by-ball commentary (one request per
+    innings); bowlers it can't account for fall back to their individual highlights page.
+    """
+    scorecard = parse_html(extract_scorecard, html_content)
+    bowling_tables = scorecard["bowling_tables"]
+    resolve_full_names(scorecard)
+    events = fetch_match_commentary(match_id, len(bowling_tables)) if match_id else None
+    fill_dot_balls(bowling_tables, events)
+    return (scorecard["batting_tables"], bowling_tables, scorecard["team_player_mapping"], scorecard["team_names"],
+            scorecard["dnb_players"])
+
+def resolve_full_names(scorecard):
+    """Replace the profile links in an extracted scorecard with full names, in one concurrent batch"""
+    tables = scorecard["batting_tables"] + scorecard["bowling_tables"]
+    dnb_players = scorecard["dnb_players"]
+    profile_links = list(dict.fromkeys(
+        [row[0] for table in tables for row in table if row[0]] + [player[0] for player in dnb_players]
+    ))
+    full_names = dict(zip(profile_links, run_concurrently(fetch_full_name, profile_links)))
+    for table in tables:
+        for row in table:
+            row[0] = full_names[row[0]] if row[0] else row[1]
+    for player in dnb_players:
+        player[0] = full_names[player[0]]
+
+def fill_dot_balls(bowling_tables, events):
+    """Replace each bowling row's highlights link with its dot-ball count.
+
+    Counts come from the commentary events where the bowler can be found there unambiguously;
+    the rest are read from the bowlers' highlights pages in one concurrent batch.
+    """
+    dots = dots_by_bowler(events) if events is not None else {}
+    unresolved_rows = []
+    for innings, table in enumerate(bowling_tables, 1):
+        names = [commentary_bowler_name(dots[innings], row[1], row[0]) if innings in dots else None for row in table]
+        shared = {name for name in names if name is not None and names.count(name) > 1}
+        for row, name in zip(table, names):
+            if name is None or name in shared:  # Two bowlers claiming one commentary name can't be told apart
+                unresolved_rows.append(row)
+            else:
+                row[-1] = dots[innings][name]
+
+    for row, count in zip(unresolved_rows, run_concurrently(count_dot_balls, [row[-1] for row in unresolved_rows])):
+        row[-1] = count
+
+def extract_player_id(player_url):
+    """Extract the Cricbuzz player ID from a `/profiles/<id>/<slug>` link"""
+    return player_url.strip("/").split("/")[1]
+
+def parse_profile_name(html_content):
+    """Return the player name in a profile page's header (None if missing)"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    name_tag = soup.find('h1', class_='cb-font-40')
+    return name_tag.text.strip() if name_tag else None
 
-def fetch_full_name(player_url):
-    """Fetch full player name from their profile page with retry handling"""
-    base_url = "https://www.cricbuzz.com"
-    full_url = base_url + player_url
+def download_profile_name(profile_url):
+    """Download a player profile page and return the name in its header (None if missing)"""
     try:
-        response = session.get(full_url, timeout=10)
+        response = session.get(profile_url, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        name_tag = soup.find('h1', class_='cb-font-40')
-        return name_tag.text.strip() if name_tag else "N/A"
+        return parse_html(parse_profile_name, response.text)
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching player name from {full_url}: {e}")
-        return "N/A"
+        print(f"Error fetching player name from {profile_url}: {e}")
+        return None
+
+def fetch_full_name(player_url):
+    """Fetch full player name from their profile page (served from the profile cache when possible)"""
+    base_url = "https://www.cricbuzz.com"
+    full_name = profile_cache.get_name(extract_player_id(player_url), base_url + player_url)
+    return full_name if full_name else "N/A"
     
 def fetch_player_name_from_cricbuzz(player_id):
     """Fetch the correct player name from Cricbuzz using player_id."""
     url = f"https://www.cricbuzz.com/profiles/{player_id}"
-    try:
-        response = session.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        name_tag = soup.find('h1', class_='cb-font-40')
-        return name_tag.text.strip() if name_tag else None
-    except requests.RequestException as e:
-        print(f"Error fetching player name for ID {player_id}: {e}")
-        return None
+    return profile_cache.get_name(str(player_id), url)
+
+def parse_potm(html_content):
+    """Return (player name, player ID) of the Player of the Match on a match page, or None"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    potm_div = soup.find('div', class_='cb-col cb-col-50 cb-mom-itm')
+    if potm_div:
+        player_link = potm_div.find('a', class_='cb-link-undrln')
+        if player_link:
+            return player_link.text.strip(), player_link['href'].split('/')[-2]
+    return None
 
 def extract_potm(match_url):
-    """Extract Player of the Match information from the match page"""
+    """Extract Player of the Match information from the match page as a POTM row (None if there is none)"""
     try:
         response = session.get(match_url, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        potm_div = soup.find('div', class_='cb-col cb-col-50 cb-mom-itm')
-        if potm_div:
-            player_link = potm_div.find('a', class_='cb-link-undrln')
-            if player_link:
-                player_name = player_link.text.strip()
-                player_id = player_link['href'].split('/')[-2]
-                return pd.DataFrame([{'Match_ID': match_url.split('/')[-2], 'Player_Name': player_name, 'Player_ID': player_id}])
+        potm = parse_html(parse_potm, response.text)
+        if potm:
+            player_name, player_id = potm
+            return {'Match_ID': match_url.split('/')[-2], 'Player_Name': player_name, 'Player_ID': player_id}
     except requests.exceptions.RequestException as e:
         print(f"Error fetching POTM data from {match_url}: {e}")
     return None
 
-def process_match(scorecard_url, match_index, total_matches):
-    """Process a single match and append its data to global lists with progress tracking"""
+@metrics.timed("process_match")
+def process_match(scorecard_url, match_index, total_matches, series=None):
+    """Fetch and parse a single match, returning its MatchRecords (None if the scorecard is unavailable or unchanged)"""
     match_id = extract_match_id(scorecard_url)
     print(f"Processing match {match_index + 1} of {total_matches}: Match ID {match_id}")
     scorecard_html = fetch_scorecard(match_id)
     
     if not scorecard_html:  # Skip if scorecard is unavailable
-        return
+        return None
 
-    if scorecard_html:
-        batting_data, bowling_data, df_fielding, team_player_mapping, team_names, df_dnb = parse_scorecard(scorecard_html)
-
-        # Process Batting Data
-        all_batters = []
-        for innings, batting_table in enumerate(batting_data, 1):
-            df = pd.DataFrame(batting_table, columns=["Full Name", "Batsman", "Runs", "Balls", "4s", "6s", "SR"])
-            df['Innings'] = innings
-            df['Match_ID'] = match_id
-            df['Team'] = team_names[innings-1]
-            all_batting_data.append(df)
-        
-        # Process Bowling Data
-        for innings, bowling_table in enumerate(bowling_data, 1):
-            df = pd.DataFrame(bowling_table, columns=["Full Name", "Bowler", "Overs", "Maidens", "Runs", "Wickets", "No Balls", "Wides", "Econ", "Dots"])
-            df['Innings'] = innings
-            df['Match_ID'] = match_id
-            df['Team'] = team_names[1 if innings == 1 else 0]
-            all_bowling_data.append(df)
-
-        # Add DNB players if available
-        if not df_dnb.empty:
-            # DNB players already have innings and team information
-            df_dnb['Match_ID'] = match_id
-            df_dnb['Runs'] = 0
-            df_dnb['Balls'] = 0
-            df_dnb['4s'] = 0
-            df_dnb['6s'] = 0
-            df_dnb['SR'] = 0
-            all_batters.append(df_dnb)
-        
-        all_batting_data.extend(all_batters)
-        
-        # Process Fielding Data
-        df_fielding['Match_ID'] = match_id
-        df_fielding['Team'] = df_fielding['Innings'].map({1: team_names[1], 2: team_names[0]})
-        
-        all_fielding_data.append(df_fielding)
-        
-        # Extract Player of the Match
-        base_url = "https://www.cricbuzz.com"
-        potm_url = scorecard_url.replace('/live-cricket-scorecard/', '/cricket-scores/')
-        match_url = f"{base_url}{potm_url}"
-
-        df_potm = extract_potm(match_url)
-        if df_potm is not None:
-            all_potm_data.append(df_potm)
-        
-        # Add delay to avoid hitting the server too frequently
+    # The manifest knows whether this exact scorecard was already written, or parsed by a run that stopped
+    content_hash = scorecard_digest(scorecard_html)
+    plan = run_manifest.plan(match_id, content_hash)
+    if plan == "unchanged":
+        print(f"⏭️ Match {match_id} is unchanged since its points were written. Skipping...")
+        metrics.count("matches_unchanged")
+        return None
+
+    run_manifest.mark(match_id, "fetched", series=series, content_hash=content_hash)
+    try:
+        match_data = load_archived_records(series, match_id) if plan == "resume" else None
+        if match_data is not None:
+            print(f"♻️ Resuming match {match_id} from its archived stats")
+            metrics.count("matches_resumed")
+        else:
+            match_data = build_match_data(scorecard_html, scorecard_url, match_id)
+            metrics.count("matches_processed")
+            archive_match_data(series, match_id, match_data)
+        run_manifest.parsed(match_id, match_data)
+    finally:
+        run_manifest.flush()
+
+    # Add delay to avoid hitting the server too frequently (the worker pools bound the rate otherwise)
+    if SEQUENTIAL:
         time.sleep(2)
 
-# Create a more flexible name mapping system
+    return match_data
+
+def archive_match_data(series, match_id, match_data):
+    """Keep the raw rows so the scoring can be rerun later without scraping the match again"""
+    if STATS_ARCHIVE_DIR and series:
+        try:
+            with metrics.stage("archive_match"):
+                archive_match(series, match_id, match_data.frames(), root=STATS_ARCHIVE_DIR)
+        except Exception as e:
+            print(f"⚠️ Could not archive raw stats for match {match_id}: {e}")
+
+def load_archived_records(series, match_id):
+    """A match's records read back from the stats archive (None if it isn't there)"""
+    if not (STATS_ARCHIVE_DIR and series):
+        return None
+    try:
+        frames = load_match_stats(series, [match_id], kinds=BUFFERED_KINDS, root=STATS_ARCHIVE_DIR)
+    except Exception as e:
+        print(f"⚠️ Could not read archived stats for match {match_id}: {e}")
+        return None
+    if frames["batting"].empty or "Dismissal" not in frames["batting"]:
+        return None
+    return MatchRecords.from_frames(frames)
+
+BATTING_FIELDS = ["Full Name", "Batsman", "Runs", "Balls", "4s", "6s", "SR", "Dismissal"]
+BOWLING_FIELDS = ["Full Name", "Bowler", "Overs", "Maidens", "Runs", "Wickets", "No Balls", "Wides", "Econ", "Dots"]
+
+def build_match_data(scorecard_html, scorecard_url, match_id):
+    """Parse a fetched scorecard (plus its POTM page) into the match's typed batting/bowling/potm records"""
+    batting_data, bowling_data, team_player_mapping, team_names, dnb_players = parse_scorecard(scorecard_html, match_id)
+    potm = extract_potm(match_page_url(scorecard_url))
+    return scorecard_records(match_id, batting_data, bowling_data, team_names, dnb_players, potm)
+
+def match_page_url(scorecard_url):
+    """The match page (where the Player of the Match is announced) for a scorecard link"""
+    return f"https://www.cricbuzz.com{scorecard_url.replace('/live-cricket-scorecard/', '/cricket-scores/')}"
+
+def scorecard_records(match_id, batting_data, bowling_data, team_names, dnb_players, potm):
+    """Build a match's MatchRecords from its resolved scorecard tables and POTM row (or None)"""
+    match_data = MatchRecords()
+
+    # Batting rows, then the DNB players (zero stats; they already carry innings and team)
+    batting = match_data["batting"]
+    for innings, batting_table in enumerate(batting_data, 1):
+        for row in batting_table:
+            batting.append({**dict(zip(BATTING_FIELDS, row)), "Innings": innings, "Match_ID": match_id,
+                            "Team": team_names[innings - 1]})
+    for full_name, name, innings, team in dnb_players:
+        batting.append({"Full Name": full_name, "Batsman": name, "Innings": innings, "Match_ID": match_id, "Team": team})
+
+    # Bowling rows are credited to the fielding side of each innings
+    bowling = match_data["bowling"]
+    for innings, bowling_table in enumerate(bowling_data, 1):
+        for row in bowling_table:
+            bowling.append({**dict(zip(BOWLING_FIELDS, row)), "Innings": innings, "Match_ID": match_id,
+                            "Team": team_names[1 if innings == 1 else 0]})
+
+    if potm is not None:
+        match_data["potm"].append(potm)
+
+    return match_data
+
+def collect_match_data(match_data):
+    """Append one match's records to the run's"""
+    if match_data is not None:
+        run_records.extend(match_data)
+
+def iter_match_data(matches):
+    """Yield each match's DataFrames in listing order, with at most 2 x MATCH_WORKERS matches in flight"""
+    total = len(matches)
+    if SEQUENTIAL or MATCH_WORKERS == 1 or total < 2:
+        for i, match in enumerate(matches):
+            yield process_match(match["scorecard_url"], i, total, match.get("series"))
+        return
+
+    with ThreadPoolExecutor(max_workers=MATCH_WORKERS, thread_name_prefix="match") as executor:
+        pending = deque()
+        for i, match in enumerate(matches):
+            pending.append(executor.submit(process_match, match["scorecard_url"], i, total, match.get("series")))
+            # Hand results back in submission order so the output matches the sequential path exactly
+            if len(pending) >= MATCH_WORKERS * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def process_matches(matches):
+    """Process matches sequentially or on a bounded thread pool, collecting results in listing order"""
+    for match_data in iter_match_data(matches):
+        collect_match_data(match_data)
+
 def create_name_variations(name):
     """Create different variations of a name for matching"""
     name = name.strip()
@@ -578,153 +1364,192 @@ def create_name_variations(name):
     
     return variations
 
-# Then when creating the name mapping, it will include DNB players as well:
-name_mapping = {}
+# Name resolution: fielders appear in dismissal text under short or partial names, so they are
+# matched against the roster of the team that was fielding in that match only
+NAME_TAG_PATTERN = re.compile(r"\s*\((?:c|wk|c & wk|sub)\)")
+FUZZY_NAME_CUTOFF = 0.85
+
+def normalize_name(name):
+    """Lowercase a name and drop captain/keeper tags, dots and repeated whitespace"""
+    name = NAME_TAG_PATTERN.sub("", str(name)).replace(".", " ")
+    return " ".join(name.lower().split())
+
+class NameIndex:
+    """Normalized name variants -> full names for one roster (a team in a match)"""
+
+    def __init__(self, roster):
+        self.variants = {}  # normalized variant -> set of full names sharing it
+        for scorecard_name, full_name in roster:
+            for name in (scorecard_name, full_name):
+                for variation in create_name_variations(NAME_TAG_PATTERN.sub("", str(name))):
+                    self.variants.setdefault(normalize_name(variation), set()).add(full_name)
+        self._keys = list(self.variants)
+
+    def resolve(self, name):
+        """Return (full name or None, how it matched: exact / fuzzy / ambiguous / unresolved)"""
+        key = normalize_name(name)
+        candidates = self.variants.get(key)
+        if not candidates:
+            close_keys = difflib.get_close_matches(key, self._keys, n=3, cutoff=FUZZY_NAME_CUTOFF)
+            candidates = set().union(*(self.variants[close_key] for close_key in close_keys))
+            if len(candidates) == 1:
+                return next(iter(candidates)), "fuzzy"
+        if not candidates:
+            return None, "unresolved"
+        if len(candidates) > 1:
+            return None, "ambiguous"
+        return next(iter(candidates)), "exact"
+
+def build_name_indexes(df_batting_final, df_bowling_final):
+    """Build one NameIndex per (Match_ID, Team) roster from the batting (incl. DNB) and bowling rows"""
+    rosters = {}
+    for df, name_column in ((df_batting_final, 'Batsman'), (df_bowling_final, 'Bowler')):
+        for match_id, team, name, full_name in zip(df['Match_ID'], df['Team'], df[name_column], df['Full Name']):
+            rosters.setdefault((match_id, team), {})[name, full_name] = None  # Ordered set of (name, full name)
+    return {key: NameIndex(roster) for key, roster in rosters.items()}
+
+def resolve_fielders(df_fielding_final, name_indexes):
+    """Resolve the whole fielding column in one batch: each distinct (match, team, name) is looked up once"""
+    keys = list(zip(df_fielding_final['Match_ID'], df_fielding_final['Team'], df_fielding_final['Player']))
+    resolved = {}
+    for key in dict.fromkeys(keys):
+        match_id, team, player = key
+        index = name_indexes.get((match_id, team))
+        full_name, status = index.resolve(player) if index else (None, "unresolved")
+        if status == "ambiguous":
+            print(f"⚠️ Fielder '{player}' is ambiguous in the {team} roster for match {match_id}; left unchanged.")
+        resolved[key] = full_name or player
+    return pd.Series([resolved[key] for key in keys], index=df_fielding_final.index, name='Player', dtype="object")
+
+# Fantasy scoring rules. Bands are (upper bound, points) pairs checked in order: a value scores
+# the points of the first band whose upper bound it is below (None = no upper bound).
+SCORING_RULES = {
+    "batting": {
+        "per_event": {"Runs": 1, "4s": 1, "6s": 2},
+        "milestone": {"column": "Runs", "every": 25, "points": 10},
+        "strike_rate": {
+            "column": "SR", "min_column": "Balls", "min_value": 10,
+            "bands": [(50, -15), (75, -10), (100, -5), (125, 0), (150, 5), (200, 10), (None, 15)],
+        },
+    },
+    "bowling": {
+        "per_event": {"Wickets": 20, "Maidens": 20, "No Balls": -2, "Dots": 2},
+        "per_group": {"column": "Wides", "size": 2, "points": -1},  # -1 point per 2 wides
+        "wicket_bonus": {"column": "Wickets", "from": 2, "points": 10},  # +10 per wicket from the 2nd on
+        "economy": {
+            "column": "Econ", "min_column": "Overs", "min_value": 1,
+            "bands": [(5.01, 20), (6.01, 15), (7.01, 10), (8.01, 5), (9.01, 0), (10.01, -5), (12.01, -10), (None, -20)],
+        },
+    },
+    "fielding": {
+        "per_event": {"Catches": 10, "Stumpings": 10, "Run Outs": 10},
+    },
+    "potm": 50,
+}
+
+def compile_bands(band_rule):
+    """Compile a band rule into sorted thresholds plus a points lookup for `np.searchsorted`"""
+    bands = band_rule["bands"]
+    thresholds = np.array([upper for upper, _ in bands[:-1]], dtype=float)
+    points = np.array([points for _, points in bands])
+    return {
+        "column": band_rule["column"],
+        "min_column": band_rule["min_column"],
+        "min_value": band_rule["min_value"],
+        "thresholds": thresholds,
+        "points": points,
+    }
+
+def compile_scoring_rules(rules):
+    """Pre-compute the band lookups once so every scoring call is pure array arithmetic"""
+    return {
+        "batting": {**rules["batting"], "strike_rate": compile_bands(rules["batting"]["strike_rate"])},
+        "bowling": {**rules["bowling"], "economy": compile_bands(rules["bowling"]["economy"])},
+        "fielding": rules["fielding"],
+        "potm": rules["potm"],
+    }
+
+COMPILED_SCORING_RULES = compile_scoring_rules(SCORING_RULES)
+
+def band_points(values, gate_values, compiled_band):
+    """Vectorized band lookup; rows whose gate column is below the minimum score 0"""
+    values = np.asarray(values, dtype=float)
+    points = compiled_band["points"][np.searchsorted(compiled_band["thresholds"], values, side="right")]
+    return np.where(np.asarray(gate_values, dtype=float) < compiled_band["min_value"], 0, points)
+
+def counts(df, column):
+    """A parsed count column widened to int64, so the points arithmetic can't overflow its int8/int16 storage"""
+    return df[column].to_numpy(dtype=np.int64)
+
+def per_event_points(df, per_event):
+    """Sum of column * multiplier over the per-event rules"""
+    return sum(counts(df, column) * multiplier for column, multiplier in per_event.items())
 
 # Calculate batting points
 def calculate_sr_points(row):
     """Calculate Strike Rate points based on the given criteria"""
-    if row['Balls'] < 10:
-        return 0
-        
-    sr = row['SR']
-    if sr < 50:
-        return -15
-    elif sr < 75:
-        return -10
-    elif sr < 100:
-        return -5
-    elif sr < 125:
-        return 0
-    elif sr < 150:
-        return 5
-    elif sr < 200:
-        return 10
-    else:
-        return 15
+    rule = COMPILED_SCORING_RULES["batting"]["strike_rate"]
+    return int(band_points([row[rule["column"]]], [row[rule["min_column"]]], rule)[0])
 
 def calculate_bonus_points(runs):
     """Calculate bonus points for every 25 runs"""
-    return (runs // 25) * 10
+    milestone = COMPILED_SCORING_RULES["batting"]["milestone"]
+    return (runs // milestone["every"]) * milestone["points"]
 
 def calculate_batting_points(df_batting_final):
-    # Ensure numeric columns are properly converted
-    numeric_columns = ['Runs', 'Balls', '4s', '6s', 'SR']
-    df_batting_final[numeric_columns] = df_batting_final[numeric_columns].apply(pd.to_numeric, errors='coerce').fillna(0)
-
-    # Calculate individual point components
-    df_batting_final['Run_Points'] = df_batting_final['Runs'] * 1
-    df_batting_final['Four_Points'] = df_batting_final['4s'] * 1
-    df_batting_final['Six_Points'] = df_batting_final['6s'] * 2
-    df_batting_final['SR_Points'] = df_batting_final.apply(calculate_sr_points, axis=1)
-    df_batting_final['Bonus_Points'] = df_batting_final['Runs'].apply(calculate_bonus_points)
-
-    # Calculate total batting points
+    # Numeric columns arrive parsed (see match_records), so the rules apply to them directly
+    rules = COMPILED_SCORING_RULES["batting"]
+    sr_rule = rules["strike_rate"]
+
+    # Runs, boundaries, strike-rate band and milestone bonus, all as whole-column operations
     df_batting_final['Batting_Points'] = (
-        df_batting_final['Run_Points'] + 
-        df_batting_final['Four_Points'] + 
-        df_batting_final['Six_Points'] + 
-        df_batting_final['SR_Points'] + 
-        df_batting_final['Bonus_Points']
+        per_event_points(df_batting_final, rules["per_event"]) +
+        band_points(df_batting_final[sr_rule["column"]], df_batting_final[sr_rule["min_column"]], sr_rule) +
+        calculate_bonus_points(counts(df_batting_final, rules["milestone"]["column"]))
     )
 
-    # Optionally, drop the intermediate point columns if you don't need them
-    df_batting_final.drop(['Run_Points', 'Four_Points', 'Six_Points', 'SR_Points', 'Bonus_Points'], axis=1, inplace=True)
-
-    # Display the updated DataFrame
     return df_batting_final
 
 # Calculate bowling points
 def calculate_economy_points(row):
     """Calculate Economy Rate points based on the given criteria"""
-    if row['Overs'] < 1:
-        return 0
-        
-    economy = row['Econ']
-    if economy < 5.01:
-        return 20
-    elif economy < 6.01:
-        return 15
-    elif economy < 7.01:
-        return 10
-    elif economy < 8.01:
-        return 5
-    elif economy < 9.01:
-        return 0
-    elif economy < 10.01:
-        return -5
-    elif economy < 12.01:
-        return -10
-    else:
-        return -20
+    rule = COMPILED_SCORING_RULES["bowling"]["economy"]
+    return int(band_points([row[rule["column"]]], [row[rule["min_column"]]], rule)[0])
 
 def calculate_wicket_bonus(wickets):
     """Calculate bonus points for wicket milestones (2+ wickets)"""
-    return max(0, (wickets - 1) * 10)  # Ensures no negative values
+    bonus = COMPILED_SCORING_RULES["bowling"]["wicket_bonus"]
+    return np.maximum(0, (wickets - (bonus["from"] - 1)) * bonus["points"])  # Ensures no negative values
 
 def calculate_bowling_points(df_bowling_final):
-    # Ensure numeric columns are properly converted for bowling
-    numeric_columns = ['Overs', 'Maidens', 'Runs', 'Wickets', 'No Balls', 'Wides', 'Econ', 'Dots']
-    df_bowling_final[numeric_columns] = df_bowling_final[numeric_columns].apply(pd.to_numeric, errors='coerce').fillna(0)
-
-    # Calculate individual point components
-    df_bowling_final['Wicket_Points'] = df_bowling_final['Wickets'] * 20
-    df_bowling_final['Economy_Points'] = df_bowling_final.apply(calculate_economy_points, axis=1)
-    df_bowling_final['No_Ball_Points'] = df_bowling_final['No Balls'] * -2
-    df_bowling_final['Wide_Points'] = (df_bowling_final['Wides'] // 2) * -1  # -1 point per 2 wides
-    df_bowling_final['Wicket_Bonus_Points'] = df_bowling_final['Wickets'].apply(calculate_wicket_bonus)
-    df_bowling_final['Maiden_Points'] = df_bowling_final['Maidens'] * 20
-    df_bowling_final['Dots_Points'] = df_bowling_final['Dots'] * 2
-    # Calculate total bowling points
+    rules = COMPILED_SCORING_RULES["bowling"]
+    economy_rule = rules["economy"]
+    per_group = rules["per_group"]
+
+    # Wickets, maidens, no balls, dots, wides, economy band and wicket bonus as whole-column operations
     df_bowling_final['Bowling_Points'] = (
-        df_bowling_final['Wicket_Points'] + 
-        df_bowling_final['Economy_Points'] + 
-        df_bowling_final['No_Ball_Points'] + 
-        df_bowling_final['Wide_Points'] + 
-        df_bowling_final['Wicket_Bonus_Points'] +
-        df_bowling_final['Maiden_Points'] + 
-        df_bowling_final['Dots_Points']
+        per_event_points(df_bowling_final, rules["per_event"]) +
+        (counts(df_bowling_final, per_group["column"]) // per_group["size"]) * per_group["points"] +
+        band_points(df_bowling_final[economy_rule["column"]], df_bowling_final[economy_rule["min_column"]], economy_rule) +
+        calculate_wicket_bonus(counts(df_bowling_final, rules["wicket_bonus"]["column"]))
     )
 
-    # Optionally, drop the intermediate point columns
-    df_bowling_final.drop([
-        'Wicket_Points', 'Economy_Points', 'No_Ball_Points', 
-        'Wide_Points', 'Wicket_Bonus_Points', 'Maiden_Points', 'Dots_Points'
-    ], axis=1, inplace=True)
-
-    # Display the updated DataFrame
     return df_bowling_final
 
 def calculate_fielding_points(df_fielding_final):
-    # Ensure numeric columns are properly converted for fielding
-    numeric_columns = ['Catches', 'Stumpings', 'Run Outs']
-    df_fielding_final[numeric_columns] = df_fielding_final[numeric_columns].apply(pd.to_numeric, errors='coerce').fillna(0)
-
-    # Calculate fielding points
-    df_fielding_final['Catch_Points'] = df_fielding_final['Catches'] * 10
-    df_fielding_final['Stumping_Points'] = df_fielding_final['Stumpings'] * 10
-    df_fielding_final['RunOut_Points'] = df_fielding_final['Run Outs'] * 10
-
-    # Calculate total fielding points
-    df_fielding_final['Fielding_Points'] = (
-        df_fielding_final['Catch_Points'] + 
-        df_fielding_final['Stumping_Points'] + 
-        df_fielding_final['RunOut_Points']
-    )
-
-    # Optionally, drop the intermediate point columns
-    df_fielding_final.drop(['Catch_Points', 'Stumping_Points', 'RunOut_Points'], axis=1, inplace=True)
+    # Catches, stumpings and run outs
+    df_fielding_final['Fielding_Points'] = per_event_points(df_fielding_final, COMPILED_SCORING_RULES["fielding"]["per_event"])
 
-    # Display the updated DataFrame
     return df_fielding_final
 
 def calculate_potm_points(df_potm_final):
     # Add Player of the Match points
     if df_potm_final is not None:
-        df_potm_final['POTM_Points'] = 50
+        df_potm_final['POTM_Points'] = COMPILED_SCORING_RULES["potm"]
 
     return df_potm_final
 
+@metrics.timed("calculate_points")
 def calculate_points(df_batting_final, df_bowling_final, df_fielding_final, df_potm_final):
     """Calculate points for batting, bowling, fielding, and Player of the Match"""
     # Calculate individual points
@@ -769,12 +1594,12 @@ def calculate_points(df_batting_final, df_bowling_final, df_fielding_final, df_p
     fantasy_points['Fielding_Points'] = fantasy_points['Fielding_Points'].fillna(0)
 
     # Fetch correct player names for POTM using player_id
-    df_potm_final['Corrected_Player_Name'] = df_potm_final['Player_ID'].apply(fetch_player_name_from_cricbuzz)
+    df_potm_final['Corrected_Player_Name'] = run_concurrently(fetch_player_name_from_cricbuzz, df_potm_final['Player_ID'])
 
     # Handle POTM points using player_id
     if df_potm_final is not None:
-        df_potm_final["match_player_key"] = df_potm_final["Corrected_Player_Name"] + "_" + df_potm_final["Match_ID"].astype(str)
-        fantasy_points["match_player_key"] = fantasy_points["Full Name"] + "_" + fantasy_points["Match_ID"].astype(str)
+        df_potm_final["match_player_key"] = df_potm_final["Corrected_Player_Name"].astype(str) + "_" + df_potm_final["Match_ID"].astype(str)
+        fantasy_points["match_player_key"] = fantasy_points["Full Name"].astype(str) + "_" + fantasy_points["Match_ID"].astype(str)
 
         # Create mapping using the composite key
         potm_points = dict(zip(df_potm_final["match_player_key"], df_potm_final["POTM_Points"]))
@@ -807,62 +1632,1028 @@ def calculate_points(df_batting_final, df_bowling_final, df_fielding_final, df_p
 
     return leaderboard
 
-def main():
-    """Main function to execute the scraper"""
-    # ✅ 1. Fetch existing matches from the database
-    print("🔄 Fetching existing matches from database...")
-    response = supabase.table("matches").select("id").execute()
+# Team totals: every user team as a sparse team x player ownership matrix, scored per match
+CAPTAIN_MULTIPLIER = 2.0
+VICE_CAPTAIN_MULTIPLIER = 1.5
+
+team_points_writer = BatchWriter("team_points", on_conflict="user_id,match_id")
+
+def bump_data_version():
+    """Record that points changed, so readers such as points_api.py drop their cached responses"""
+    try:
+        storage.set_data_version("points", datetime.now(timezone.utc).isoformat())
+    except Exception as e:
+        print(f"⚠️ Could not bump the data version: {e}")
+
+def fetch_all_rows(table, columns, **in_filters):
+    """Select every row of a table (optionally filtered with `column=[values]`)"""
+    return storage.select_all(table, columns, **in_filters)
+
+class OwnershipMatrix:
+    """Sparse (COO) team x player matrix whose entries are the captain/vice-captain multipliers.
+
+    Team totals for a match are one sparse matrix-vector product with that match's points,
+    done with `np.bincount` over the nonzero entries.
+    """
+
+    def __init__(self, columns_from=None):
+        # Matrices built with `columns_from` share its player columns, so one points vector fits both
+        self.players = columns_from.players if columns_from else {}  # normalized player name -> column
+        self._name_columns = columns_from._name_columns if columns_from else {}  # name as stored -> column
+        self.user_ids = []
+        self.unmatched = 0  # Squad entries without a player name, which can't be given points
+        self._rows, self._cols, self._weights = [], [], []
+
+    def column(self, player_name):
+        """Column for a player, added on first sight"""
+        column = self._name_columns.get(player_name)
+        if column is None:
+            column = self.players.setdefault(normalize_name(player_name), len(self.players))
+            self._name_columns[player_name] = column
+        return column
+
+    def add_team(self, user_id, squad, captain_id=None, vice_captain_id=None):
+        """Add one team; `squad` is (player_id, player_name) pairs"""
+        row = len(self.user_ids)
+        self.user_ids.append(user_id)
+        captain_id = str(captain_id) if captain_id is not None else None
+        vice_captain_id = str(vice_captain_id) if vice_captain_id is not None else None
+        for player_id, player_name in squad:
+            if not player_name:
+                self.unmatched += 1
+                continue
+            player_id = str(player_id) if player_id is not None else ""
+            self._rows.append(row)
+            self._cols.append(self.column(player_name))
+            self._weights.append(CAPTAIN_MULTIPLIER if player_id == captain_id
+                                 else VICE_CAPTAIN_MULTIPLIER if player_id == vice_captain_id else 1.0)
+
+    def freeze(self):
+        """Convert the entry lists to arrays once all teams are added"""
+        self.rows = np.asarray(self._rows, dtype=np.int64)
+        self.cols = np.asarray(self._cols, dtype=np.int64)
+        self.weights = np.asarray(self._weights, dtype=np.float64)
+        self._rows, self._cols, self._weights = [], [], []
+        return self
+
+    def totals(self, player_names, points):
+        """Multiplier-weighted team totals for one match's (player name, points) pairs"""
+        vector = np.zeros(len(self.players))
+        columns = np.array([self.players.get(normalize_name(name), -1) for name in player_names], dtype=np.int64)
+        owned = columns >= 0  # Players nobody picked have no column
+        vector[columns[owned]] = np.asarray(points, dtype=np.float64)[owned]
+        return np.bincount(self.rows, weights=self.weights * vector[self.cols], minlength=len(self.user_ids))
+
+def matchday_squad(players):
+    """(player_id, player_name) pairs from a matchday_teams `players` dict"""
+    return [(player_id, player.get("player_name")) for player_id, player in (players or {}).items()]
+
+def user_team_squad(team_data):
+    """(player_id, player_name) pairs from a user_teams `team_data` list.
+
+    Keys are matched case-insensitively with spaces as underscores, as the app's
+    transformPlayerKeys reads them ('Player ID', 'Player_ID', 'player_id'; 'Player', 'player').
+    """
+    squad = []
+    for player in team_data or []:
+        fields = {str(key).lower().replace(" ", "_"): value for key, value in player.items() if value not in (None, "")}
+        squad.append((fields.get("player_id"), fields.get("player")))
+    return squad
+
+class TeamPointsAggregator:
+    """Total every user team's points per match and write them to the team_points table.
+
+    A team saved for the match in matchday_teams is used when there is one; otherwise the
+    user's current team from user_teams. Captains score 2x and vice-captains 1.5x, as in the app.
+    """
+
+    def __init__(self):
+        self.user_teams = None  # OwnershipMatrix over user_teams, loaded on first use
+
+    def load_user_teams(self):
+        if self.user_teams is None:
+            self.user_teams = OwnershipMatrix()
+            for team in fetch_all_rows("user_teams", "user_id, team_data, captain_id, vice_captain_id"):
+                self.user_teams.add_team(team["user_id"], user_team_squad(team["team_data"]),
+                                         team.get("captain_id"), team.get("vice_captain_id"))
+            self.user_teams.freeze()
+            self.report_unmatched(self.user_teams, "user_teams")
+        return self.user_teams
+
+    @staticmethod
+    def report_unmatched(teams, table):
+        if teams.unmatched:
+            metrics.count("team_players_unmatched", teams.unmatched, table=table)
+            print(f"⚠️ {table}: {teams.unmatched} squad entries have no player name and score nothing.")
+
+    def aggregate(self, df_player_points):
+        """Return a DataFrame of (user_id, match_id, points) for every team and match in the points"""
+        user_teams = self.load_user_teams()
+        match_ids = df_player_points['match_id'].astype(str).unique().tolist()
+        matchday_rows = fetch_all_rows("matchday_teams", "user_id, match_id, players, captain_id, vice_captain_id",
+                                       match_id=match_ids) if match_ids else []
+        matchday_by_match = {}
+        for team in matchday_rows:
+            matchday_by_match.setdefault(str(team["match_id"]), []).append(team)
+
+        frames = []
+        for match_id, match_points in df_player_points.groupby(df_player_points['match_id'].astype(str), sort=False):
+            matchday = OwnershipMatrix(columns_from=user_teams)
+            for team in matchday_by_match.get(match_id, []):
+                matchday.add_team(team["user_id"], matchday_squad(team["players"]),
+                                  team.get("captain_id"), team.get("vice_captain_id"))
+            matchday.freeze()
+            self.report_unmatched(matchday, "matchday_teams")
+
+            names, points = match_points['player_name'].tolist(), match_points['total_points'].to_numpy()
+            matchday_users = set(matchday.user_ids)
+            fallback = np.fromiter((user_id not in matchday_users for user_id in user_teams.user_ids),
+                                   dtype=bool, count=len(user_teams.user_ids))
+            frames.append(pd.DataFrame({
+                'user_id': matchday.user_ids + [user_id for user_id, keep in zip(user_teams.user_ids, fallback) if keep],
+                'match_id': match_id,
+                'points': np.concatenate([matchday.totals(names, points), user_teams.totals(names, points)[fallback]]).round(2),
+            }))
+
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['user_id', 'match_id', 'points'])
+
+    def write(self, df_player_points):
+        """Aggregate and upsert team totals; returns the writer stats"""
+        df_team_points = self.aggregate(df_player_points)
+        team_points_writer.add(df_team_points.to_dict(orient="records"))
+        stats = team_points_writer.flush()
+        print(f"✅ team_points: {len(df_team_points)} team totals, {stats['written']} written, {stats['failed']} failed.")
+        return stats
+
+POINT_COLUMNS = ['batting_points', 'bowling_points', 'fielding_points', 'potm_points']  # Add up to total_points
+
+# Player pricing: running season aggregates plus an EWMA of recent points, updated after each match
+MIN_PRICE = 5.0  # Price of a player on zero points (as in the original pricing notebook)
+POINTS_PER_CREDIT = 150  # Season fantasy points per extra 1M of price
+FORM_ALPHA = float(os.getenv("FORM_ALPHA", "0.3"))  # Weight of the latest match in the form average
+FORM_CREDITS_PER_POINT = float(os.getenv("FORM_CREDITS_PER_POINT", "0.01"))  # Price move per point of form above average
+PRICES_CSV_PATH = os.getenv("PRICES_CSV_PATH", "public/data/player_prices.csv")
+PLAYERS_JSON_PATH = os.getenv("PLAYERS_JSON_PATH", "public/data/players.json")
+PLAYERS_WITH_PRICES_PATH = os.getenv("PLAYERS_WITH_PRICES_PATH", "public/data/players_with_prices.json")
+DEFAULT_PLAYER_PRICE = 5.0  # Players without a price row, as in scripts/mergePrices.js
+
+price_writer = BatchWriter("player_prices", on_conflict="player_name")
+
+class PlayerPriceBook:
+    """Every player's price, kept up to date from each match's points without rescanning the season.
+
+    State is one row per player: season totals, matches played, an exponentially weighted form
+    average and the latest match applied. A match newer than every match its players already
+    have moves those with a few vectorized column operations. The form average depends on
+    match order, so a match that arrives after a newer one (parallel series runs, resumed
+    matches) is replayed instead: the state is rebuilt from the applied rows kept in memory,
+    or from the stored player_points the first time. The state is loaded from the
+    player_prices table, or rebuilt once from player_points when that table is empty.
+    """
+
+    STATE_COLUMNS = ['player_name', 'team', 'matches', 'fantasy_points', 'batting_points', 'bowling_points',
+                     'fielding_points', 'potm_points', 'form', 'price', 'last_match_id']
+
+    def __init__(self):
+        self.state = None  # DataFrame indexed by player_name
+        self.history = None  # Every applied player row (match_points), once known
+        self.applied = set()  # Match IDs in `history`
+
+    def load(self):
+        if self.state is not None:
+            return self.state
+        with metrics.stage("load_player_prices"):
+            rows = fetch_all_rows("player_prices", ", ".join(self.STATE_COLUMNS))
+        if rows:
+            self.state = pd.DataFrame(rows, columns=self.STATE_COLUMNS).set_index('player_name')
+            self.state['last_match_id'] = self.state['last_match_id'].astype(np.int64)
+            return self.state
+        return self.reload_from_points()
+
+    def reload_from_points(self):
+        """Rebuild the state from every stored player_points row"""
+        with metrics.stage("rebuild_player_prices"):
+            rows = fetch_all_rows("player_points", "match_id, player_name, team, " + ", ".join(POINT_COLUMNS))
+            self.replay(self.match_points(pd.DataFrame(rows, columns=['match_id', 'player_name', 'team'] + POINT_COLUMNS)))
+        return self.state
+
+    def replay(self, history):
+        """Rebuild the state from `history` (match_points rows) and keep them for later replays"""
+        self.history = history
+        self.applied = set(history['match_id'].unique().tolist())
+        self.state = self.rebuild(history)
+        return self.state
+
+    @staticmethod
+    def match_points(df_player_points):
+        """Player rows with integer match IDs and a total, in match order"""
+        df = df_player_points[['match_id', 'player_name', 'team'] + POINT_COLUMNS].copy()
+        df['match_id'] = df['match_id'].astype(np.int64)
+        df[POINT_COLUMNS] = df[POINT_COLUMNS].astype(float)
+        df['fantasy_points'] = df[POINT_COLUMNS].sum(axis=1)
+        return df.sort_values('match_id', kind='stable')
+
+    def rebuild(self, df_player_points):
+        """Compute the state from a full points history (first run, or after a rescore)"""
+        df = self.match_points(df_player_points)
+        grouped = df.groupby('player_name', sort=False)
+        state = grouped[['fantasy_points'] + POINT_COLUMNS].sum()
+        state['matches'] = grouped.size()
+        state['team'] = grouped['team'].last()
+        state['last_match_id'] = grouped['match_id'].max()
+        state['form'] = df.groupby('player_name', sort=False)['fantasy_points'].agg(
+            lambda points: points.ewm(alpha=FORM_ALPHA, adjust=False).mean().iloc[-1]
+        )
+        state['price'] = self.price(state)
+        return state.reindex(columns=self.STATE_COLUMNS[1:])
+
+    @staticmethod
+    def price(state):
+        """Season points set the base price; form above the player's own average moves it up or down"""
+        average = state['fantasy_points'] / state['matches'].where(state['matches'] > 0)
+        form_bonus = ((state['form'] - average) * FORM_CREDITS_PER_POINT).fillna(0)
+        return (MIN_PRICE + state['fantasy_points'] / POINTS_PER_CREDIT + form_bonus).round(1)
+
+    def update(self, df_player_points):
+        """Apply new match points; matches already applied are skipped, and out-of-order ones replayed"""
+        state = self.load()
+        df = self.match_points(df_player_points)
+        df = df[~df['match_id'].isin(self.applied)]
+        if df.empty:
+            return state
+        latest = df['player_name'].map(state['last_match_id']).fillna(-1).to_numpy()
+        if (df['match_id'].to_numpy() <= latest).any():
+            # A player already has a newer match, so the form average has to be recomputed in match order
+            if self.history is None:
+                return self.reload_from_points()  # The stored rows already include this match
+            return self.replay(pd.concat([self.history, df], ignore_index=True))
+        if self.history is not None:
+            self.history = pd.concat([self.history, df], ignore_index=True)
+            self.applied.update(df['match_id'].unique().tolist())
+
+        new_players = df['player_name'].drop_duplicates()
+        new_players = new_players[~new_players.isin(state.index)]
+        if len(new_players):
+            state = pd.concat([state, pd.DataFrame(
+                {'team': None, 'matches': 0, 'fantasy_points': 0.0, **{column: 0.0 for column in POINT_COLUMNS},
+                 'form': np.nan, 'price': MIN_PRICE, 'last_match_id': -1},
+                index=pd.Index(new_players, name='player_name'),
+            )])
+
+        # Work on plain arrays and write them back once, so a match costs a few numpy operations
+        total_columns = ['fantasy_points'] + POINT_COLUMNS
+        totals = state[total_columns].to_numpy(dtype=float, copy=True)
+        matches = state['matches'].to_numpy(dtype=np.int64, copy=True)
+        form = state['form'].to_numpy(dtype=float, copy=True)
+        teams = state['team'].to_numpy(dtype=object, copy=True)
+        last_match_ids = state['last_match_id'].to_numpy(dtype=np.int64, copy=True)
+        for match_id, match in df.groupby('match_id', sort=True):
+            match = match.drop_duplicates('player_name', keep='last')
+            rows = state.index.get_indexer(match['player_name'])
+            points = match['fantasy_points'].to_numpy()
+            totals[rows] += match[total_columns].to_numpy()
+            matches[rows] += 1
+            form[rows] = np.where(np.isnan(form[rows]), points, FORM_ALPHA * points + (1 - FORM_ALPHA) * form[rows])
+            teams[rows] = match['team'].to_numpy()
+            last_match_ids[rows] = match_id
+        state = state.copy()
+        state[total_columns] = totals
+        state['matches'] = matches
+        state['form'] = form
+        state['team'] = teams
+        state['last_match_id'] = last_match_ids
+        state['price'] = self.price(state)
+        self.state = state
+        return state
+
+    def write(self, csv_path=PRICES_CSV_PATH):
+        """Upsert every price row in one batch and rewrite the price files the app loads"""
+        state = self.load()
+        if state.empty:
+            return None
+        records = state.reset_index()[self.STATE_COLUMNS]
+        records = records.astype({'matches': int, 'last_match_id': int}).round({'form': 2})
+        price_writer.add(records.replace({np.nan: None}).to_dict(orient="records"))
+        stats = price_writer.flush()
+        if csv_path:
+            self.write_files(csv_path)
+        print(f"✅ player_prices: {len(state)} players priced, {stats['written']} written, {stats['failed']} failed.")
+        return stats
+
+    def write_files(self, csv_path=PRICES_CSV_PATH, players_path=PLAYERS_JSON_PATH, merged_path=PLAYERS_WITH_PRICES_PATH):
+        """player_prices.csv, then players_with_prices.json merged as scripts/mergePrices.js does"""
+        state = self.load().sort_values('fantasy_points', ascending=False)
+        csv = pd.DataFrame({
+            'Full Name': state.index, 'Team': state['team'].to_numpy(), 'Fantasy_Points': state['fantasy_points'].to_numpy(),
+            'Batting_Points': state['batting_points'].to_numpy(), 'Bowling_Points': state['bowling_points'].to_numpy(),
+            'Fielding_Points': state['fielding_points'].to_numpy(), 'POTM_Points': state['potm_points'].to_numpy(),
+            'Price': state['price'].to_numpy(), 'Matches': state['matches'].to_numpy(), 'Form': state['form'].round(2).to_numpy(),
+        })
+        write_atomically(csv_path, csv.to_csv(index=False))
+
+        if not merged_path or not os.path.exists(players_path):
+            return
+        with open(players_path, encoding="utf-8") as f:
+            players = json.load(f)
+        prices = dict(zip(state.index, state['price']))
+        for player in players:
+            price = prices.get(player["Player"]) or DEFAULT_PLAYER_PRICE
+            player["Price"] = int(price) if float(price).is_integer() else float(price)
+        write_atomically(merged_path, json.dumps(players, indent=2, ensure_ascii=False))
+
+price_book = PlayerPriceBook()
+
+def update_prices(df_player_points=None):
+    """Move prices by newly written points (None: rebuild from every stored row) and write them out"""
+    try:
+        with metrics.stage("update_prices"):
+            if df_player_points is None:
+                price_book.reload_from_points()
+            else:
+                price_book.update(df_player_points)
+            price_book.write()
+    except Exception as e:
+        print(f"⚠️ Could not update player prices: {e}")
+
+# League projections: each league member's chance to finish first, simulated from player_points history
+LEAGUE_SIMULATIONS = int(os.getenv("LEAGUE_SIMULATIONS", str(simulator.DEFAULT_SIMULATIONS)))
+LEAGUE_REMAINING_MATCHES = os.getenv("LEAGUE_REMAINING_MATCHES")  # Overrides the count from the series listing
+
+projection_writer = BatchWriter("league_projections", on_conflict="league_id,user_id")
+
+class LeagueProjector:
+    """Simulate the rest of the season for every league and write win probabilities to league_projections.
+
+    Future matches are played by each user's current team (user_teams), so the captain and
+    vice-captain multipliers come from the same OwnershipMatrix the team totals use.
+    """
+
+    def __init__(self):
+        self.remaining_matches = 0  # Matches still to play, from the latest series listing
+
+    def count_remaining(self, matches):
+        """Remember how many listed matches have no result yet"""
+        self.remaining_matches = sum(match["result"] == "Result Pending" for match in matches)
+
+    def rounds(self):
+        return int(LEAGUE_REMAINING_MATCHES) if LEAGUE_REMAINING_MATCHES else self.remaining_matches
+
+    def refresh(self, team_points):
+        """Project every league; returns the number of (league, user) rows written"""
+        leagues = {}
+        for row in fetch_all_rows("user_leagues", "user_id, league_id"):
+            leagues.setdefault(row["league_id"], []).append(row["user_id"])
+        if not leagues:
+            return 0
+
+        history = pd.DataFrame(fetch_all_rows("player_points", "match_id, player_name, total_points"),
+                               columns=['match_id', 'player_name', 'total_points'])
+        model = simulator.PointsModel(pd.DataFrame({
+            'match_id': history['match_id'],
+            'player': history['player_name'].map(normalize_name),
+            'points': pd.to_numeric(history['total_points'], errors='coerce').fillna(0),
+        }))
+
+        # Each user's squad as (normalized player names, multipliers) from the team x player matrix
+        user_teams = team_points.load_user_teams()
+        names = np.empty(len(user_teams.players), dtype=object)
+        names[list(user_teams.players.values())] = list(user_teams.players)
+        ends = np.cumsum(np.bincount(user_teams.rows, minlength=len(user_teams.user_ids)))  # Rows are added in order
+        team_weights = {
+            user_id: (names[user_teams.cols[end - count:end]], user_teams.weights[end - count:end])
+            for user_id, end, count in zip(user_teams.user_ids, ends, np.diff(ends, prepend=0))
+        }
+        current = {}
+        for row in fetch_all_rows("team_points", "user_id, points"):
+            current[row["user_id"]] = current.get(row["user_id"], 0.0) + float(row["points"] or 0)
+
+        projections = simulator.simulate_leagues(model, leagues, team_weights, current, self.rounds(),
+                                                 simulations=LEAGUE_SIMULATIONS)
+        projections['remaining_matches'] = self.rounds()
+        projections['updated_at'] = datetime.now(timezone.utc).isoformat()
+        projection_writer.add(projections.to_dict(orient="records"))
+        stats = projection_writer.flush()
+        print(f"📈 league_projections: {len(leagues)} leagues, {len(projections)} teams over {self.rounds()} "
+              f"remaining matches, {stats['written']} written, {stats['failed']} failed.")
+        return stats['written']
+
+league_projector = LeagueProjector()
+
+def refresh_league_projections(team_points):
+    """Re-simulate every league after new points; a failure only costs the projections"""
+    try:
+        with metrics.stage("league_projections"):
+            league_projector.refresh(team_points)
+    except Exception as e:
+        print(f"⚠️ Could not refresh league projections: {e}")
+
+def prepare_frames(df_batting_final, df_bowling_final, df_fielding_final):
+    """Resolve fielder names against each match's roster, then drop the scorecard display names"""
+    name_indexes = build_name_indexes(df_batting_final, df_bowling_final)
+    df_fielding_final['Player'] = resolve_fielders(df_fielding_final, name_indexes)
+    return df_batting_final.drop('Batsman', axis=1), df_bowling_final.drop('Bowler', axis=1), df_fielding_final
+
+def to_player_points(leaderboard):
+    """Rename leaderboard columns to the player_points table schema"""
+    return leaderboard.rename(columns={
+        "Full Name": "player_name",
+        "Match_ID": "match_id",
+        "Team": "team",
+        "Batting_Points": "batting_points",
+        "Bowling_Points": "bowling_points",
+        "Fielding_Points": "fielding_points",
+        "POTM_Points": "potm_points",
+        "Fantasy_Points": "total_points"
+    })[['match_id', 'player_name', 'team', 'batting_points', 'bowling_points', 'fielding_points', 'potm_points', 'total_points']]
 
-    if hasattr(response, "data") and response.data:
-        existing_match_ids = {match["id"] for match in response.data}
-        print(f"📌 Found {len(existing_match_ids)} existing matches in database.")
+def score_match_data(match_data):
+    """Score one match's records, returning its leaderboard (None if nothing was parsed)"""
+    if match_data is None or not len(match_data["batting"]):
+        return None
+
+    frames = match_data.frames()
+    df_batting, df_bowling, df_fielding = prepare_frames(frames["batting"], frames["bowling"], frames["fielding"])
+    return calculate_points(df_batting, df_bowling, df_fielding, frames["potm"])
+
+def delete_stale_points(df_player_points, match_ids):
+    """Remove the stored player_points rows of corrected matches that the new scorecard no longer has"""
+    stored = fetch_all_rows("player_points", "match_id, player_name", match_id=match_ids)
+    current = set(zip(df_player_points['match_id'].astype(str), df_player_points['player_name']))
+    stale = {}
+    for row in stored:
+        if (str(row["match_id"]), row["player_name"]) not in current:
+            stale.setdefault(str(row["match_id"]), []).append(row["player_name"])
+    for match_id, players in stale.items():
+        metrics.count("db_requests", table="player_points")
+        try:
+            storage.delete("player_points", match_id=match_id, player_name=players)
+            print(f"🧹 Match {match_id}: removed {len(players)} stale player_points rows ({', '.join(players)}).")
+        except Exception as e:
+            print(f"⚠️ Match {match_id}: could not remove stale player_points rows ({', '.join(players)}): {e}")
+    return sum(len(players) for players in stale.values())
+
+def write_points(df_player_points, team_points):
+    """Upsert player points and team totals, let readers know the data moved, and mark the matches written.
+
+    Matches whose points didn't all make it into storage stay at `scored`, so the next run redoes them.
+    """
+    match_ids = df_player_points['match_id'].astype(str).unique().tolist()
+    run_manifest.advance(match_ids, "scored")
+    corrected = sorted(run_manifest.corrected.intersection(match_ids))
+    if corrected:
+        delete_stale_points(df_player_points, corrected)
+    failed_before = points_writer.stats["failed"]
+    insert_player_points(df_player_points)
+    team_points.write(df_player_points)
+    # Prices already counted a corrected match's old points, so they are rebuilt rather than moved
+    update_prices(None if corrected else df_player_points)
+    refresh_league_projections(team_points)
+    bump_data_version()
+    if points_writer.stats["failed"] > failed_before:
+        print(f"⚠️ Some player_points rows failed; {len(match_ids)} matches stay unfinished for the next run.")
+        return
+    stats = run_manifest.complete(match_ids)
+    print(f"✅ matches: {stats['written']} written, {stats['skipped']} skipped, {stats['failed']} failed.")
+
+def write_match_points(leaderboard, team_points):
+    """Write one match's points (see `write_points`)"""
+    write_points(to_player_points(leaderboard), team_points)
+    if not leaderboard.empty:
+        top = leaderboard.iloc[0]
+        print(f"🏏 Match {top['Match_ID']}: top scorer {top['Full Name']} ({top['Fantasy_Points']} pts)")
+
+def stream_matches(matches):
+    """Fetch, parse, score and write each match as soon as it is ready (`--stream`).
+
+    Only the matches in flight are held in memory, and a failure part-way through keeps
+    every match already written. The rows written are the same as in batch mode.
+    """
+    streamed = 0
+    stats_before = dict(points_writer.stats)
+    team_points = TeamPointsAggregator()  # user_teams is loaded once and reused for every match
+    for match_data in iter_match_data(matches):
+        leaderboard = score_match_data(match_data)
+        if leaderboard is None:
+            continue
+        write_match_points(leaderboard, team_points)
+        streamed += 1
+    run_manifest.complete_empty()
+
+    totals = {key: points_writer.stats[key] - stats_before[key] for key in stats_before}
+    totals["matches"] = streamed
+    print(f"\n✅ Streamed {streamed} matches: {totals['written']} player_points written, "
+          f"{totals['skipped']} skipped, {totals['failed']} failed.")
+    return totals
+
+# Series registry: the competitions to scrape, by name (`--series NAME`)
+SERIES_REGISTRY_PATH = os.getenv("SERIES_REGISTRY_PATH", "series.json")
+
+def load_series_registry(path=SERIES_REGISTRY_PATH):
+    """Return {name: series entry}; without a registry file, just the default SERIES_URL"""
+    if not os.path.exists(path):
+        return {"default": {"name": "default", "url": SERIES_URL, "enabled": True}}
+    with open(path, encoding="utf-8") as f:
+        return {entry["name"]: entry for entry in json.load(f)}
+
+class SeriesState:
+    """One series' progress through a scheduler run"""
+
+    def __init__(self, name, url):
+        self.name = name
+        self.url = url
+        self.matches = []  # The series listing
+        self.pending = deque()  # Matches still to submit
+        self.total = 0
+        self.submitted = 0
+        self.stats = {"listed": 0, "processed": 0, "skipped": 0, "failed": 0}
+
+    def list_matches(self):
+        """Fetch the series listing and queue its completed matches that need processing (see RunManifest)"""
+        self.matches = get_scorecard_urls(self.url)
+        self.stats["listed"] = len(self.matches)
+        run_manifest.list(self.matches)
+        self.pending.extend(match for match in self.matches if run_manifest.needs_processing(match))
+        self.total = len(self.pending)
+
+class SeriesScheduler:
+    """Run many series through fetch -> parse -> score -> write in one process.
+
+    All series share the HTTP session, caches and writers, and at most `budget` matches are in
+    flight across all of them. Free slots go to the series round-robin, so a long series gets
+    the same share as a short one while both still have matches left.
+    """
+
+    def __init__(self, series, budget=None):
+        self.states = [SeriesState(entry["name"], entry["url"]) for entry in series]
+        self.budget = budget or (1 if SEQUENTIAL else MATCH_WORKERS)
+        self.turns = deque()  # Series with matches left, in round-robin order
+
+    def next_match(self):
+        """Pop the next match from the series whose turn it is"""
+        while self.turns:
+            state = self.turns.popleft()
+            if state.pending:
+                self.turns.append(state)
+                state.submitted += 1
+                return state, state.pending.popleft()
+        return None, None
+
+    def run(self):
+        run_manifest.load()
+        for state in self.states:
+            print(f"\n📚 Listing series {state.name}")
+            state.list_matches()
+            print(f"🆕 {state.name}: {state.total} completed matches to process or recheck.")
+        league_projector.count_remaining([match for state in self.states for match in state.matches])
+
+        team_points = TeamPointsAggregator()
+        self.turns.extend(state for state in self.states if state.pending)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.budget, thread_name_prefix="series") as executor:
+            def fill():
+                while len(running) < self.budget:
+                    state, match = self.next_match()
+                    if match is None:
+                        return
+                    future = executor.submit(process_match, match["scorecard_url"], state.submitted - 1, state.total,
+                                             match.get("series"))
+                    running[future] = state
+
+            fill()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    state = running.pop(future)
+                    try:
+                        leaderboard = score_match_data(future.result())
+                        if leaderboard is None:
+                            state.stats["skipped"] += 1
+                        else:
+                            write_match_points(leaderboard, team_points)
+                            state.stats["processed"] += 1
+                    except Exception as e:
+                        state.stats["failed"] += 1
+                        print(f"❌ {state.name}: match failed: {e}")
+                fill()
+        run_manifest.complete_empty()
+
+        print("\n📊 Series summary")
+        for state in self.states:
+            print(f"  {state.name}: {state.stats['listed']} listed, {state.stats['processed']} processed, "
+                  f"{state.stats['skipped']} skipped, {state.stats['failed']} failed")
+        return {state.name: state.stats for state in self.states}
+
+def run_series(names=None, registry_path=SERIES_REGISTRY_PATH):
+    """Schedule the named series (default: every enabled series in the registry)"""
+    registry = load_series_registry(registry_path)
+    unknown = [name for name in names or [] if name not in registry]
+    if unknown:
+        raise ValueError(f"Unknown series {', '.join(unknown)}; registered: {', '.join(registry)}")
+    series = [registry[name] for name in names] if names else [entry for entry in registry.values() if entry.get("enabled", True)]
+    summary = SeriesScheduler(series).run()
+    print_cache_stats()
+    print("\n🏏 Scraping complete!")
+    return summary
+
+# Rescore: rerun the scoring over archived raw stats and write only the player_points rows that moved
+
+def parse_match_ranges(specs):
+    """Turn `--rescore` arguments ('113901', '113901-113920') into a match ID filter (None = every match)"""
+    if not specs:
+        return None
+    ranges = []
+    for spec in specs:
+        low, _, high = str(spec).partition("-")
+        ranges.append((int(low), int(high or low)))
+    return lambda match_id: any(low <= int(match_id) <= high for low, high in ranges)
+
+def diff_player_points(df_rescored, df_stored):
+    """Split rescored rows into changed / added / unchanged against the stored rows.
+
+    Returns (rows to upsert, counts). Stored rows the rescore no longer produces are only counted.
+    """
+    merged = df_rescored.merge(df_stored, on=['match_id', 'player_name'], how='outer',
+                               suffixes=('', '_stored'), indicator=True)
+    added = merged['_merge'] == 'left_only'
+    stale = merged['_merge'] == 'right_only'
+    both = merged['_merge'] == 'both'
+    moved = np.zeros(len(merged), dtype=bool)
+    for column in POINT_COLUMNS:
+        moved |= ~np.isclose(merged[column].astype(float), merged[f'{column}_stored'].astype(float), atol=1e-6)
+    moved |= merged['team'].astype(str) != merged['team_stored'].astype(str)
+    changed = both & moved
+    counts = {
+        "rescored": int((~stale).sum()),
+        "changed": int(changed.sum()),
+        "added": int(added.sum()),
+        "unchanged": int((both & ~moved).sum()),
+        "stale": int(stale.sum()),
+    }
+    return merged.loc[changed | added, df_rescored.columns].reset_index(drop=True), counts
+
+def archived_fielding(frames):
+    """Fielding rows for archived matches, re-derived from their dismissals so parser fixes reach old matches.
+
+    Matches archived before the batting rows kept their dismissal text use their stored fielding rows.
+    """
+    df_batting = frames["batting"]
+    if "Dismissal" not in df_batting:
+        return frames["fielding"]
+    derived = fielding_frame(df_batting, frames["bowling"]).astype(RECORD_SCHEMAS["fielding"])
+    with_dismissals = df_batting.loc[df_batting["Dismissal"].notna(), "Match_ID"].astype(str).unique()
+    stored = frames["fielding"][~frames["fielding"]["Match_ID"].astype(str).isin(with_dismissals)]
+    return pd.concat([stored, derived], ignore_index=True)
+
+@metrics.timed("rescore")
+def rescore(match_filter=None, series=None, dry_run=False):
+    """Rescore archived matches with the current rules, upserting only the player_points rows that changed"""
+    archived = [(name, match_id) for name, match_id in archived_matches(series, root=STATS_ARCHIVE_DIR)
+                if match_filter is None or match_filter(match_id)]
+    match_ids = sorted({match_id for _, match_id in archived}, key=int)
+    if not match_ids:
+        print(f"⚠️ No archived matches to rescore in {STATS_ARCHIVE_DIR}.")
+        return {"matches": 0}
+    print(f"🔄 Rescoring {len(match_ids)} archived matches...")
+
+    frames = load_match_stats(series, match_ids, root=STATS_ARCHIVE_DIR)  # The same compact dtypes a scrape parses into
+    df_batting, df_bowling, df_fielding = prepare_frames(frames["batting"], frames["bowling"], archived_fielding(frames))
+    df_rescored = to_player_points(calculate_points(df_batting, df_bowling, df_fielding, frames["potm"]))
+    df_rescored = df_rescored.astype({'match_id': str, 'team': str})
+
+    with metrics.stage("rescore_load_stored"):
+        stored = fetch_all_rows("player_points", "match_id, player_name, team, " + ", ".join(POINT_COLUMNS),
+                                match_id=match_ids)
+    df_stored = pd.DataFrame(stored, columns=['match_id', 'player_name', 'team'] + POINT_COLUMNS)
+    df_stored['match_id'] = df_stored['match_id'].astype(str)
+
+    df_upsert, counts = diff_player_points(df_rescored, df_stored)
+    counts["matches"] = len(match_ids)
+    for outcome in ("changed", "added", "unchanged", "stale"):
+        metrics.count("rescore_rows", counts[outcome], outcome=outcome)
+    print(f"📈 Rescored {counts['rescored']} player rows over {counts['matches']} matches: "
+          f"{counts['changed']} changed, {counts['added']} new, {counts['unchanged']} unchanged"
+          + (f", {counts['stale']} stored rows no longer produced" if counts['stale'] else "") + ".")
+
+    if df_upsert.empty or dry_run:
+        if dry_run and not df_upsert.empty:
+            print(f"📝 Dry run: {len(df_upsert)} rows would be written.")
+        return counts
+
+    insert_player_points(df_upsert.copy())
+    # Team totals are per match, so they are recomputed from every player row of the affected matches
+    affected = df_rescored[df_rescored['match_id'].isin(df_upsert['match_id'])]
+    TeamPointsAggregator().write(affected)
+    update_prices()  # Past matches moved, so the running aggregates are rebuilt from the stored points
+    bump_data_version()
+    return counts
+
+def run_rescore(specs=None, series_names=None, registry_path=SERIES_REGISTRY_PATH, dry_run=False):
+    """`--rescore`: pick the archived matches by ID range and/or registry series, then rescore them"""
+    series = None
+    if series_names:
+        registry = load_series_registry(registry_path)
+        unknown = [name for name in series_names if name not in registry]
+        if unknown:
+            raise ValueError(f"Unknown series {', '.join(unknown)}; registered: {', '.join(registry)}")
+        series = [series_key(registry[name]["url"]) for name in series_names]
+    return rescore(parse_match_ranges(specs), series, dry_run)
+
+# Live mode: poll one in-progress match and write only the players whose points moved
+LIVE_POLL_SECONDS = float(os.getenv("LIVE_POLL_SECONDS", "30"))
+
+def scorecard_stat_lines(scorecard):
+    """Flatten an extracted scorecard into {(section, innings, player): stat line} for diffing polls"""
+    lines = {}
+    for innings, table in enumerate(scorecard["batting_tables"], 1):
+        for row in table:
+            lines[("batting", innings, row[1])] = tuple(row[2:])
+    for innings, table in enumerate(scorecard["bowling_tables"], 1):
+        for row in table:
+            lines[("bowling", innings, row[1])] = tuple(row[2:-1])  # The highlights link isn't a stat
+    dismissals = [(innings, row[-1]) for innings, table in enumerate(scorecard["batting_tables"], 1) for row in table]
+    records = parse_dismissals([text for _, text in dismissals])
+    credits = {}
+    for (innings, _), kind, fielders, substitutes in zip(dismissals, records["kind"], records["fielders"], records["substitutes"]):
+        column = FIELDING_CREDITS.get(kind)
+        for fielder, substitute in zip(fielders, substitutes):
+            if column and not substitute:
+                credits.setdefault(("fielding", innings, fielder), dict.fromkeys(FIELDING_COLUMNS, 0))[column] += 1
+    lines.update((key, tuple(line.values())) for key, line in credits.items())
+    return lines
+
+class LiveMatchScorer:
+    """Score one in-progress match incrementally from successive scorecard polls (`--live`).
+
+    Each poll is diffed against the previous one: only players with a changed batting, bowling
+    or fielding line (or a new Player of the Match) are rescored, and only rows whose points
+    actually moved are upserted. The scorecard is extracted once per poll, and dot balls are
+    only looked up for changed bowling lines (commentary of their innings, else highlights);
+    unchanged bowlers keep the count from the previous poll. The matches row is left to the
+    regular run once the result is in.
+    """
+
+    def __init__(self, match_id, scorecard_url=None):
+        self.match_id = str(match_id)
+        # Cricbuzz resolves match pages by ID, the slug only has to be present
+        self.scorecard_url = scorecard_url or f"/live-cricket-scorecard/{self.match_id}/live"
+        self.scorecard_digest = None
+        self.stat_lines = {}
+        self.potm_id = None
+        self.dots = {}  # (innings, bowler) -> dot balls, for the bowling lines of the last poll
+        self.points = {}  # player_name -> (batting, bowling, fielding, potm) last written
+        self.stats = {"polls": 0, "unchanged": 0, "players_rescored": 0, "rows_written": 0}
+
+    def poll(self):
+        """Fetch the scorecard once and write the deltas; returns the number of rows written"""
+        self.stats["polls"] += 1
+        scorecard_html = fetch_scorecard(self.match_id)
+        if not scorecard_html:
+            return 0
+
+        digest = scorecard_digest(scorecard_html)
+        if digest == self.scorecard_digest:
+            self.stats["unchanged"] += 1
+            return 0
+        self.scorecard_digest = digest
+
+        scorecard = parse_html(extract_scorecard, scorecard_html)
+        stat_lines = scorecard_stat_lines(scorecard)
+        changed_lines = {
+            key for key in stat_lines.keys() | self.stat_lines.keys()
+            if stat_lines.get(key) != self.stat_lines.get(key)
+        }
+        self.stat_lines = stat_lines
+
+        potm = extract_potm(match_page_url(self.scorecard_url))
+        if not changed_lines and (potm is None or potm['Player_ID'] == self.potm_id):
+            self.stats["unchanged"] += 1
+            return 0
+
+        return self.rescore(scorecard, changed_lines, potm)
+
+    def resolve_dots(self, bowling_tables, changed_lines):
+        """Fill in dot balls, fetching commentary only for the innings with a changed bowling line"""
+        changed = {(innings, name) for section, innings, name in changed_lines if section == "bowling"}
+        changed.update((innings, row[1]) for innings, table in enumerate(bowling_tables, 1) for row in table
+                       if (innings, row[1]) not in self.dots)
+        balls = {innings: fetch_innings_commentary(self.match_id, innings) for innings in sorted({i for i, _ in changed})}
+        balls = {innings: innings_balls for innings, innings_balls in balls.items() if innings_balls}
+        fill_dot_balls(
+            [[row for row in table if (innings, row[1]) in changed] for innings, table in enumerate(bowling_tables, 1)],
+            parse_commentary_events(balls) if balls else None,
+        )
+        dots = {}
+        for innings, table in enumerate(bowling_tables, 1):
+            for row in table:
+                if (innings, row[1]) not in changed:
+                    row[-1] = self.dots[(innings, row[1])]
+                dots[(innings, row[1])] = row[-1]
+        self.dots = dots
+
+    def rescore(self, scorecard, changed_lines, potm):
+        """Score the players behind the changed lines and upsert the rows whose points differ"""
+        resolve_full_names(scorecard)
+        self.resolve_dots(scorecard["bowling_tables"], changed_lines)
+        frames = scorecard_records(self.match_id, scorecard["batting_tables"], scorecard["bowling_tables"],
+                                   scorecard["team_names"], scorecard["dnb_players"], potm).frames()
+        df_batting, df_bowling, df_fielding, df_potm = (frames[kind] for kind in ("batting", "bowling", "fielding", "potm"))
+
+        # Map the scorecard/dismissal names in the changed lines to full names
+        full_names = dict(zip(df_batting['Batsman'], df_batting['Full Name']))
+        full_names.update(zip(df_bowling['Bowler'], df_bowling['Full Name']))
+        raw_fielders = list(df_fielding['Player'])
+        df_batting, df_bowling, df_fielding = prepare_frames(df_batting, df_bowling, df_fielding)
+        full_names.update(zip(raw_fielders, df_fielding['Player']))
+        players = {full_names[name] for _, _, name in changed_lines if name in full_names}
+
+        potm_id = df_potm['Player_ID'].iloc[0] if not df_potm.empty else None
+        if potm_id is not None and potm_id != self.potm_id:
+            players.add(fetch_player_name_from_cricbuzz(potm_id))
+            self.potm_id = potm_id
+
+        self.stats["players_rescored"] += len(players)
+        leaderboard = calculate_points(
+            df_batting[df_batting['Full Name'].isin(players)].copy(),
+            df_bowling[df_bowling['Full Name'].isin(players)].copy(),
+            df_fielding[df_fielding['Player'].isin(players)].copy(),
+            df_potm,
+        )
+
+        df_player_points = to_player_points(leaderboard)
+        point_columns = ['batting_points', 'bowling_points', 'fielding_points', 'potm_points']
+        current = dict(zip(df_player_points['player_name'], df_player_points[point_columns].itertuples(index=False, name=None)))
+        deltas = [name for name, points in current.items() if self.points.get(name) != points]
+        if not deltas:
+            return 0
+
+        insert_player_points(df_player_points[df_player_points['player_name'].isin(deltas)].copy())
+        self.points.update((name, current[name]) for name in deltas)
+        bump_data_version()
+        self.stats["rows_written"] += len(deltas)
+        return len(deltas)
+
+def run_live(match_id, poll_seconds=LIVE_POLL_SECONDS, max_polls=None):
+    """Poll a match until its Player of the Match is announced (or Ctrl+C), writing point deltas as they happen"""
+    scorer = LiveMatchScorer(match_id)
+    print(f"📡 Live scoring match {match_id} every {poll_seconds:g}s (Ctrl+C to stop)")
+    try:
+        while max_polls is None or scorer.stats["polls"] < max_polls:
+            started = time.monotonic()
+            written = scorer.poll()
+            if written:
+                print(f"✅ Poll {scorer.stats['polls']}: {written} player rows updated.")
+            if scorer.potm_id is not None:
+                print("🏁 Player of the Match announced, match complete.")
+                break
+            time.sleep(max(0.0, poll_seconds - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        print("\n⏹️ Live scoring stopped.")
+
+    print(f"📌 {scorer.stats['polls']} polls ({scorer.stats['unchanged']} unchanged), "
+          f"{scorer.stats['players_rescored']} players rescored, {scorer.stats['rows_written']} rows written.")
+    return scorer.stats
+
+def print_cache_stats():
+    """Print hit/miss counts for the profile and HTTP caches"""
+    cache_stats = profile_cache.stats()
+    print(f"\n🗂️ Profile cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate)")
+    print(f"🗂️ HTTP cache: {http_cache.stats['hits']} hits, {http_cache.stats['revalidated']} revalidated, "
+          f"{http_cache.stats['misses']} misses, {http_cache.stats['evicted']} evicted")
+
+def run_summary():
+    """Everything the run recorded, plus cache hit rates, as one JSON-serializable dict"""
+    finished_at = time.time()
+    http = {}
+    for counter, field in [("http_requests", "requests"), ("http_network_requests", "network"),
+                           ("http_cache_hits", "cache_hits"), ("http_revalidated", "revalidated"),
+                           ("http_retries", "retries"), ("http_errors", "errors"), ("http_bytes", "bytes")]:
+        for endpoint, value in metrics.totals(counter, "endpoint").items():
+            http.setdefault(endpoint, dict.fromkeys(["requests", "network", "cache_hits", "revalidated",
+                                                      "retries", "errors", "bytes"], 0))[field] = value
+
+    matches = metrics.total("matches_processed")
+    http_lookups = http_cache.stats["hits"] + http_cache.stats["revalidated"] + http_cache.stats["misses"]
+    return {
+        "started_at": datetime.fromtimestamp(metrics.started_at, timezone.utc).isoformat(),
+        "finished_at": datetime.fromtimestamp(finished_at, timezone.utc).isoformat(),
+        "duration_seconds": round(finished_at - metrics.started_at, 3),
+        "matches_processed": matches,
+        "requests_per_match": round(sum(e["requests"] for e in http.values()) / matches, 2) if matches else None,
+        "stages": {stage: dict(timing, seconds=round(timing["seconds"], 4), max_seconds=round(timing["max_seconds"], 4))
+                   for stage, timing in sorted(metrics.stages.items())},
+        "http": http,
+        "db_requests": metrics.totals("db_requests", "table"),
+        "rows_written": metrics.totals("rows_written", "table"),
+        "rows_failed": metrics.totals("rows_failed", "table"),
+        "caches": {
+            "http": dict(http_cache.stats, hit_rate=round((http_cache.stats["hits"] + http_cache.stats["revalidated"]) / http_lookups, 4)
+                         if http_lookups else 0.0),
+            "profile": profile_cache.stats(),
+        },
+    }
+
+def prometheus_text(summary):
+    """Render a run summary in the Prometheus text exposition format (for node_exporter's textfile collector)"""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP scraper_{name} {help_text}")
+        lines.append(f"# TYPE scraper_{name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+            lines.append(f"scraper_{name}{{{label_text}}} {value}" if label_text else f"scraper_{name} {value}")
+
+    metric("last_run_timestamp_seconds", "gauge", "When the last run finished.",
+           [({}, round(datetime.fromisoformat(summary["finished_at"]).timestamp(), 3))])
+    metric("run_duration_seconds", "gauge", "Wall time of the last run.", [({}, summary["duration_seconds"])])
+    metric("matches_processed", "gauge", "Matches fetched and parsed in the last run.", [({}, summary["matches_processed"])])
+    metric("stage_seconds", "gauge", "Total wall time per stage (stages may nest).",
+           [({"stage": stage}, timing["seconds"]) for stage, timing in summary["stages"].items()])
+    metric("stage_calls", "gauge", "Calls per stage.",
+           [({"stage": stage}, timing["calls"]) for stage, timing in summary["stages"].items()])
+    for field, help_text in [("requests", "HTTP requests made by the scraper."),
+                             ("network", "HTTP requests that went to the network."),
+                             ("cache_hits", "HTTP requests answered from the response cache."),
+                             ("revalidated", "HTTP requests answered 304 Not Modified."),
+                             ("retries", "HTTP retries fired."),
+                             ("errors", "HTTP requests that failed."),
+                             ("bytes", "Response bytes downloaded.")]:
+        metric(f"http_{field}", "gauge", help_text,
+               [({"endpoint": endpoint}, counts[field]) for endpoint, counts in summary["http"].items()])
+    metric("rows_written", "gauge", "Rows upserted per table.",
+           [({"table": table}, rows) for table, rows in summary["rows_written"].items()])
+    metric("rows_failed", "gauge", "Rows that could not be written per table.",
+           [({"table": table}, rows) for table, rows in summary["rows_failed"].items()])
+    metric("cache_hit_ratio", "gauge", "Cache hit rate in the last run.",
+           [({"cache": name}, stats["hit_rate"]) for name, stats in summary["caches"].items()])
+    return "\n".join(lines) + "\n"
+
+def write_atomically(path, text):
+    """Write via a temporary file so readers (e.g. node_exporter) never see a partial file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def write_run_summary(json_path=METRICS_JSON_PATH, prom_path=METRICS_PROM_PATH):
+    """Write the run summary as JSON and as a Prometheus textfile"""
+    summary = run_summary()
+    if json_path:
+        write_atomically(json_path, json.dumps(summary, indent=2))
+    if prom_path:
+        write_atomically(prom_path, prometheus_text(summary))
+    print(f"📈 Run summary: {summary['matches_processed']} matches in {summary['duration_seconds']:.1f}s, "
+          f"{sum(e['requests'] for e in summary['http'].values())} HTTP requests, "
+          f"{sum(summary['rows_written'].values())} rows written ({json_path}, {prom_path})")
+    return summary
+
+def main(stream=False):
+    """Main function to execute the scraper"""
+    # ✅ 1. Load the run manifest (how far every match got in earlier runs)
+    print("🔄 Loading the run manifest...")
+    run_manifest.load()
+    stages = run_manifest.summary()
+    if stages["written"]:
+        print(f"📌 Found {stages['written']} written matches in database.")
     else:
-        existing_match_ids = set()
-        print("⚠️ No existing matches found in database.")
+        print("⚠️ No written matches found in database.")
 
-    # ✅ 2. Get the list of **NEW scorecard URLs only**
+    # ✅ 2. Get the series listing and record the matches it shows for the first time
     all_matches = get_scorecard_urls(SERIES_URL)
-    
-    # ✅ 3. Filter out matches that are:
-    #    - Already in the database
-    #    - Have "Result Pending"
-    new_matches = [
-        match for match in all_matches
-        if match["match_id"] not in existing_match_ids and match["result"] != "Result Pending"
-    ]
-
-    print(f"🆕 {len(new_matches)} new completed matches to process.\n")
-
-    # ✅ 4. Process ONLY new matches
-    for i, match in enumerate(new_matches):
-        process_match(match["scorecard_url"], i, len(new_matches))
-
-    # ✅ 5. Concatenate DataFrames only if data exists
-    df_batting_final = pd.concat(all_batting_data, ignore_index=True) if all_batting_data else pd.DataFrame()
-    df_bowling_final = pd.concat(all_bowling_data, ignore_index=True) if all_bowling_data else pd.DataFrame()
-    df_fielding_final = pd.concat(all_fielding_data, ignore_index=True) if all_fielding_data else pd.DataFrame()
-    df_potm_final = pd.concat(all_potm_data, ignore_index=True) if all_potm_data else pd.DataFrame()
+    league_projector.count_remaining(all_matches)
+    run_manifest.list(all_matches)
 
-    # ✅ 6. Check if any data exists before proceeding
-    if df_batting_final.empty and df_bowling_final.empty and df_fielding_final.empty and df_potm_final.empty:
-        print("⚠️ No player data collected. Exiting.")
+    # ✅ 3. Keep the completed matches that are:
+    #    - Not written yet (new, or stopped part-way through an earlier run)
+    #    - Written but recent enough to check for a corrected scorecard
+    new_matches = [match for match in all_matches if run_manifest.needs_processing(match)]
+
+    print(f"🆕 {len(new_matches)} completed matches to process or recheck.\n")
+
+    # ✅ 4. Process ONLY new matches (streaming mode scores and writes each match as it completes)
+    if stream:
+        stream_matches(new_matches)
+        print_cache_stats()
+        print("\n🏏 Scraping complete!")
         return
 
-    for batsman, full_name in zip(df_batting_final['Batsman'], df_batting_final['Full Name']):
-        batsman_variations = create_name_variations(batsman)
-        full_name_variations = create_name_variations(full_name)
-        
-        for variation in batsman_variations | full_name_variations:
-            name_mapping[variation.lower()] = full_name
+    process_matches(new_matches)
+    run_manifest.complete_empty()
 
-    # Update player names in fielding DataFrame
-    df_fielding_final['Player'] = df_fielding_final['Player'].apply(
-        lambda x: name_mapping.get(x.strip().lower(), x)
+    # ✅ 5. Build one DataFrame per kind from the run's records
+    frames = run_records.frames()
+    df_batting_final, df_bowling_final, df_fielding_final, df_potm_final = (
+        frames[kind] for kind in ("batting", "bowling", "fielding", "potm")
     )
 
-    # Now drop the Batsman column
-    df_batting_final = df_batting_final.drop('Batsman', axis=1)
-    df_bowling_final = df_bowling_final.drop('Bowler', axis=1)
+    # ✅ 6. Check if any data exists before proceeding
+    if df_batting_final.empty and df_bowling_final.empty and df_fielding_final.empty and df_potm_final.empty:
+        print("⚠️ No player data collected. Exiting.")
+        return
+
+    # Update player names in fielding DataFrame, then drop the Batsman/Bowler columns
+    df_batting_final, df_bowling_final, df_fielding_final = prepare_frames(df_batting_final, df_bowling_final, df_fielding_final)
 
     # Display final DataFrames
     print("\nBatting Statistics (All Matches)")
@@ -878,25 +2669,73 @@ def main():
     leaderboard = calculate_points(df_batting_final, df_bowling_final, df_fielding_final, df_potm_final)
 
     # Prepare player points for Supabase
-    df_player_points = leaderboard.rename(columns={
-        "Full Name": "player_name",
-        "Match_ID": "match_id",
-        "Team": "team",
-        "Batting_Points": "batting_points",
-        "Bowling_Points": "bowling_points",
-        "Fielding_Points": "fielding_points",
-        "POTM_Points": "potm_points",
-        "Fantasy_Points": "total_points"
-    })[['match_id', 'player_name', 'team', 'batting_points', 'bowling_points', 'fielding_points', 'potm_points', 'total_points']]
+    df_player_points = to_player_points(leaderboard)
 
-    # ✅ 7. Insert Player Points into Database
+    # ✅ 7. Insert Player Points into Database, then total every user team for these matches
     if not df_player_points.empty:
-        insert_player_points(df_player_points)
+        write_points(df_player_points, TeamPointsAggregator())
 
     print("\nFinal Fantasy Points Leaderboard")
     print(leaderboard)
 
+    print_cache_stats()
+
     print("\n🏏 Scraping complete!")
 
+def parse_args():
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Scrape Cricbuzz scorecards and compute fantasy points")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"Matches processed concurrently (default: {MATCH_WORKERS})")
+    parser.add_argument("--fetch-workers", type=int, default=None,
+                        help=f"Player/highlights pages fetched concurrently (default: {FETCH_WORKERS})")
+    parser.add_argument("--sequential", action="store_true",
+                        help="Process matches one at a time, as the original scraper did")
+    parser.add_argument("--parse-processes", type=int, default=None,
+                        help=f"Processes that parse fetched HTML, so parsing uses every core (default: {PARSE_PROCESSES}, inline)")
+    parser.add_argument("--replay", action="store_true",
+                        help="Serve every Cricbuzz request from the on-disk HTTP cache (no network)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Score and write each match as soon as it is parsed instead of after the whole run")
+    parser.add_argument("--series", nargs="*", metavar="NAME",
+                        help="Run these series from the registry together (no names: every enabled series)")
+    parser.add_argument("--registry", default=SERIES_REGISTRY_PATH,
+                        help=f"Series registry file (default: {SERIES_REGISTRY_PATH})")
+    parser.add_argument("--metrics-json", default=METRICS_JSON_PATH,
+                        help=f"Where to write the run summary JSON (default: {METRICS_JSON_PATH}, '' to skip)")
+    parser.add_argument("--metrics-prom", default=METRICS_PROM_PATH,
+                        help=f"Where to write the Prometheus textfile (default: {METRICS_PROM_PATH}, '' to skip)")
+    parser.add_argument("--rescore", nargs="*", metavar="MATCH_IDS",
+                        help="Rescore archived matches (IDs or ranges like 113901-113920; none: all, or those of --series) "
+                             "and write only the rows that changed")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="With --rescore, report what would change without writing")
+    parser.add_argument("--archive-dir", default=STATS_ARCHIVE_DIR,
+                        help=f"Where raw match stats are archived as Parquet (default: {STATS_ARCHIVE_DIR}, '' to skip)")
+    parser.add_argument("--storage", choices=["supabase", "sqlite"], default=STORAGE_BACKEND,
+                        help="Where matches and points are read from and written to")
+    parser.add_argument("--sqlite-path", default=SQLITE_PATH,
+                        help="Database file for --storage sqlite")
+    parser.add_argument("--live", metavar="MATCH_ID",
+                        help="Poll one in-progress match and write point changes as they happen")
+    parser.add_argument("--poll-interval", type=float, default=LIVE_POLL_SECONDS,
+                        help=f"Seconds between live scorecard polls (default: {LIVE_POLL_SECONDS:g})")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    STATS_ARCHIVE_DIR = args.archive_dir
+    configure_storage(args.storage, args.sqlite_path)
+    configure_concurrency(args.workers, args.fetch_workers, args.sequential or SEQUENTIAL, args.replay or HTTP_REPLAY,
+                          args.parse_processes)
+    try:
+        if args.live:
+            run_live(args.live, args.poll_interval)
+        elif args.rescore is not None:
+            run_rescore(args.rescore, args.series, args.registry, args.dry_run)
+        elif args.series is not None:
+            run_series(args.series, args.registry)
+        else:
+            main(stream=args.stream)
+    finally:
+        write_run_summary(args.metrics_json, args.metrics_prom)  # Also after a failed run, which is when it matters most
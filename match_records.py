@@ -0,0 +1,156 @@
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from dismissals import fielding_frame
+
+# Typed record buffers for parsed scorecard rows.
+#
+# A scraped match is a few dozen batting, bowling, fielding and POTM rows. Rather than one small
+# DataFrame per innings (with its numbers left as text for the scoring to coerce later), each
+# row is appended to a RecordBuffer: counts are parsed once into small-int arrays, decimals into
+# float64 arrays, and names/teams/IDs into int32 dictionary codes. A run extends one set of
+# buffers with every match and builds a single DataFrame per kind at the end, already in the
+# compact dtypes below (the same ones the stats archive stores). The fielding frame is derived
+# from the whole batting Dismissal column at that point (see dismissals.py).
+
+RECORD_SCHEMAS = {
+    "batting": {
+        "Full Name": "category", "Batsman": "category", "Runs": "int16", "Balls": "int16", "4s": "int8",
+        "6s": "int8", "SR": "float64", "Innings": "int8", "Match_ID": "category", "Team": "category",
+        "Dismissal": "category",
+    },
+    "bowling": {
+        "Full Name": "category", "Bowler": "category", "Overs": "float64", "Maidens": "int8", "Runs": "int16",
+        "Wickets": "int8", "No Balls": "int8", "Wides": "int8", "Econ": "float64", "Dots": "int16",
+        "Innings": "int8", "Match_ID": "category", "Team": "category",
+    },
+    "fielding": {
+        "Player": "category", "Catches": "int8", "Stumpings": "int8", "Run Outs": "int8", "Innings": "int8",
+        "Team": "category", "Match_ID": "category",
+    },
+    "potm": {"Match_ID": "category", "Player_Name": "category", "Player_ID": "category"},
+}
+RECORD_KINDS = list(RECORD_SCHEMAS)
+BUFFERED_KINDS = ["batting", "bowling", "potm"]  # Fielding rows are derived from the batting dismissals
+
+# array typecodes for each dtype; categories are stored as int32 codes (-1 = missing)
+TYPECODES = {"int8": "b", "int16": "h", "float64": "d", "category": "i"}
+NUMPY_DTYPES = {"b": np.int8, "h": np.int16, "d": np.float64, "i": np.int32}
+
+
+def parse_count(value):
+    """A scorecard count as an int; blanks and text such as '-' count as 0, as the scoring treats them"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return int(parse_decimal(value))
+
+
+def parse_decimal(value):
+    """A strike rate, economy or overs figure as a float (0.0 when it isn't a number)"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return number if number == number else 0.0  # NaN -> 0
+
+
+class RecordBuffer:
+    """Column arrays for one kind of row, appended to one row at a time"""
+
+    __slots__ = ("kind", "schema", "columns", "categories")
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.schema = RECORD_SCHEMAS[kind]
+        self.columns = {column: array(TYPECODES[dtype]) for column, dtype in self.schema.items()}
+        self.categories = {column: {} for column, dtype in self.schema.items() if dtype == "category"}
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    def code(self, column, value):
+        """Dictionary code of a category value, added on first sight"""
+        if value is None:
+            return -1
+        categories = self.categories[column]
+        return categories.setdefault(str(value), len(categories))
+
+    def append(self, row):
+        """Add one row given as {column: value}; missing columns are 0 / missing"""
+        for column, dtype in self.schema.items():
+            value = row.get(column)
+            if dtype == "category":
+                self.columns[column].append(self.code(column, value))
+            elif dtype == "float64":
+                self.columns[column].append(parse_decimal(value))
+            else:
+                self.columns[column].append(parse_count(value))
+
+    def append_frame(self, df):
+        """Add every row of a frame, e.g. one read back from the stats archive"""
+        for row in df.astype(object).where(df.notna(), None).to_dict("records"):
+            self.append(row)
+
+    def extend(self, other):
+        """Append every row of another buffer of the same kind, re-coding its categories"""
+        for column, values in self.columns.items():
+            if column in self.categories:
+                recode = [self.code(column, value) for value in other.categories[column]]
+                values.extend(array("i", (recode[code] if code >= 0 else -1 for code in other.columns[column])))
+            else:
+                values.extend(other.columns[column])
+
+    def clear(self):
+        for values in self.columns.values():
+            del values[:]
+        for categories in self.categories.values():
+            categories.clear()
+
+    def to_frame(self):
+        """One DataFrame with the compact schema dtypes"""
+        data = {}
+        for column, values in self.columns.items():
+            numbers = np.frombuffer(values, dtype=NUMPY_DTYPES[values.typecode]).copy()  # A copy, so the array can keep growing
+            if column in self.categories:
+                data[column] = pd.Categorical.from_codes(numbers, categories=list(self.categories[column]))
+            else:
+                data[column] = numbers
+        return pd.DataFrame(data)
+
+
+class MatchRecords:
+    """One RecordBuffer per parsed kind: a match's rows, or a whole run's"""
+
+    __slots__ = ("buffers",)
+
+    def __init__(self):
+        self.buffers = {kind: RecordBuffer(kind) for kind in BUFFERED_KINDS}
+
+    @classmethod
+    def from_frames(cls, frames):
+        """Records holding the rows of {kind: DataFrame} (fielding is derived again, as for parsed rows)"""
+        records = cls()
+        for kind, buffer in records.buffers.items():
+            if kind in frames:
+                buffer.append_frame(frames[kind])
+        return records
+
+    def __getitem__(self, kind):
+        return self.buffers[kind]
+
+    def extend(self, other):
+        for kind, buffer in self.buffers.items():
+            buffer.extend(other[kind])
+
+    def clear(self):
+        for buffer in self.buffers.values():
+            buffer.clear()
+
+    def frames(self):
+        """{kind: DataFrame} for every kind, fielding included"""
+        frames = {kind: buffer.to_frame() for kind, buffer in self.buffers.items()}
+        frames["fielding"] = fielding_frame(frames["batting"], frames["bowling"]).astype(RECORD_SCHEMAS["fielding"])
+        return frames
@@ -0,0 +1,228 @@
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from storage import open_storage
+from dotenv import load_dotenv
+from collections import OrderedDict
+import pandas as pd
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Read-only points service: serves what the scraper (main.py) has already written to storage.
+#
+#     uvicorn points_api:app --port 8000
+#
+# Resources are built once per data version and kept in a bounded in-memory LRU. The scraper
+# bumps the `points` row of the data_versions table after every write, which drops the cache.
+
+# Load environment variables
+load_dotenv()
+
+storage = open_storage()  # STORAGE_BACKEND / SQLITE_PATH pick Supabase or a local SQLite file
+
+VERSION_CHECK_SECONDS = float(os.getenv("VERSION_CHECK_SECONDS", "5"))  # How often the data version is re-read
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))  # Bounds staleness of league membership
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))  # Resources kept in memory at once
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+app = FastAPI(title="Fantasy points API")
+
+
+def fetch_table(table, columns, **eq_filters):
+    """Select every row of a table (optionally filtered with `column=value`)"""
+    return storage.select_all(table, columns, **eq_filters)
+
+
+def fetch_data_version():
+    """The version the scraper last wrote (None before its first run)"""
+    return storage.get_data_version("points")
+
+
+class ResponseCache:
+    """Built resources keyed by request, least recently used first out, dropped when the data version moves.
+
+    Entries remember the data version they were built under: one built from rows read before
+    a version bump is never stored or served after it.
+    """
+
+    def __init__(self, ttl_seconds=RESPONSE_CACHE_TTL, check_seconds=VERSION_CHECK_SECONDS,
+                 max_entries=RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.check_seconds = check_seconds
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (built_at, version, value), least recently used first
+        self.version = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+        self.key_locks = {}  # key -> lock held while that key is being built
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    def check_version(self):
+        """Re-read the data version at most every `check_seconds`, clearing the cache if it moved"""
+        now = time.monotonic()
+        if now - self.checked_at < self.check_seconds:
+            return self.version
+        try:
+            version = fetch_data_version()
+        except Exception as e:
+            print(f"⚠️ Could not read the data version, keeping the cache: {e}")
+            self.checked_at = now
+            return self.version
+        with self.lock:
+            self.checked_at = now
+            if version != self.version:
+                self.version = version
+                self.entries.clear()
+                self.stats["invalidations"] += 1
+        return version
+
+    def lookup(self, key):
+        """The fresh value for `key` built under the current version, marked recently used (else None)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] != self.version or time.monotonic() - entry[0] >= self.ttl_seconds:
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry
+
+    def get(self, key, build):
+        """Return the cached value for `key`, building it once even when requests arrive together"""
+        self.check_version()
+        entry = self.lookup(key)
+        if entry is not None:
+            return entry[2]
+
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            entry = self.lookup(key)  # Another request may have built it while we waited
+            if entry is not None:
+                return entry[2]
+            version = self.version
+            try:
+                value = build()
+            finally:
+                with self.lock:
+                    self.key_locks.pop(key, None)  # Also when the build fails, so failing keys don't pile up
+            with self.lock:
+                self.stats["misses"] += 1
+                if version == self.version:  # Don't keep rows read before a version bump
+                    self.entries[key] = (time.monotonic(), version, value)
+                    self.entries.move_to_end(key)
+                    while len(self.entries) > self.max_entries:
+                        self.entries.popitem(last=False)
+                        self.stats["evictions"] += 1
+            return value
+
+
+cache = ResponseCache()
+
+
+def player_points_frame():
+    """Every player_points row, loaded once per data version"""
+    def build():
+        rows = fetch_table("player_points", "match_id, player_name, team, batting_points, bowling_points, "
+                                            "fielding_points, potm_points, total_points")
+        df = pd.DataFrame(rows, columns=["match_id", "player_name", "team", "batting_points", "bowling_points",
+                                         "fielding_points", "potm_points", "total_points"])
+        df["match_id"] = df["match_id"].astype(str)
+        return df
+    return cache.get(("table", "player_points"), build)
+
+
+def team_points_frame():
+    """Every team_points row (user team totals per match), loaded once per data version"""
+    def build():
+        return pd.DataFrame(fetch_table("team_points", "user_id, match_id, points"), columns=["user_id", "match_id", "points"])
+    return cache.get(("table", "team_points"), build)
+
+
+def match_points_records(match_id):
+    df = player_points_frame()
+    df = df[df["match_id"] == str(match_id)].sort_values(["total_points", "player_name"], ascending=[False, True])
+    return df.to_dict(orient="records")
+
+
+def season_totals_records():
+    df = player_points_frame()
+    point_columns = ["batting_points", "bowling_points", "fielding_points", "potm_points", "total_points"]
+    totals = df.groupby("player_name", sort=False).agg(
+        team=("team", "last"), matches=("match_id", "nunique"), **{column: (column, "sum") for column in point_columns}
+    ).reset_index()
+    totals = totals.sort_values(["total_points", "player_name"], ascending=[False, True])
+    return totals.round(2).to_dict(orient="records")
+
+
+def league_leaderboard_records(league_id):
+    members = [row["user_id"] for row in fetch_table("user_leagues", "user_id", league_id=league_id)]
+    if not members:
+        return None
+    team_points = team_points_frame()
+    standings = (
+        team_points[team_points["user_id"].isin(members)]
+        .groupby("user_id").agg(total_points=("points", "sum"), matches_played=("match_id", "nunique"))
+        .reindex(members, fill_value=0).rename_axis("user_id").reset_index()
+        .sort_values(["total_points", "user_id"], ascending=[False, True])
+    )
+    standings["rank"] = standings["total_points"].rank(method="min", ascending=False).astype(int)
+    return standings.round(2).to_dict(orient="records")
+
+
+def etag_matches(etag, if_none_match):
+    """Whether an If-None-Match header lists `etag` (or is '*'); weak W/ tags compare by their value"""
+    tags = [tag.strip() for tag in (if_none_match or "").split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def paginated_response(request, key, build_records, limit, offset):
+    """Serve one page of a cached resource as JSON with an ETag, or 304 if the client has it.
+
+    Only the resource's records are cached; pages are sliced from them on every request.
+    """
+    records = cache.get(key, build_records)
+    if records is None:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    page = records[offset:offset + limit]
+    body = json.dumps({
+        "items": page,
+        "total": len(records),
+        "limit": limit,
+        "offset": offset,
+        "next_offset": offset + limit if offset + limit < len(records) else None,
+    }, default=str).encode("utf-8")
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(etag, request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.get("/matches/{match_id}/points")
+def get_match_points(request: Request, match_id: str,
+                     limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0)):
+    """Per-player points for one match, highest first"""
+    return paginated_response(request, ("match", match_id), lambda: match_points_records(match_id), limit, offset)
+
+
+@app.get("/players/points")
+def get_player_points(request: Request,
+                      limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0)):
+    """Season totals per player, highest first"""
+    return paginated_response(request, ("season",), season_totals_records, limit, offset)
+
+
+@app.get("/leagues/{league_id}/leaderboard")
+def get_league_leaderboard(request: Request, league_id: str,
+                           limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0)):
+    """League members ranked by their team's season points"""
+    return paginated_response(request, ("league", league_id), lambda: league_leaderboard_records(league_id),
+                              limit, offset)
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok", "data_version": cache.version, "cache": dict(cache.stats, entries=len(cache.entries))}
@@ -0,0 +1,308 @@
+import argparse
+import heapq
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Team recommender: the best XIs (and their captain / vice-captain) for a budget, solved exactly.
+#
+#     python recommender.py [--top 5] [--budget 100] [--max-per-franchise 7]
+#
+# A lineup is 11 players within the budget, with the app's role minimums and at most four
+# overseas players (see validateTeamComposition in src/app/transfer-market/page.tsx), and at
+# most `max_per_franchise` players from one franchise. The captain scores double and the
+# vice-captain 1.5x, as in main.py's team totals.
+#
+# The search is a branch and bound over players sorted by expected points, so the first player
+# picked is always the captain and the second the vice-captain. Each node is bounded by an
+# exact "best k players within the remaining budget" table: a knapsack DP over the rest of the
+# pool, once on plain points and once with the role minimums and overseas limit priced in
+# (Lagrangian relaxation). Only the franchise cap is left out of both.
+# benchmarks/bench_recommender.py times it on 150-300 player pools.
+
+PLAYERS_WITH_PRICES_PATH = os.getenv("PLAYERS_WITH_PRICES_PATH", "public/data/players_with_prices.json")
+PRICES_CSV_PATH = os.getenv("PRICES_CSV_PATH", "public/data/player_prices.csv")
+
+SQUAD_SIZE = 11
+BUDGET = 100.0
+PRICE_UNIT = 0.1  # Prices are in steps of 0.1M, so costs are searched as integers
+ROLE_MINIMUMS = {"Batter": 3, "Bowler": 3, "WK-Batter": 1, "Batting Allrounder": 1, "Bowling Allrounder": 1}
+MAX_OVERSEAS = 4
+HOME_COUNTRY = "India"
+MAX_PER_FRANCHISE = int(os.getenv("MAX_PER_FRANCHISE", "7"))
+CAPTAIN_MULTIPLIER = 2.0
+VICE_CAPTAIN_MULTIPLIER = 1.5
+DEFAULT_PLAYER_PRICE = 5.0  # As in scripts/mergePrices.js
+
+
+def expected_points(prices):
+    """Points a player is expected to score next match: EWMA form, else the per-match or season average"""
+    if "Form" in prices and "Matches" in prices:
+        average = prices["Fantasy_Points"] / prices["Matches"].where(prices["Matches"] > 0)
+        return prices["Form"].fillna(average).fillna(0.0)
+    return prices["Fantasy_Points"].fillna(0.0)
+
+
+def load_player_pool(players_path=PLAYERS_WITH_PRICES_PATH, prices_path=PRICES_CSV_PATH):
+    """Players with price, role, franchise, overseas flag and expected points, one row each"""
+    with open(players_path, encoding="utf-8") as f:
+        players = pd.DataFrame(json.load(f))
+    pool = pd.DataFrame({
+        "player_id": players["Player ID"].astype(str),
+        "player": players["Player"],
+        "role": players["Player Role"],
+        "franchise": players["Team Name"],
+        "overseas": players["Country"] != HOME_COUNTRY,
+        "price": pd.to_numeric(players["Price"], errors="coerce").fillna(DEFAULT_PLAYER_PRICE),
+    })
+    points = pd.Series(0.0, index=pool.index)
+    if prices_path and os.path.exists(prices_path):
+        prices = pd.read_csv(prices_path).drop_duplicates("Full Name").set_index("Full Name")
+        points = pool["player"].map(expected_points(prices)).fillna(0.0)
+    pool["expected_points"] = points.astype(float)
+    return pool
+
+
+class LineupSearch:
+    """Exact top-K lineup search over one player pool"""
+
+    def __init__(self, pool, budget=BUDGET, squad_size=SQUAD_SIZE, role_minimums=None,
+                 max_overseas=MAX_OVERSEAS, max_per_franchise=MAX_PER_FRANCHISE):
+        # Highest expected points first: the first pick is the captain, the second the vice-captain
+        self.pool = pool.sort_values(["expected_points", "price"], ascending=[False, True], kind="stable").reset_index(drop=True)
+        self.squad_size = squad_size
+        self.max_overseas = max_overseas
+        self.max_per_franchise = max_per_franchise
+        self.budget = int(round(budget / PRICE_UNIT))
+
+        self.points = self.pool["expected_points"].to_numpy(dtype=float)
+        self.costs = np.rint(self.pool["price"].to_numpy(dtype=float) / PRICE_UNIT).astype(np.int64)
+        self.overseas = self.pool["overseas"].to_numpy(dtype=bool)
+        self.franchises, self.franchise_names = pd.factorize(self.pool["franchise"])
+
+        role_minimums = ROLE_MINIMUMS if role_minimums is None else role_minimums
+        self.role_names = list(role_minimums)
+        self.role_minimums = [role_minimums[role] for role in self.role_names]
+        role_index = {role: i for i, role in enumerate(self.role_names)}
+        self.roles = np.array([role_index.get(role, -1) for role in self.pool["role"]])  # -1: no minimum
+
+        # Players of each constrained role left from position i onwards
+        n = len(self.pool)
+        self.role_suffix = np.zeros((n + 1, len(self.role_names)), dtype=np.int64)
+        for i in range(n - 1, -1, -1):
+            self.role_suffix[i] = self.role_suffix[i + 1]
+            if self.roles[i] >= 0:
+                self.role_suffix[i, self.roles[i]] += 1
+        self.best_rest = self.knapsack_bounds(self.points)
+        self.role_prices, self.overseas_price, self.priced_rest = self.lagrangian_bounds()
+
+    def knapsack_bounds(self, values):
+        """best[i, k, b]: most value from exactly k players at positions >= i costing at most b"""
+        n, slots, budget = len(self.pool), self.squad_size, self.budget
+        best = np.full((n + 1, slots + 1, budget + 1), -np.inf)
+        best[n, 0, :] = 0.0
+        for i in range(n - 1, -1, -1):
+            best[i] = best[i + 1]
+            cost = self.costs[i]
+            if cost <= budget:
+                taken = best[i + 1, :-1, :budget + 1 - cost] + values[i]
+                np.maximum(best[i, 1:, cost:], taken, out=best[i, 1:, cost:])
+        return best
+
+    def knapsack_choice(self, best, values):
+        """Positions of the players behind best[0, squad_size, budget]"""
+        chosen, k, b = [], self.squad_size, self.budget
+        for i in range(len(self.pool)):
+            if k == 0:
+                break
+            if best[i, k, b] != best[i + 1, k, b]:
+                chosen.append(i)
+                k, b = k - 1, b - self.costs[i]
+        return chosen
+
+    def lagrangian_bounds(self, iterations=12):
+        """Price the role minimums and the overseas limit into the knapsack table.
+
+        With a bonus per player of a role still short of its minimum and a charge per overseas
+        player, the budget table of the adjusted points (minus what the bonuses could add) is still
+        an upper bound, and a much tighter one once the prices are right. They are tuned at the
+        root with a few subgradient steps, keeping the table with the lowest root bound.
+        """
+        role_prices = np.zeros(len(self.role_minimums))
+        overseas_price = 0.0
+        minimums = np.array(self.role_minimums, dtype=float)
+        role_members = (self.roles[None, :] == np.arange(len(minimums))[:, None]).astype(float)
+        step = max(float(np.abs(self.points[:self.squad_size]).mean()), 1.0) * 0.02
+        best = None
+        for iteration in range(iterations):
+            values = self.points + role_prices @ role_members - overseas_price * self.overseas
+            table = self.knapsack_bounds(values)
+            root = table[0, self.squad_size, self.budget] - role_prices @ minimums + overseas_price * self.max_overseas
+            if not np.isfinite(root):
+                break
+            if best is None or root < best[0]:
+                best = (root, role_prices.copy(), overseas_price, table)
+            chosen = self.knapsack_choice(table, values)
+            role_slack = role_members[:, chosen].sum(axis=1) - minimums
+            overseas_slack = self.max_overseas - self.overseas[chosen].sum()
+            if (role_slack >= 0).all() and overseas_slack >= 0:
+                break  # The relaxed choice already meets every priced rule
+            role_prices = np.maximum(0.0, role_prices - step / np.sqrt(iteration + 1) * role_slack)
+            overseas_price = max(0.0, overseas_price - step / np.sqrt(iteration + 1) * overseas_slack)
+        if best is None:
+            return role_prices, 0.0, self.best_rest
+        return best[1], best[2], best[3]
+
+    def search(self, top_k=5):
+        """The `top_k` best lineups as (score, positions) pairs, best first.
+
+        The relaxed optimum at the root is close to the real one, so the search first only looks
+        for lineups within a small gap of it and widens the gap until `top_k` are found. Every
+        lineup scoring above the floor is found, so the first pass that finds `top_k` is exact.
+        """
+        if len(self.pool) < self.squad_size:
+            return []
+        priced_root = (self.priced_rest[0, self.squad_size, self.budget]
+                       - self.role_prices @ np.array(self.role_minimums, dtype=float) + self.overseas_price * self.max_overseas)
+        root_bound = (min(self.best_rest[0, self.squad_size, self.budget], priced_root)
+                      + (CAPTAIN_MULTIPLIER - 1) * self.points[0] + (VICE_CAPTAIN_MULTIPLIER - 1) * self.points[1])
+        if not np.isfinite(root_bound):
+            return []  # Not even 11 players fit in the budget
+        gap = max(abs(root_bound) * 0.005, 1.0)
+        while True:
+            floor = root_bound - gap if gap < abs(root_bound) * 4 + 1000 else -np.inf
+            found = self.search_above(top_k, floor)
+            if len(found) >= top_k or floor == -np.inf:
+                return found
+            gap *= 4
+
+    def search_above(self, top_k, floor):
+        """The best `top_k` lineups scoring more than `floor` (fewer if not that many do)"""
+        n, slots = len(self.pool), self.squad_size
+        points, costs, best_rest, priced_rest = self.points, self.costs, self.best_rest, self.priced_rest
+        role_prices, overseas_price = self.role_prices, self.overseas_price
+        overseas, franchises, roles = self.overseas, self.franchises, self.roles
+        role_minimums, role_suffix = self.role_minimums, self.role_suffix
+        multipliers = [CAPTAIN_MULTIPLIER, VICE_CAPTAIN_MULTIPLIER] + [1.0] * (slots - 2)
+        role_counts = [0] * len(role_minimums)
+        franchise_counts = [0] * len(self.franchise_names)
+        chosen = []
+        found = []  # Min-heap of (score, positions) holding the best lineups so far
+
+        def threshold():
+            return found[0][0] if len(found) >= top_k else floor
+
+        def visit(i, cost, overseas_count, score):
+            count = len(chosen)
+            if count == slots:
+                entry = (score, tuple(chosen))
+                if score <= floor:
+                    return
+                if len(found) < top_k:
+                    heapq.heappush(found, entry)
+                elif score > found[0][0]:
+                    heapq.heapreplace(found, entry)
+                return
+            left = slots - count
+            if n - i < left:
+                return
+
+            # Role minimums must still be reachable from the players that are left
+            needed = 0
+            priced_needs = 0.0
+            for role, minimum in enumerate(role_minimums):
+                missing = minimum - role_counts[role]
+                if missing > 0:
+                    if role_suffix[i, role] < missing:
+                        return
+                    needed += missing
+                    priced_needs += role_prices[role] * missing
+            if needed > left:
+                return
+
+            # Bound: the best `left` players within budget (with and without the priced rules),
+            # plus the captaincy bonus still to give out
+            remaining = self.budget - cost
+            bound = score + min(
+                best_rest[i, left, remaining],
+                priced_rest[i, left, remaining] - priced_needs + overseas_price * (self.max_overseas - overseas_count),
+            )
+            if count == 0:
+                bound += (CAPTAIN_MULTIPLIER - 1) * points[i] + (VICE_CAPTAIN_MULTIPLIER - 1) * points[i + 1]
+            elif count == 1:
+                bound += (VICE_CAPTAIN_MULTIPLIER - 1) * points[i]
+            if bound <= threshold() + 1e-9:
+                return
+
+            # Take player i, if the lineup stays within budget, overseas and franchise limits
+            role, franchise = roles[i], franchises[i]
+            if (cost + costs[i] <= self.budget
+                    and (not overseas[i] or overseas_count < self.max_overseas)
+                    and franchise_counts[franchise] < self.max_per_franchise
+                    and (needed - (role >= 0 and role_counts[role] < role_minimums[role])) <= left - 1):
+                chosen.append(i)
+                franchise_counts[franchise] += 1
+                if role >= 0:
+                    role_counts[role] += 1
+                visit(i + 1, cost + costs[i], overseas_count + overseas[i], score + multipliers[count] * points[i])
+                if role >= 0:
+                    role_counts[role] -= 1
+                franchise_counts[franchise] -= 1
+                chosen.pop()
+
+            # Leave player i out
+            visit(i + 1, cost, overseas_count, score)
+
+        visit(0, 0, 0, 0.0)
+        return sorted(found, reverse=True)
+
+    def lineup(self, score, positions):
+        """A found lineup as a plain dict: players in pick order, captain first"""
+        players = self.pool.iloc[list(positions)]
+        return {
+            "expected_points": round(score, 2),
+            "cost": round(float(players["price"].sum()), 1),
+            "captain": players.iloc[0]["player"],
+            "vice_captain": players.iloc[1]["player"],
+            "players": players[["player_id", "player", "role", "franchise", "overseas", "price", "expected_points"]]
+            .to_dict(orient="records"),
+        }
+
+
+def recommend_lineups(pool, top_k=5, budget=BUDGET, **constraints):
+    """The `top_k` best lineups for the pool, best first (empty if no lineup satisfies the rules)"""
+    search = LineupSearch(pool, budget=budget, **constraints)
+    return [search.lineup(score, positions) for score, positions in search.search(top_k)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommend the best fantasy XIs for a budget")
+    parser.add_argument("--top", type=int, default=5, help="Lineups to return")
+    parser.add_argument("--budget", type=float, default=BUDGET, help=f"Budget in millions (default: {BUDGET:g})")
+    parser.add_argument("--max-per-franchise", type=int, default=MAX_PER_FRANCHISE,
+                        help=f"Most players from one franchise (default: {MAX_PER_FRANCHISE})")
+    parser.add_argument("--players", default=PLAYERS_WITH_PRICES_PATH, help="Player pool with prices (JSON)")
+    parser.add_argument("--prices", default=PRICES_CSV_PATH, help="Player points and form (CSV)")
+    parser.add_argument("--json", action="store_true", help="Print the lineups as JSON")
+    args = parser.parse_args()
+
+    pool = load_player_pool(args.players, args.prices)
+    lineups = recommend_lineups(pool, args.top, args.budget, max_per_franchise=args.max_per_franchise)
+    if args.json:
+        print(json.dumps(lineups, indent=2, default=str))
+        return
+    if not lineups:
+        print("❌ No lineup satisfies the budget and squad rules.")
+        return
+    for rank, lineup in enumerate(lineups, 1):
+        print(f"\n🏏 #{rank}: {lineup['expected_points']} expected points, {lineup['cost']}M "
+              f"(C {lineup['captain']}, VC {lineup['vice_captain']})")
+        for player in lineup["players"]:
+            print(f"   {player['player']:<28}{player['role']:<20}{player['franchise']:<36}{player['price']:>5.1f}M"
+                  f"{player['expected_points']:>9.1f}{'  ✈️' if player['overseas'] else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+# League outcome simulator: Monte Carlo of the rest of the season from player_points history.
+#
+# Every simulated round is one league match. Each player appears in it with their historical
+# appearance rate and, when they do, scores a draw from their own past match points (topped up
+# from the league-wide distribution while they have only a few matches). Every team in a league
+# is scored on the same simulated rounds, captain 2x and vice-captain 1.5x, and the team with the
+# most points at the end wins that simulation (tied teams share it).
+#
+# All sampling and scoring is batched over simulations with NumPy: a round is a few
+# (simulations x players) array operations, and scoring is one matrix product per batch of
+# leagues with their (teams x players) weight matrix.
+
+DEFAULT_SIMULATIONS = 20_000
+MIN_HISTORY = 3  # Matches before a player's own distribution is used on its own
+LEAGUE_BATCH_COLUMNS = 512  # Teams scored per matrix product (bounds memory at simulations x this)
+
+
+class PointsModel:
+    """Per-player empirical match-points distributions and appearance rates"""
+
+    def __init__(self, history):
+        """`history`: one row per (match_id, player, points); `player` is whatever key the teams use"""
+        history = history[['match_id', 'player', 'points']].dropna(subset=['player'])
+        self.players = pd.Index(history['player'].unique())
+        codes = self.players.get_indexer(history['player'])
+        points = history['points'].to_numpy(dtype=np.float32)
+        matches = max(history['match_id'].nunique(), 1)
+
+        # Each player's past points, left-aligned in a padded (players x longest history) matrix
+        order = np.argsort(codes, kind='stable')
+        codes, points = codes[order], points[order]
+        self.counts = np.bincount(codes, minlength=len(self.players))
+        starts = np.concatenate([[0], np.cumsum(self.counts)[:-1]])
+        self.samples = np.zeros((len(self.players), max(int(self.counts.max(initial=0)), 1)), dtype=np.float32)
+        self.samples[codes, np.arange(len(codes)) - starts[codes]] = points
+
+        self.pooled = points if len(points) else np.zeros(1, dtype=np.float32)
+        self.appearance_rate = np.minimum(self.counts / matches, 1.0).astype(np.float32)
+        self.pooled_share = np.clip((MIN_HISTORY - self.counts) / MIN_HISTORY, 0.0, 1.0).astype(np.float32)
+
+    def sample_round(self, rng, simulations):
+        """(simulations x players) points for one simulated match"""
+        n = len(self.players)
+        points = self.samples[np.arange(n), (rng.random((simulations, n), dtype=np.float32) * self.counts).astype(np.int64)]
+        short = np.flatnonzero(self.pooled_share > 0)  # Players with few matches, partly drawn from the pool
+        if len(short):
+            pooled = self.pooled[rng.integers(0, len(self.pooled), (simulations, len(short)))]
+            use_pool = rng.random((simulations, len(short)), dtype=np.float32) < self.pooled_share[short]
+            points[:, short] = np.where(use_pool, pooled, points[:, short])
+        return points * (rng.random((simulations, n), dtype=np.float32) < self.appearance_rate)
+
+    def sample_season(self, rounds, simulations=DEFAULT_SIMULATIONS, seed=None):
+        """(simulations x players) points summed over `rounds` simulated matches"""
+        rng = np.random.default_rng(seed)
+        totals = np.zeros((simulations, len(self.players)), dtype=np.float32)
+        for _ in range(rounds):
+            totals += self.sample_round(rng, simulations)
+        return totals
+
+
+def win_shares(final_points):
+    """Each team's share of the simulations it wins; (teams x simulations) in, one share per team out.
+
+    Tied teams split the win. Simulations run along the contiguous axis, so the league's max and
+    tie count are reductions over a few contiguous rows.
+    """
+    winners = final_points >= final_points.max(axis=0) - 1e-3
+    return (winners / winners.sum(axis=0)).mean(axis=1)
+
+
+def simulate_leagues(model, leagues, team_weights, current_points, rounds,
+                     simulations=DEFAULT_SIMULATIONS, seed=None):
+    """Project every league; returns a DataFrame of (league_id, user_id, win_probability, expected_points).
+
+    `leagues` maps league_id -> member user_ids, `team_weights` maps user_id -> (player keys,
+    multipliers) and `current_points` maps user_id -> points so far.
+    """
+    memberships = [(league_id, user_id) for league_id, members in leagues.items() for user_id in dict.fromkeys(members)]
+    if not memberships:
+        return pd.DataFrame(columns=['league_id', 'user_id', 'win_probability', 'expected_points'])
+    league_ids, user_ids = (list(values) for values in zip(*memberships))
+
+    # Every user's team as one row of a (users x players) weight matrix, built with a single lookup
+    users = pd.Index(dict.fromkeys(user_ids))
+    squads = [team_weights.get(user_id, ((), ())) for user_id in users]
+    owners = np.repeat(np.arange(len(users)), [len(keys) for keys, _ in squads])
+    rows = model.players.get_indexer([key for keys, _ in squads for key in keys])
+    multipliers = np.array([weight for _, weights in squads for weight in weights], dtype=np.float32)
+    known = rows >= 0  # Players without any points history score nothing
+    weights = np.zeros((len(users), len(model.players)), dtype=np.float32)
+    np.add.at(weights, (owners[known], rows[known]), multipliers[known])
+    current = np.array([current_points.get(user_id, 0.0) for user_id in users], dtype=np.float32)
+
+    # Leagues are scored in batches of whole leagues: one matrix product, then per-league winners
+    season_points = np.ascontiguousarray(model.sample_season(rounds, simulations, seed).T)  # players x simulations
+    columns = users.get_indexer(user_ids)
+    league_starts = np.flatnonzero(np.r_[True, np.asarray(league_ids[1:], dtype=object) != np.asarray(league_ids[:-1], dtype=object)])
+    win_probability = np.zeros(len(columns))
+    expected_points = np.zeros(len(columns))
+    batch_starts = [0]
+    for start in league_starts[1:]:
+        if start - batch_starts[-1] >= LEAGUE_BATCH_COLUMNS:
+            batch_starts.append(start)
+    for begin, end in zip(batch_starts, batch_starts[1:] + [len(columns)]):
+        batch = columns[begin:end]
+        final = weights[batch] @ season_points + current[batch, None]  # teams x simulations
+        starts = league_starts[(league_starts >= begin) & (league_starts < end)] - begin
+        for first, last in zip(starts, np.append(starts[1:], end - begin)):
+            win_probability[begin + first:begin + last] = win_shares(final[first:last])
+        expected_points[begin:end] = final.mean(axis=1, dtype=np.float64)
+
+    return pd.DataFrame({
+        'league_id': league_ids,
+        'user_id': user_ids,
+        'win_probability': win_probability.round(4),
+        'expected_points': expected_points.round(2),
+    })
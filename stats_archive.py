@@ -0,0 +1,142 @@
+import os
+import re
+import tempfile
+import threading
+
+import pandas as pd
+
+from match_records import RECORD_SCHEMAS
+
+# Raw-stats archive: every scraped match's parsed batting, bowling, fielding and POTM rows, kept
+# as Parquet files so the scoring rules can be rerun over a season without touching Cricbuzz.
+#
+#     <STATS_ARCHIVE_DIR>/series=<series>/match_id=<match id>/<kind>.parquet
+#
+# The hive-style directory names let `load_match_stats` (or any Parquet reader) pick out series
+# and matches without opening the other files. Columns keep the compact dtypes the scraper parses
+# them into (match_records.RECORD_SCHEMAS): counts as small integers, names as dictionaries.
+# Strike rate, economy and overs stay float64 so the scoring bands see exactly the values a fresh
+# scrape would.
+# DNB players are the zero-stat batting rows the scraper adds for them.
+
+# pyarrow is optional: without it the scraper runs as before, just without an archive
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    ARCHIVE_AVAILABLE = True
+except ImportError:
+    ARCHIVE_AVAILABLE = False
+
+STATS_ARCHIVE_DIR = os.getenv("STATS_ARCHIVE_DIR", "stats_archive")
+ARCHIVE_COMPRESSION = os.getenv("ARCHIVE_COMPRESSION", "zstd")
+
+ARCHIVE_SCHEMAS = RECORD_SCHEMAS
+ARCHIVE_KINDS = list(ARCHIVE_SCHEMAS)
+
+_warned_unavailable = threading.Event()
+
+
+def series_key(series_url):
+    """Partition name for a series listing URL, e.g. '9351-womens-premier-league-2025'"""
+    found = re.search(r"/cricket-series/(\d+)/([^/]+)", series_url or "")
+    return f"{found.group(1)}-{found.group(2)}" if found else "unknown"
+
+
+def match_dir(series, match_id, root=None):
+    return os.path.join(root or STATS_ARCHIVE_DIR, f"series={series}", f"match_id={match_id}")
+
+
+def compact_frame(df, kind):
+    """Cast one kind's rows to its archive dtypes (unparseable counts become 0, as scoring treats them)"""
+    schema = ARCHIVE_SCHEMAS[kind]
+    df = df.reindex(columns=list(schema))
+    for column, dtype in schema.items():
+        if dtype == "category":
+            df[column] = df[column].astype("string").astype("category")
+        else:
+            df[column] = pd.to_numeric(df[column], errors="coerce").fillna(0).astype(dtype)
+    return df
+
+
+def write_parquet_atomically(df, path):
+    """Write a frame next to `path` and rename it into place, so readers never see half a file"""
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".parquet", dir=os.path.dirname(path))
+    os.close(fd)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, tmp_path, compression=ARCHIVE_COMPRESSION)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def archive_match(series, match_id, match_frames, root=None):
+    """Store one match's parsed frames ({kind: DataFrame}); returns the files written"""
+    if not ARCHIVE_AVAILABLE:
+        if not _warned_unavailable.is_set():
+            _warned_unavailable.set()
+            print("⚠️ pyarrow is not installed; raw match stats will not be archived.")
+        return []
+
+    directory = match_dir(series, match_id, root)
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for kind in ARCHIVE_KINDS:
+        frame = match_frames.get(kind)
+        if frame is None or frame.empty:
+            continue
+        path = os.path.join(directory, f"{kind}.parquet")
+        write_parquet_atomically(compact_frame(frame, kind), path)
+        written.append(path)
+    return written
+
+
+def partition_values(root, prefix):
+    """The values of one level of `name=value` directories under root"""
+    if not os.path.isdir(root):
+        return []
+    return sorted(entry[len(prefix):] for entry in os.listdir(root) if entry.startswith(prefix))
+
+
+def archived_matches(series=None, root=None):
+    """[(series, match_id)] for every archived match, optionally only from the given series"""
+    root = root or STATS_ARCHIVE_DIR
+    wanted = [series] if isinstance(series, str) else series
+    matches = []
+    for name in partition_values(root, "series="):
+        if wanted is None or name in wanted:
+            matches.extend((name, match_id) for match_id in partition_values(os.path.join(root, f"series={name}"), "match_id="))
+    return matches
+
+
+def load_match_stats(series=None, match_ids=None, kinds=None, columns=None, root=None):
+    """Load archived rows as {kind: DataFrame}, reading only the files of the series/matches asked for.
+
+    `columns` optionally maps a kind to the columns to read. Frames keep the archive dtypes.
+    """
+    if not ARCHIVE_AVAILABLE:
+        raise RuntimeError("Reading the stats archive needs pyarrow (pip install pyarrow)")
+
+    wanted_ids = None if match_ids is None else {str(match_id) for match_id in match_ids}
+    selected = [
+        (name, match_id) for name, match_id in archived_matches(series, root)
+        if wanted_ids is None or match_id in wanted_ids
+    ]
+    frames = {}
+    for kind in kinds or ARCHIVE_KINDS:
+        read_columns = (columns or {}).get(kind)
+        tables = []
+        for name, match_id in selected:
+            path = os.path.join(match_dir(name, match_id, root), f"{kind}.parquet")
+            if os.path.exists(path):
+                tables.append(pq.read_table(path, columns=read_columns))
+        if tables:
+            # Files written before a column was added lack it; promoting fills it with nulls
+            frames[kind] = pa.concat_tables(tables, promote_options="default").to_pandas()
+        else:
+            schema = ARCHIVE_SCHEMAS[kind]
+            frames[kind] = pd.DataFrame({
+                column: pd.Series(dtype=schema[column]) for column in read_columns or schema
+            })
+    return frames
@@ -0,0 +1,238 @@
+from dotenv import load_dotenv
+import json
+import os
+import sqlite3
+import threading
+
+# Storage backends for the scraper (main.py) and the points API (points_api.py).
+#
+# Both expose the same small interface over the app's tables:
+#   existing_match_ids()                     -> set of match IDs already stored
+#   upsert(table, rows, on_conflict)         -> write rows, raising on failure
+#   select_all(table, columns, **filters)    -> every matching row as a dict
+#   delete(table, **filters)                 -> remove the matching rows (at least one filter)
+#   get_data_version(name) / set_data_version(name, version)
+#
+# STORAGE_BACKEND=supabase (default) talks to the Supabase project; STORAGE_BACKEND=sqlite keeps
+# the same tables in a local file (SQLITE_PATH) so the pipeline can run and be measured offline.
+
+# Load environment variables
+load_dotenv()
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase")
+SQLITE_PATH = os.getenv("SQLITE_PATH", ".cache/fantasy.sqlite")
+SELECT_PAGE_SIZE = 1000  # PostgREST caps a select at 1000 rows
+
+# Primary key of each table: paged selects are ordered by it so page boundaries are stable
+TABLE_KEYS = {
+    "matches": ["id"],
+    "player_points": ["match_id", "player_name"],
+    "team_points": ["user_id", "match_id"],
+    "user_teams": ["user_id"],
+    "matchday_teams": ["user_id", "match_id"],
+    "user_leagues": ["user_id", "league_id"],
+    "player_prices": ["player_name"],
+    "league_projections": ["league_id", "user_id"],
+    "match_manifest": ["match_id"],
+    "data_versions": ["name"],
+}
+
+
+def filter_values(value):
+    """Filters take a single value (equality) or a list/tuple/set of values (membership)"""
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+class SupabaseStorage:
+    """The Supabase project's tables; the client is only created on first use"""
+
+    name = "supabase"
+
+    def __init__(self, url=None, service_key=None):
+        self.url = url or os.getenv("SUPABASE_URL")
+        self.service_key = service_key or os.getenv("SUPABASE_SERVICE_KEY")
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    # Debugging: Print environment variable status (without exposing secrets)
+                    print("Environment variables:", {"supabase_url": self.url, "has_service_key": bool(self.service_key)})
+                    if not self.url or not self.service_key:
+                        raise ValueError("Missing required environment variables: SUPABASE_URL or SUPABASE_SERVICE_KEY")
+                    from supabase import create_client
+                    self._client = create_client(self.url, self.service_key)
+                    print("Supabase client initialized successfully!")
+        return self._client
+
+    def existing_match_ids(self):
+        return {str(row["id"]) for row in self.select_all("matches", "id")}
+
+    def upsert(self, table, rows, on_conflict):
+        response = self.client.table(table).upsert(rows, on_conflict=on_conflict).execute()
+        if hasattr(response, "status") and response.status >= 400:
+            raise RuntimeError(f"Upsert into {table} failed: {response}")
+
+    def select_all(self, table, columns, **filters):
+        rows = []
+        while True:
+            query = self.client.table(table).select(columns)
+            for column, value in filters.items():
+                values = filter_values(value)
+                query = query.in_(column, values) if isinstance(value, (list, tuple, set)) else query.eq(column, value)
+            for column in TABLE_KEYS.get(table, []):
+                query = query.order(column)
+            page = query.range(len(rows), len(rows) + SELECT_PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < SELECT_PAGE_SIZE:
+                return rows
+
+    def delete(self, table, **filters):
+        if not filters:
+            raise ValueError(f"Refusing to delete every row of {table}")
+        query = self.client.table(table).delete()
+        for column, value in filters.items():
+            query = query.in_(column, filter_values(value)) if isinstance(value, (list, tuple, set)) else query.eq(column, value)
+        query.execute()
+
+    def get_data_version(self, name):
+        rows = self.client.table("data_versions").select("version").eq("name", name).execute().data
+        return rows[0]["version"] if rows else None
+
+    def set_data_version(self, name, version):
+        self.upsert("data_versions", [{"name": name, "version": version}], on_conflict="name")
+
+
+class SQLiteStorage:
+    """The same tables in a local SQLite file, for offline runs, tests and benchmarks"""
+
+    name = "sqlite"
+
+    # Mirrors the Supabase schema; JSON columns are stored as text and decoded on select
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS matches (
+            id TEXT PRIMARY KEY, match_date TEXT, teams TEXT, venue TEXT, result TEXT,
+            scorecard_url TEXT, processed INTEGER DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS player_points (
+            match_id TEXT NOT NULL, player_name TEXT NOT NULL, team TEXT,
+            batting_points REAL DEFAULT 0, bowling_points REAL DEFAULT 0,
+            fielding_points REAL DEFAULT 0, potm_points REAL DEFAULT 0,
+            total_points REAL GENERATED ALWAYS AS (batting_points + bowling_points + fielding_points + potm_points) VIRTUAL,
+            PRIMARY KEY (match_id, player_name)
+        );
+        CREATE TABLE IF NOT EXISTS team_points (
+            user_id TEXT NOT NULL, match_id TEXT NOT NULL, points REAL DEFAULT 0,
+            PRIMARY KEY (user_id, match_id)
+        );
+        CREATE TABLE IF NOT EXISTS user_teams (
+            user_id TEXT PRIMARY KEY, team_data TEXT, captain_id TEXT, vice_captain_id TEXT
+        );
+        CREATE TABLE IF NOT EXISTS matchday_teams (
+            user_id TEXT NOT NULL, match_id TEXT NOT NULL, players TEXT, points REAL DEFAULT 0,
+            captain_id TEXT, vice_captain_id TEXT,
+            PRIMARY KEY (user_id, match_id)
+        );
+        CREATE TABLE IF NOT EXISTS user_leagues (
+            user_id TEXT NOT NULL, league_id TEXT NOT NULL,
+            PRIMARY KEY (user_id, league_id)
+        );
+        CREATE TABLE IF NOT EXISTS player_prices (
+            player_name TEXT PRIMARY KEY, team TEXT, matches INTEGER DEFAULT 0,
+            fantasy_points REAL DEFAULT 0, batting_points REAL DEFAULT 0, bowling_points REAL DEFAULT 0,
+            fielding_points REAL DEFAULT 0, potm_points REAL DEFAULT 0, form REAL, price REAL,
+            last_match_id INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS league_projections (
+            league_id TEXT NOT NULL, user_id TEXT NOT NULL, win_probability REAL DEFAULT 0,
+            expected_points REAL DEFAULT 0, remaining_matches INTEGER DEFAULT 0, updated_at TEXT,
+            PRIMARY KEY (league_id, user_id)
+        );
+        CREATE TABLE IF NOT EXISTS match_manifest (
+            match_id TEXT PRIMARY KEY, series TEXT, stage TEXT, content_hash TEXT, updated_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT PRIMARY KEY, version TEXT
+        );
+    """
+    JSON_COLUMNS = {"teams", "team_data", "players"}
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(self.SCHEMA)
+
+    def existing_match_ids(self):
+        with self.lock:
+            return {str(row[0]) for row in self.conn.execute("SELECT id FROM matches")}
+
+    def upsert(self, table, rows, on_conflict):
+        if not rows:
+            return
+        columns = list(rows[0])
+        keys = [key.strip() for key in on_conflict.split(",")]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column not in keys)
+        sql = (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+               f"ON CONFLICT ({', '.join(keys)}) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING"))
+        values = [
+            [json.dumps(row[column]) if column in self.JSON_COLUMNS else row[column] for column in columns]
+            for row in rows
+        ]
+        with self.lock, self.conn:
+            self.conn.executemany(sql, values)
+
+    def select_all(self, table, columns, **filters):
+        column_list = [column.strip() for column in columns.split(",")]
+        sql = f"SELECT {', '.join(column_list)} FROM {table}"
+        params = []
+        if filters:
+            clauses = []
+            for column, value in filters.items():
+                values = filter_values(value)
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+            sql += " WHERE " + " AND ".join(clauses)
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [
+            {column: json.loads(row[column]) if column in self.JSON_COLUMNS and row[column] is not None else row[column]
+             for column in column_list}
+            for row in rows
+        ]
+
+    def delete(self, table, **filters):
+        if not filters:
+            raise ValueError(f"Refusing to delete every row of {table}")
+        clauses, params = [], []
+        for column, value in filters.items():
+            values = filter_values(value)
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        with self.lock, self.conn:
+            self.conn.execute(f"DELETE FROM {table} WHERE " + " AND ".join(clauses), params)
+
+    def get_data_version(self, name):
+        with self.lock:
+            row = self.conn.execute("SELECT version FROM data_versions WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_data_version(self, name, version):
+        self.upsert("data_versions", [{"name": name, "version": version}], on_conflict="name")
+
+
+def open_storage(backend=None, sqlite_path=None):
+    """Create the configured storage backend ('supabase' or 'sqlite')"""
+    backend = backend or STORAGE_BACKEND
+    if backend == "supabase":
+        return SupabaseStorage()
+    if backend == "sqlite":
+        return SQLiteStorage(sqlite_path or SQLITE_PATH)
+    raise ValueError(f"Unknown storage backend: {backend} (expected 'supabase' or 'sqlite')")
@@ -0,0 +1,17 @@
+-- main.py upserts player_points on (match_id, player_name), which needs a unique key on those
+-- columns. Tables filled by the old scraper's plain inserts may hold a player twice for one
+-- match: keep the most recently written row of each pair, then add the key.
+
+delete from player_points as older
+using player_points as newer
+where older.match_id = newer.match_id
+  and older.player_name = newer.player_name
+  and older.ctid < newer.ctid;
+
+do $$
+begin
+  if not exists (select 1 from pg_constraint where conname = 'player_points_match_id_player_name_key') then
+    alter table player_points
+      add constraint player_points_match_id_player_name_key unique (match_id, player_name);
+  end if;
+end $$;
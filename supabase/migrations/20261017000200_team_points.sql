@@ -0,0 +1,15 @@
+-- User team totals per match, written by the scraper's TeamPointsAggregator (main.py) with the
+-- captain/vice-captain multipliers applied. Upserted on (user_id, match_id).
+
+create table if not exists team_points (
+  user_id text not null,
+  match_id text not null,
+  points double precision default 0,
+  primary key (user_id, match_id)
+);
+
+-- The scraper writes with the service key; users may read their own totals
+alter table team_points enable row level security;
+drop policy if exists "Users read their own team points" on team_points;
+create policy "Users read their own team points" on team_points
+  for select using (auth.uid()::text = user_id);
@@ -0,0 +1,11 @@
+-- One row per data set the scraper publishes. main.py bumps the `points` row after every points
+-- write; points_api.py re-reads it every VERSION_CHECK_SECONDS and drops its response cache
+-- when it moves.
+
+create table if not exists data_versions (
+  name text primary key,
+  version text
+);
+
+-- Read and written with the service key only
+alter table data_versions enable row level security;
@@ -0,0 +1,23 @@
+-- One row per player, written by the scraper's PlayerPriceBook (main.py) after every points
+-- write: season totals, matches played, the form average, the price and the latest match
+-- applied. Upserted on player_name.
+
+create table if not exists player_prices (
+  player_name text primary key,
+  team text,
+  matches integer default 0,
+  fantasy_points double precision default 0,
+  batting_points double precision default 0,
+  bowling_points double precision default 0,
+  fielding_points double precision default 0,
+  potm_points double precision default 0,
+  form double precision,
+  price double precision,
+  last_match_id bigint
+);
+
+-- The scraper writes with the service key; prices are public
+alter table player_prices enable row level security;
+drop policy if exists "Anyone can read player prices" on player_prices;
+create policy "Anyone can read player prices" on player_prices
+  for select using (true);
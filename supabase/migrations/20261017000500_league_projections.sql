@@ -0,0 +1,24 @@
+-- Each league member's simulated chance to finish first, written by the scraper's LeagueProjector
+-- (main.py) after every points write. Upserted on (league_id, user_id).
+
+create table if not exists league_projections (
+  league_id text not null,
+  user_id text not null,
+  win_probability double precision default 0,
+  expected_points double precision default 0,
+  remaining_matches integer default 0,
+  updated_at timestamptz,
+  primary key (league_id, user_id)
+);
+
+-- The scraper writes with the service key; members may read their leagues' projections
+alter table league_projections enable row level security;
+drop policy if exists "Members read their leagues' projections" on league_projections;
+create policy "Members read their leagues' projections" on league_projections
+  for select using (
+    exists (
+      select 1 from user_leagues
+      where user_leagues.league_id::text = league_projections.league_id
+        and user_leagues.user_id::text = auth.uid()::text
+    )
+  );
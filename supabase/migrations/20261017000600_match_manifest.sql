@@ -0,0 +1,14 @@
+-- One row per match the scraper has seen: the furthest stage it reached (listed, fetched,
+-- parsed, scored, written or empty) and the digest of the scorecard it parsed. main.py reads
+-- it at the start of every run to decide which matches still need processing.
+
+create table if not exists match_manifest (
+  match_id text primary key,
+  series text,
+  stage text,
+  content_hash text,
+  updated_at text
+);
+
+-- Read and written with the service key only
+alter table match_manifest enable row level security;